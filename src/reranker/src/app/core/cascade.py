@@ -0,0 +1,107 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+SKIP = "skip"
+WINDOW = "window"
+FULL = "full"
+
+
+class RerankCascade:
+    """Chooses the rerank depth of a request from the retrieval scores of its candidates.
+
+    Gaps are measured relative to the spread of the retrieval scores (best minus worst
+    candidate), so the thresholds do not depend on the fusion strategy of the retriever:
+
+    - skip: the gap between the top_n-th and the next candidate is at least skip_gap, the
+      retrieval top_n is kept as is and nothing is sent to the reranker.
+    - window: only the candidates scoring within window_gap of the top_n-th candidate can
+      enter the top_n, the reranker only scores this top-M window.
+    - full: the scores are flat (the window holds at least max_window_ratio of the
+      candidates) or missing, every candidate is reranked.
+    """
+
+    def __init__(
+        self,
+        skip_gap: float = 0.5,
+        window_gap: float = 0.2,
+        max_window_ratio: float = 0.8,
+    ):
+        """Initializes the policy.
+
+        Args:
+            skip_gap (float, optional): relative gap after the top_n-th candidate above which
+            reranking is skipped. Defaults to 0.5.
+            window_gap (float, optional): relative distance to the top_n-th candidate score of
+            the candidates in the reranked window. Defaults to 0.2.
+            max_window_ratio (float, optional): share of the candidates above which the window
+            falls through to a full rerank. Defaults to 0.8.
+        """
+        self.skip_gap = skip_gap
+        self.window_gap = window_gap
+        self.max_window_ratio = max_window_ratio
+        self.decisions = {SKIP: 0, WINDOW: 0, FULL: 0}
+        self.candidates = 0
+        self.reranked = 0
+
+    def _decide(
+        self, scores: Sequence[Optional[float]], top_n: int
+    ) -> Tuple[str, Optional[np.ndarray]]:
+        n_candidates = len(scores)
+        if top_n <= 0 or n_candidates <= top_n or any(s is None for s in scores):
+            return FULL, None
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(-scores, kind="stable")
+        ranked = scores[order]
+        spread = ranked[0] - ranked[-1]
+        if not spread > 0:
+            return FULL, None
+        if (ranked[top_n - 1] - ranked[top_n]) / spread >= self.skip_gap:
+            return SKIP, order[:top_n]
+        threshold = ranked[top_n - 1] - self.window_gap * spread
+        depth = int(np.count_nonzero(ranked >= threshold))
+        if depth >= self.max_window_ratio * n_candidates:
+            return FULL, None
+        return WINDOW, order[:depth]
+
+    def decide(
+        self, scores: Sequence[Optional[float]], top_n: int
+    ) -> Tuple[str, Optional[np.ndarray]]:
+        """Chooses how deep to rerank the candidates of a request.
+
+        Args:
+            scores (Sequence[Optional[float]]): retrieval score of each candidate, None when
+            unknown
+            top_n (int): number of results of the request
+
+        Returns:
+            Tuple[str, Optional[np.ndarray]]: the decision (skip, window or full) and the
+            positions of the candidates to keep (skip) or to rerank (window), by decreasing
+            retrieval score. None for a full rerank.
+        """
+        decision, positions = self._decide(scores, top_n)
+        self.decisions[decision] += 1
+        self.candidates += len(scores)
+        if decision == WINDOW:
+            self.reranked += len(positions)
+        elif decision == FULL:
+            self.reranked += len(scores)
+        return decision, positions
+
+    def stats(self) -> dict:
+        """Decision counters and the share of the candidates sent to the reranker.
+
+        Returns:
+            dict: thresholds, requests per decision and reranked candidates
+        """
+        return {
+            "skip_gap": self.skip_gap,
+            "window_gap": self.window_gap,
+            "max_window_ratio": self.max_window_ratio,
+            "decisions": dict(self.decisions),
+            "candidates": self.candidates,
+            "reranked": self.reranked,
+            "reranked_ratio": self.reranked / self.candidates
+            if self.candidates
+            else 0.0,
+        }
@@ -1,21 +1,22 @@
-import asyncio
-import os
-from typing import List
+from typing import List, Tuple
 
-import cohere
-from utils import load_config
+from utils import get_cohere_client, load_config, request_options
+
+from .resilience import get_circuit_breaker
 
 config = load_config()
 cohere_model = config["model"]
-
-
-COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-co = cohere.ClientV2(COHERE_API_KEY)
+RERANK_TIMEOUT_S = config["provider"]["rerank_timeout_s"]
+circuit_breaker_config = config["resilience"]["circuit_breaker"]
 
 
 class CohereReranker:
     """Class that provides an asynchronous interface for reranking documents using the Cohere API."""
 
+    def __init__(self):
+        """Initializes the reranker with the shared circuit breaker of the rerank provider."""
+        self.breaker = get_circuit_breaker("cohere_rerank", **circuit_breaker_config)
+
     async def rerank(self, query: str, documents: List[str], top_n: int) -> List[dict]:
         """Re-ranks a list of documents based on their relevance to a given query using the Cohere model.
 
@@ -27,6 +28,28 @@ class CohereReranker:
         Returns:
             List[dict]: A list of dictionaries containing the top_n documents and their relevance scores, sorted by relevance in descending order.
         """
-        return await asyncio.to_thread(
-            co.rerank, model=cohere_model, query=query, documents=documents, top_n=top_n
+        return await self.breaker.call(
+            get_cohere_client().rerank,
+            model=cohere_model,
+            query=query,
+            documents=documents,
+            top_n=top_n,
+            request_options=request_options(RERANK_TIMEOUT_S),
         )
+
+    async def rerank_scores(
+        self, query: str, documents: List[str], top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Re-ranks documents and returns their indexes and relevance scores.
+
+        Args:
+            query (str): The search query to rank documents against.
+            documents (List[str]): A list of documents to be re-ranked.
+            top_n (int): The number of top-ranked documents to return.
+
+        Returns:
+            List[Tuple[int, float]]: (index in documents, relevance score) of the top_n documents,
+            sorted by relevance in descending order.
+        """
+        res = await self.rerank(query, documents, top_n)
+        return [(r.index, r.relevance_score) for r in res.results]
@@ -0,0 +1,150 @@
+import html
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def normalize_text(text: str) -> str:
+    """Removes HTML tags and entities and collapses whitespace.
+
+    Args:
+        text (str): raw field value
+
+    Returns:
+        str: plain text on a single line
+    """
+    return " ".join(html.unescape(TAG_PATTERN.sub(" ", text)).split())
+
+
+def clip(text: str, max_chars: int) -> str:
+    """Clips a text to at most max_chars characters, at a word boundary when possible.
+
+    Args:
+        text (str): normalized text
+        max_chars (int): character budget
+
+    Returns:
+        str: the text if it fits, its longest prefix of whole words otherwise
+    """
+    if len(text) <= max_chars:
+        return text
+    clipped = text[: max_chars + 1].rsplit(" ", 1)[0]
+    return clipped if len(clipped) <= max_chars else text[:max_chars]
+
+
+class DocumentPreparer:
+    """Builds the texts sent to the reranker from the document columns.
+
+    Field values are normalized (HTML and whitespace) and joined in column order within a
+    character budget: the first column (the product name) is always kept whole and the next
+    ones are clipped to the remaining budget, so long descriptions no longer inflate the
+    payload. Prepared texts are cached by product id, the catalog texts of a product being
+    the same across requests.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        max_chars: Optional[int] = None,
+        cache_size: int = 50000,
+    ):
+        """Initializes the preparer.
+
+        Args:
+            columns (Sequence[str]): columns joined into the text, by decreasing priority
+            max_chars (Optional[int], optional): character budget of a document, None for no
+            budget. Defaults to None.
+            cache_size (int, optional): maximum number of prepared texts kept, 0 to disable the
+            cache. Defaults to 50000.
+        """
+        self.columns = list(columns)
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+        self._texts: OrderedDict[int, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.cache_hits = 0
+        self.truncated = 0
+        self.raw_chars = 0
+        self.prepared_chars = 0
+
+    def prepare_text(self, doc: dict) -> str:
+        """Builds the text of a document, without the cache.
+
+        Args:
+            doc (dict): document column values
+
+        Returns:
+            str: normalized text within the character budget
+        """
+        values = [doc.get(col) for col in self.columns]
+        fields = [
+            normalize_text(str(value)) if value is not None else "" for value in values
+        ]
+        raw_chars = sum(len(str(value)) for value in values if value is not None)
+        text = " ".join(field for field in fields if field)
+        if self.max_chars is not None and len(text) > self.max_chars:
+            self.truncated += 1
+            parts = [fields[0]] if fields[0] else []
+            remaining = self.max_chars - len(fields[0])
+            for field in fields[1:]:
+                if not field:
+                    continue
+                # the separating space counts in the budget
+                budget = remaining - 1 if parts else remaining
+                if budget <= 0:
+                    break
+                part = clip(field, budget)
+                if part:
+                    parts.append(part)
+                    remaining = budget - len(part)
+            text = " ".join(parts)
+        self.raw_chars += raw_chars
+        self.prepared_chars += len(text)
+        return text
+
+    def prepare(self, docs: Sequence[dict]) -> List[str]:
+        """Builds the texts of documents, reusing the texts prepared for the same products.
+
+        Args:
+            docs (Sequence[dict]): documents, with their product_id when known
+
+        Returns:
+            List[str]: text of each document, in docs order
+        """
+        texts = []
+        with self._lock:
+            for doc in docs:
+                self.documents += 1
+                product_id = doc.get("product_id")
+                text = self._texts.get(product_id) if product_id is not None else None
+                if text is not None:
+                    self._texts.move_to_end(product_id)
+                    self.cache_hits += 1
+                else:
+                    text = self.prepare_text(doc)
+                    if product_id is not None and self.cache_size:
+                        self._texts[product_id] = text
+                        while len(self._texts) > self.cache_size:
+                            self._texts.popitem(last=False)
+                texts.append(text)
+        return texts
+
+    def stats(self) -> dict:
+        """Returns the preparation counters.
+
+        Returns:
+            dict: prepared documents, cache hits, truncated documents and the mean size of the
+            documents before and after preparation
+        """
+        prepared = self.documents - self.cache_hits
+        return {
+            "documents": self.documents,
+            "cache_hits": self.cache_hits,
+            "truncated": self.truncated,
+            "mean_raw_chars": self.raw_chars / prepared if prepared else 0.0,
+            "mean_prepared_chars": self.prepared_chars / prepared if prepared else 0.0,
+        }
@@ -0,0 +1,49 @@
+from typing import Optional
+
+import numpy as np
+
+
+def popularity_scores(
+    average_rating: np.ndarray,
+    rating_count: np.ndarray,
+    review_count: np.ndarray,
+    prior_count: Optional[float] = None,
+    prior_rating: Optional[float] = None,
+) -> np.ndarray:
+    """Scores products by popularity.
+
+    The average rating is shrunk towards prior_rating with the weight of prior_count ratings
+    (Bayesian average), so a 5 star product rated once does not outrank a 4.8 star product
+    rated a thousand times, and is scaled by the log of the rating and review volume.
+    Missing values count as no ratings and no reviews.
+
+    Args:
+        average_rating (np.ndarray): average rating of each product
+        rating_count (np.ndarray): number of ratings of each product
+        review_count (np.ndarray): number of reviews of each product
+        prior_count (Optional[float], optional): weight of the prior, in ratings. If None, the
+        median number of ratings of the rated products. Defaults to None.
+        prior_rating (Optional[float], optional): rating of the prior. If None, the mean rating
+        over every rating. Defaults to None.
+
+    Returns:
+        np.ndarray: float32 popularity score of each product, higher is more popular
+    """
+    average_rating = np.asarray(average_rating, dtype=np.float64)
+    rating_count = np.nan_to_num(np.asarray(rating_count, dtype=np.float64))
+    review_count = np.nan_to_num(np.asarray(review_count, dtype=np.float64))
+    rated = (rating_count > 0) & ~np.isnan(average_rating)
+    rating_count = np.where(rated, rating_count, 0)
+    average_rating = np.where(rated, average_rating, 0)
+    if prior_count is None:
+        prior_count = float(np.median(rating_count[rated])) if rated.any() else 1.0
+    if prior_rating is None:
+        prior_rating = (
+            float(np.average(average_rating[rated], weights=rating_count[rated]))
+            if rated.any()
+            else 0.0
+        )
+    bayesian_rating = (prior_count * prior_rating + rating_count * average_rating) / (
+        prior_count + rating_count
+    )
+    return (bayesian_rating * np.log1p(rating_count + review_count)).astype(np.float32)
@@ -0,0 +1,262 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a query so trivially different spellings share a cache entry.
+
+    Args:
+        query (str): raw query text
+
+    Returns:
+        str: NFKC normalized, lowercased query with collapsed whitespace
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+def document_hash(text: str) -> str:
+    """Stable fingerprint of a document text.
+
+    Args:
+        text (str): document text sent to the reranker
+
+    Returns:
+        str: hex digest of the text
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class RerankScoreCache:
+    """Bounded cache of relevance scores, one entry per (query, document) pair.
+
+    The reranker scores every document against the query independently of the other
+    candidates, so scores are cached per pair instead of per candidate list: a request whose
+    candidates overlap a previous request for the same query reuses the known scores and only
+    the new documents are sent to the provider. Entries live in an in-process LRU tier and,
+    optionally, in a SQLite file that is shared by every worker on the host and survives
+    restarts. Keys combine the model, the normalized query and the hash of the document text,
+    so changing the model or the reranked columns never returns stale scores. Disk writes are
+    committed by a background thread, so put_many never blocks the event loop on SQLite, and
+    the expired rows are purged by the same thread.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_size: int = 100000,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        purge_interval_s: float = 3600,
+    ):
+        """Initializes the cache.
+
+        Args:
+            model (str): rerank model name, part of the cache key.
+            max_size (int, optional): maximum number of in-process entries. Defaults to 100000.
+            ttl_seconds (Optional[float], optional): time to live of an entry. If None, entries
+            only expire through LRU eviction. Defaults to None.
+            disk_path (Optional[str], optional): path of the SQLite file used as second tier. If
+            None, only the in-process tier is used. Defaults to None.
+            purge_interval_s (float, optional): minimum time between two deletions of the
+            expired disk rows. Defaults to 3600.
+        """
+        self.key_prefix = f"{model}|"
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.purge_interval_s = purge_interval_s
+        self._disk = None
+        self._writes: Optional[queue.Queue] = None
+        if disk_path:
+            self._disk = self._open_disk_tier(disk_path)
+            self._writes = queue.Queue()
+            threading.Thread(
+                target=self._write_behind,
+                args=(disk_path,),
+                name="rerank-score-cache-writer",
+                daemon=True,
+            ).start()
+
+    @staticmethod
+    def _open_disk_tier(disk_path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(disk_path, check_same_thread=False, timeout=1)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rerank_scores "
+            "(key TEXT PRIMARY KEY, expires_at REAL, score REAL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS rerank_scores_expires_at "
+            "ON rerank_scores (expires_at)"
+        )
+        connection.commit()
+        return connection
+
+    def keys(self, query: str, documents: Sequence[str]) -> List[str]:
+        """Builds the cache keys of the (query, document) pairs.
+
+        Args:
+            query (str): raw query text
+            documents (Sequence[str]): document texts
+
+        Returns:
+            List[str]: hex digest of each pair, in documents order
+        """
+        prefix = self.key_prefix + normalize_query(query) + "|"
+        return [
+            hashlib.sha1((prefix + document_hash(doc)).encode("utf-8")).hexdigest()
+            for doc in documents
+        ]
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def get_many(self, query: str, documents: Sequence[str]) -> List[Optional[float]]:
+        """Returns the cached relevance scores of documents for a query.
+
+        Args:
+            query (str): raw query text
+            documents (Sequence[str]): document texts
+
+        Returns:
+            List[Optional[float]]: score of each document, None on a miss
+        """
+        keys = self.keys(query, documents)
+        now = time.time()
+        scores: List[Optional[float]] = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        self._entries.move_to_end(key)
+                        scores[i] = entry[1]
+                        self.memory_hits += 1
+                        continue
+                    del self._entries[key]
+                missing.append(i)
+            if missing:
+                from_disk = self._get_from_disk([keys[i] for i in missing], now)
+                for i in missing:
+                    entry = from_disk.get(keys[i])
+                    if entry is None:
+                        self.misses += 1
+                        continue
+                    scores[i] = entry[1]
+                    self.disk_hits += 1
+                    # keep the stored expiry, a disk hit does not extend the life of the entry
+                    self._set_in_memory(keys[i], entry[1], entry[0])
+        return scores
+
+    def put_many(
+        self, query: str, documents: Sequence[str], scores: Sequence[float]
+    ) -> None:
+        """Stores the relevance scores of documents for a query in every cache tier, the
+        disk writes are queued to the writer thread.
+
+        Args:
+            query (str): raw query text
+            documents (Sequence[str]): document texts
+            scores (Sequence[float]): relevance score of each document
+        """
+        keys = self.keys(query, documents)
+        expires_at = self._expires_at()
+        rows = [
+            (key, expires_at, float(score))
+            for key, score in zip(keys, scores, strict=True)
+        ]
+        with self._lock:
+            for key, _, score in rows:
+                self._set_in_memory(key, score, expires_at)
+        if self._writes is not None:
+            self._writes.put(rows)
+
+    def flush(self) -> None:
+        """Waits until the queued disk writes are committed."""
+        if self._writes is not None:
+            self._writes.join()
+
+    def _write_behind(self, disk_path: str):
+        # the writer thread has its own connection, WAL lets it commit while workers read
+        connection = self._open_disk_tier(disk_path)
+        last_purge = float("-inf")
+        while True:
+            batches = [self._writes.get()]
+            while True:
+                try:
+                    batches.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO rerank_scores VALUES (?, ?, ?)",
+                    [row for rows in batches for row in rows],
+                )
+                now = time.time()
+                if now - last_purge >= self.purge_interval_s:
+                    connection.execute(
+                        "DELETE FROM rerank_scores WHERE expires_at <= ?", (now,)
+                    )
+                    last_purge = now
+                connection.commit()
+            except sqlite3.Error:
+                # the disk tier is best effort, a lost write only costs a later miss
+                connection.rollback()
+            finally:
+                for _ in batches:
+                    self._writes.task_done()
+
+    def _set_in_memory(self, key: str, score: float, expires_at: float):
+        self._entries[key] = (expires_at, score)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get_from_disk(
+        self, keys: List[str], now: float
+    ) -> Dict[str, Tuple[float, float]]:
+        if self._disk is None:
+            return {}
+        # stay under the SQLite host parameter limit
+        scores = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            rows = self._disk.execute(
+                "SELECT key, expires_at, score FROM rerank_scores WHERE key IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            scores.update(
+                (key, (expires_at, score))
+                for key, expires_at, score in rows
+                if expires_at > now
+            )
+        return scores
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters of the cache.
+
+        Returns:
+            dict: hits per tier, misses, hit rate and current in-process size
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,324 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from ..exceptions import CircuitOpenError
+
+# absolute monotonic deadline of the current request, None outside of a resilient call
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+# margin under which a deadline counts as reached
+DEADLINE_TOLERANCE_S = 1e-3
+
+
+@contextmanager
+def deadline_scope(budget_s: Optional[float]) -> Iterator[None]:
+    """Sets the deadline of the current request, unless an outer call already set one.
+
+    The deadline lives in a context variable, so nested calls and the tasks they spawn share
+    the budget of the outermost call instead of starting their own.
+
+    Args:
+        budget_s (Optional[float]): time budget in seconds, None for no limit
+    """
+    if _deadline.get() is not None:
+        yield
+        return
+    token = _deadline.set(math.inf if budget_s is None else time.monotonic() + budget_s)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def in_deadline_scope() -> bool:
+    """Whether the caller runs inside a resilient call."""
+    return _deadline.get() is not None
+
+
+class RequestStatus:
+    """Mutable status of a request, shared by the tasks serving it."""
+
+    def __init__(self):
+        self.reranked = True
+        self.reasons = []
+
+
+_request_status: ContextVar[Optional[RequestStatus]] = ContextVar(
+    "request_status", default=None
+)
+
+
+@contextmanager
+def request_status_scope() -> Iterator[RequestStatus]:
+    """Tracks the status of the request served inside the scope.
+
+    Tasks spawned in the scope copy the context, so they all update the same status object.
+
+    Yields:
+        RequestStatus: the status of the request
+    """
+    status = RequestStatus()
+    token = _request_status.set(status)
+    try:
+        yield status
+    finally:
+        _request_status.reset(token)
+
+
+def mark_not_reranked(reason: str) -> None:
+    """Flags the current request as ranked without the reranker, so its scores are not
+    relevance scores. No-op outside of a request_status_scope.
+
+    Args:
+        reason (str): why the reranker was not used, e.g. "cascade_skip" or "fallback"
+    """
+    status = _request_status.get()
+    if status is not None:
+        status.reranked = False
+        status.reasons.append(reason)
+
+
+def budget_exhausted() -> bool:
+    """Whether the deadline of the current request has passed."""
+    deadline = _deadline.get()
+    # asyncio timers may fire up to the clock resolution early
+    return deadline is not None and time.monotonic() >= deadline - DEADLINE_TOLERANCE_S
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current deadline, None if there is no deadline."""
+    deadline = _deadline.get()
+    if deadline is None or deadline == math.inf:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay_s: float,
+    max_delay_s: Optional[float] = None,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(max, base * 2 ** (attempt - 1))).
+
+    Jitter spreads the retries of concurrent requests instead of sending them in waves.
+
+    Args:
+        attempt (int): number of the failed attempt, starting at 1
+        base_delay_s (float): upper bound of the first delay
+        max_delay_s (Optional[float], optional): cap of the upper bound. Defaults to None.
+        rng (Callable[[], float], optional): uniform [0, 1) generator. Defaults to random.random.
+
+    Returns:
+        float: seconds to wait before the next attempt
+    """
+    bound = base_delay_s * 2 ** (attempt - 1)
+    if max_delay_s is not None:
+        bound = min(bound, max_delay_s)
+    return rng() * bound
+
+
+class CircuitBreaker:
+    """Circuit breaker of a downstream dependency, shared by every request of the process.
+
+    closed: calls go through, consecutive failures are counted. After failure_threshold of
+    them the circuit opens. open: calls fail immediately with CircuitOpenError, without
+    reaching the dependency. After recovery_timeout_s the circuit turns half open. half open:
+    up to half_open_max_calls probe calls go through. A successful probe closes the circuit,
+    a failed one opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout_s: float = 10.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initializes a closed circuit.
+
+        Args:
+            name (str): dependency name, used in errors and metrics
+            failure_threshold (int, optional): consecutive failures opening the circuit.
+            Defaults to 5.
+            recovery_timeout_s (float, optional): time the circuit stays open before probing.
+            Defaults to 10.0.
+            half_open_max_calls (int, optional): concurrent probe calls. Defaults to 1.
+            clock (Callable[[], float], optional): monotonic clock. Defaults to time.monotonic.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_s = recovery_timeout_s
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters = Counter()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout_s
+        ):
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._counters["opened"] += 1
+
+    def before_call(self) -> None:
+        """Admits a call or rejects it.
+
+        Raises:
+            CircuitOpenError: if the circuit is open, or half open with every probe in flight
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+            elif state != self.CLOSED:
+                self._counters["rejected"] += 1
+                raise CircuitOpenError(f"Circuit of {self.name} is {state}")
+            self._counters["calls"] += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def _release_probe(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    async def call(self, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Calls the dependency through the circuit.
+
+        Args:
+            func (Callable[..., Awaitable]): async function calling the dependency
+            *args: positional arguments of func
+            **kwargs: keyword arguments of func
+
+        A call cancelled once the deadline of its request (or stage) has passed counts as a
+        failure, so a hanging dependency opens the circuit even though every caller gives up
+        before the dependency answers.
+
+        Raises:
+            CircuitOpenError: if the call is rejected
+
+        Returns:
+            Any: the result of func
+        """
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            if budget_exhausted():
+                # the caller timed out waiting for the dependency
+                self.record_failure()
+            else:
+                # cancelled for another reason, e.g. a hedged request won, which says
+                # nothing about the dependency
+                self._release_probe()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        """Circuit state and call counters."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                **{
+                    counter: self._counters[counter]
+                    for counter in (
+                        "calls",
+                        "successes",
+                        "failures",
+                        "rejected",
+                        "opened",
+                    )
+                },
+            }
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Returns the circuit breaker of a dependency, creating it on first use.
+
+    Args:
+        name (str): dependency name
+        **kwargs: CircuitBreaker parameters, used on creation
+
+    Returns:
+        CircuitBreaker: the shared breaker of the dependency
+    """
+    if name not in _circuit_breakers:
+        _circuit_breakers[name] = CircuitBreaker(name, **kwargs)
+    return _circuit_breakers[name]
+
+
+def circuit_breaker_stats() -> Dict[str, dict]:
+    """Stats of every circuit breaker, by dependency name."""
+    return {name: breaker.stats() for name, breaker in _circuit_breakers.items()}
+
+
+class FallbackMetrics:
+    """Counters of the calls guarded by async_error_handler_with_fallback, by function."""
+
+    EVENTS = ("calls", "retries", "fallbacks", "deadline_exceeded", "short_circuited")
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, event: str) -> None:
+        self._counters[name][event] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {event: counters[event] for event in self.EVENTS}
+            for name, counters in self._counters.items()
+        }
+
+
+fallback_metrics = FallbackMetrics()
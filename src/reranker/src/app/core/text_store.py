@@ -0,0 +1,99 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..exceptions import WrongArtifactVersion
+
+# latest product text store format version this loader understands
+TEXT_STORE_FORMAT_VERSION = 1
+
+
+class ProductTextStore:
+    """Texts of the catalog products, by product id.
+
+    The store is written by the retriever batch pipeline (see save_product_text_store): each
+    column is a utf-8 blob with the offsets of every product value, memory-mapped so every
+    worker shares the same page cache copy and the text of a product is a slice of the blob.
+    """
+
+    def __init__(self, columns: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        """Initializes the store.
+
+        Args:
+            columns (Dict[str, Tuple[np.ndarray, np.ndarray]]): blob and offsets of each column
+        """
+        self.columns = columns
+        self.n_products = len(next(iter(columns.values()))[1]) - 1 if columns else 0
+
+    def __len__(self) -> int:
+        return self.n_products
+
+    def unknown_ids(self, product_ids: Sequence[int]) -> List[int]:
+        """Product ids that are not in the store.
+
+        Args:
+            product_ids (Sequence[int]): requested product ids
+
+        Returns:
+            List[int]: the ids outside of the catalog
+        """
+        return [i for i in product_ids if not 0 <= i < self.n_products]
+
+    def docs(self, product_ids: Sequence[int]) -> List[dict]:
+        """Builds the documents of products from their stored texts.
+
+        Args:
+            product_ids (Sequence[int]): product ids, all in the store
+
+        Returns:
+            List[dict]: product_id and the text of every column of each product, in
+            product_ids order
+        """
+        ids = np.asarray(product_ids, dtype=np.int64)
+        docs = [{"product_id": int(i)} for i in ids]
+        for column, (blob, offsets) in self.columns.items():
+            starts = offsets[ids].tolist()
+            ends = offsets[ids + 1].tolist()
+            for doc, start, end in zip(docs, starts, ends, strict=True):
+                doc[column] = blob[start:end].tobytes().decode("utf-8")
+        return docs
+
+
+def load_product_text_store(
+    path: Optional[str], mmap: bool = True
+) -> Optional[ProductTextStore]:
+    """Load the product text store written by the retriever batch pipeline.
+
+    Args:
+        path (Optional[str]): directory of the store
+        mmap (bool, optional): If True, the store is memory-mapped. Defaults to True.
+
+    Raises:
+        WrongArtifactVersion: if the store was written by a newer format version
+
+    Returns:
+        Optional[ProductTextStore]: the store, or None if there is none at path
+    """
+    if not path:
+        return None
+    manifest_path = os.path.join(path, "product_text_manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest["format_version"] > TEXT_STORE_FORMAT_VERSION:
+        raise WrongArtifactVersion(
+            f"Product text store format version {manifest['format_version']} is not supported. Must be <= {TEXT_STORE_FORMAT_VERSION}"
+        )
+    mmap_mode = "r" if mmap else None
+    return ProductTextStore(
+        {
+            column: (
+                np.load(os.path.join(path, files["blob"]), mmap_mode=mmap_mode),
+                np.load(os.path.join(path, files["offsets"]), mmap_mode=mmap_mode),
+            )
+            for column, files in manifest["columns"].items()
+        }
+    )
@@ -0,0 +1,15 @@
+from .exceptions import (
+    CircuitOpenError,
+    ProductTextStoreUnavailable,
+    RerankUnavailable,
+    UnknownProductError,
+    WrongArtifactVersion,
+)
+
+__all__ = [
+    "CircuitOpenError",
+    "ProductTextStoreUnavailable",
+    "RerankUnavailable",
+    "UnknownProductError",
+    "WrongArtifactVersion",
+]
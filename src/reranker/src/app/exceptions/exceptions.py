@@ -0,0 +1,28 @@
+class CircuitOpenError(Exception):
+    """Exception to be raised when a call is rejected because the circuit of its dependency is open"""
+
+    pass
+
+
+class WrongArtifactVersion(Exception):
+    """Exception to be raised when the artifacts were saved in an unsupported format version"""
+
+    pass
+
+
+class ProductTextStoreUnavailable(Exception):
+    """Exception to be raised when documents are requested by id but no product text store is loaded"""
+
+    pass
+
+
+class UnknownProductError(Exception):
+    """Exception to be raised when a requested product id is not in the product text store"""
+
+    pass
+
+
+class RerankUnavailable(Exception):
+    """Exception to be raised when products could not be reranked by the provider and there is no meaningful fallback"""
+
+    pass
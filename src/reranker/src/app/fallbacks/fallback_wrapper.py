@@ -2,79 +2,123 @@ import asyncio
 import functools
 from typing import List, Tuple
 
-from utils import logger
+import numpy as np
+from utils import load_config, logger
 
+from ..core.popularity import popularity_scores
+from ..core.resilience import (
+    backoff_delay,
+    deadline_scope,
+    fallback_metrics,
+    in_deadline_scope,
+    mark_not_reranked,
+    remaining_budget,
+)
+from ..exceptions import CircuitOpenError
 
-def async_error_handler_with_fallback(fallback=None, retries=0, delay=0):
+config = load_config()
+POPULARITY_PRIOR_COUNT = config["fallback"]["popularity"]["prior_count"]
+
+
+def async_error_handler_with_fallback(
+    fallback=None, retries=0, delay=0, max_delay=None, deadline_s=None
+):
     """
     Async decorator to wrap async methods with error handling and fallback.
 
+    Every call gets a deadline shared through a context variable. Attempts are cut at the
+    deadline, retries wait a jittered exponential backoff and are skipped when the backoff
+    would overrun the deadline or when the circuit of the failing dependency is open. Calls
+    nested in another wrapped call run once and let the outer call retry or fall back, so
+    retries never multiply. Fallback responses flag the request as not reranked.
+
     Args:
         fallback: Async function or sync function to call as fallback if the wrapped function fails.
                   If None, returns None on failure.
         retries: Number of retry attempts before fallback.
-        delay: Delay in seconds between retries.
+        delay: Base delay in seconds of the backoff between retries.
+        max_delay: Maximum delay in seconds between retries. If None, the delay is not capped.
+        deadline_s: Time budget in seconds of the call, retries included. If None, no limit.
     """
 
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            attempts = 0
-            while True:
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    attempts += 1
-                    logger.warning(f"Error in {func.__name__}: {e}, attempt {attempts}")
-                    if attempts > retries:
-                        if fallback:
-                            logger.warning(f"Using fallback for {func.__name__}")
-                            if asyncio.iscoroutinefunction(fallback):
-                                return await fallback(*args, **kwargs)
+            if in_deadline_scope():
+                return await func(*args, **kwargs)
+            name = func.__name__
+            fallback_metrics.record(name, "calls")
+            with deadline_scope(deadline_s):
+                attempts = 0
+                while True:
+                    try:
+                        return await asyncio.wait_for(
+                            func(*args, **kwargs), timeout=remaining_budget()
+                        )
+                    except Exception as e:
+                        attempts += 1
+                        logger.warning(f"Error in {name}: {e}, attempt {attempts}")
+                        pause = backoff_delay(attempts, delay, max_delay)
+                        remaining = remaining_budget()
+                        out_of_time = remaining is not None and pause >= remaining
+                        if isinstance(e, CircuitOpenError):
+                            fallback_metrics.record(name, "short_circuited")
+                        elif out_of_time:
+                            fallback_metrics.record(name, "deadline_exceeded")
+                        if (
+                            attempts > retries
+                            or out_of_time
+                            or isinstance(e, CircuitOpenError)
+                        ):
+                            fallback_metrics.record(name, "fallbacks")
+                            if fallback:
+                                logger.warning(f"Using fallback for {name}")
+                                mark_not_reranked("fallback")
+                                if asyncio.iscoroutinefunction(fallback):
+                                    return await fallback(*args, **kwargs)
+                                else:
+                                    return fallback(*args, **kwargs)
                             else:
-                                return fallback(*args, **kwargs)
-                        else:
-                            logger.warning(
-                                f"No fallback defined for {func.__name__}, returning None"
-                            )
-                            return None
-                    if delay:
-                        await asyncio.sleep(delay)
+                                logger.warning(
+                                    f"No fallback defined for {name}, returning None"
+                                )
+                                return None
+                        fallback_metrics.record(name, "retries")
+                        if pause:
+                            await asyncio.sleep(pause)
 
         return wrapper
 
     return decorator
 
 
-def default_fallback_data_ids(*args, **kwargs) -> List[Tuple[int, float]]:
-    """Placeholder function to handle errors.
-    A good approach might be to recommend on item's popularity for fallback
+def default_fallback_data_ids(
+    self, query: str, documents: dict, top_n: int, *args, **kwargs
+) -> List[Tuple[int, float]]:
+    """Ranks the provided documents by popularity, from their ratings and reviews.
 
     Returns:
-        RerankIDResponse: a fallback response with items ids
+        List[Tuple[int, float]]: index and popularity score of the top_n most popular documents
     """
-    return [(0, 0.0), (1, 0.0), (2, 0.0)]
+    docs = documents["docs"]
+    scores = popularity_scores(
+        *(
+            np.array([doc.get(column) for doc in docs], dtype=np.float64)
+            for column in ("average_rating", "rating_count", "review_count")
+        ),
+        prior_count=POPULARITY_PRIOR_COUNT,
+    )
+    top = np.argsort(-scores, kind="stable")[:top_n]
+    return [(int(i), float(scores[i])) for i in top]
 
 
-def default_fallback_data_docs(*args, **kwargs) -> List[dict]:
-    """Placeholder function to handle errors.
-    A good approach might be to recommend on item's popularity for fallback
+def default_fallback_data_docs(
+    self, query: str, documents: dict, top_n: int, *args, **kwargs
+) -> List[dict]:
+    """Returns the top_n most popular provided documents, see default_fallback_data_ids.
 
     Returns:
-        RerankIDResponse: a fallback response with items ids
+        List[dict]: the most popular documents, in the rerank response format
     """
-    placeholder_response = [
-        {
-            "product_id": [0],
-            "product_name": ["armchair"],
-            "product_class": ["chairs"],
-            "category_hierarchy": ["chairs"],
-            "product_description": ["an armchair"],
-            "product_features": [""],
-            "rating_count": [10],
-            "average_rating": [4.5],
-            "review_count": [5],
-            "score": [0],
-        }
-    ]
-    return placeholder_response
+    ranked = default_fallback_data_ids(self, query, documents, top_n)
+    return [documents["docs"][i] for i, _ in ranked]
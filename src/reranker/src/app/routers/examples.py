@@ -66,3 +66,23 @@ rerank_docs_examples = {
         }
     }
 }
+
+
+rerank_by_ids_examples = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "examples": {
+                    "default": {
+                        "summary": "Rerank catalog products based on the query. Return relevant product IDs",
+                        "value": {
+                            "query": "<QUERY>",
+                            "product_ids": [40707, 1233, 562],
+                            "top_n": 10,
+                        },
+                    },
+                }
+            }
+        }
+    }
+}
@@ -1,9 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from utils import logger
 
 from .. import schemas
+from ..core.resilience import request_status_scope
+from ..exceptions import (
+    ProductTextStoreUnavailable,
+    RerankUnavailable,
+    UnknownProductError,
+)
 from ..services import RerankService
-from .examples import rerank_docs_examples, rerank_ids_examples
+from .examples import (
+    rerank_by_ids_examples,
+    rerank_docs_examples,
+    rerank_ids_examples,
+)
 
 router = APIRouter()
 
@@ -19,10 +29,11 @@ async def rerank_docs_ids(
     request: schemas.RerankRequest,
 ) -> schemas.RerankIDResponse:
     logger.info(f"New request: {request.query}")
-    r_docs = await rerank_service.rerank_get_ids(
-        request.query, request.documents, request.top_n
-    )
-    response = schemas.RerankIDResponse(ids_and_scores=r_docs)
+    with request_status_scope() as status:
+        r_docs = await rerank_service.rerank_get_ids(
+            request.query, request.documents, request.top_n
+        )
+    response = schemas.RerankIDResponse(ids_and_scores=r_docs, reranked=status.reranked)
     return response
 
 
@@ -34,6 +45,34 @@ async def rerank_docs_ids(
 async def rerank_docs(
     request: schemas.RerankRequest,
 ) -> schemas.RerankDocsResponse:
-    docs = await rerank_service.rerank(request.query, request.documents, request.top_n)
-    response = schemas.RerankDocsResponse(docs=docs)
+    with request_status_scope() as status:
+        docs = await rerank_service.rerank(
+            request.query, request.documents, request.top_n
+        )
+    response = schemas.RerankDocsResponse(docs=docs, reranked=status.reranked)
     return response
+
+
+@router.post(
+    "/rerank_by_ids",
+    response_model=schemas.RerankByIDsResponse,
+    openapi_extra=rerank_by_ids_examples,
+)
+async def rerank_by_ids(
+    request: schemas.RerankByIDsRequest,
+) -> schemas.RerankByIDsResponse:
+    logger.info(f"New request: {request.query}")
+    try:
+        ids_and_scores = await rerank_service.rerank_product_ids(
+            request.query, request.product_ids, request.top_n
+        )
+    except (ProductTextStoreUnavailable, RerankUnavailable) as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except UnknownProductError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return schemas.RerankByIDsResponse(ids_and_scores=ids_and_scores)
+
+
+@router.get("/stats", response_model=schemas.StatsResponse)
+async def stats() -> schemas.StatsResponse:
+    return schemas.StatsResponse(**rerank_service.stats())
@@ -1,8 +1,31 @@
-from .schemas import RerankDoc, RerankDocsResponse, RerankIDResponse, RerankRequest
+from .schemas import (
+    CacheStats,
+    CascadeStats,
+    CircuitBreakerStats,
+    DocumentPreparationStats,
+    FallbackStats,
+    PayloadStats,
+    RerankByIDsRequest,
+    RerankByIDsResponse,
+    RerankDoc,
+    RerankDocsResponse,
+    RerankIDResponse,
+    RerankRequest,
+    StatsResponse,
+)
 
 __all__ = [
+    "CacheStats",
+    "CascadeStats",
+    "CircuitBreakerStats",
+    "DocumentPreparationStats",
+    "FallbackStats",
+    "PayloadStats",
+    "RerankByIDsRequest",
+    "RerankByIDsResponse",
     "RerankDoc",
     "RerankDocsResponse",
     "RerankIDResponse",
     "RerankRequest",
+    "StatsResponse",
 ]
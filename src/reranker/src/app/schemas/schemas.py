@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -11,6 +11,20 @@ class RerankRequest(BaseModel):
 
 class RerankIDResponse(BaseModel):
     ids_and_scores: List[Tuple[int, float]]
+    # True when the scores are rerank relevance scores, False for the retrieval scores (cascade
+    # skip) or the popularity scores (fallback)
+    reranked: bool = True
+
+
+class RerankByIDsRequest(BaseModel):
+    query: str
+    product_ids: List[int]
+    top_n: int
+
+
+class RerankByIDsResponse(BaseModel):
+    # product ids, not positions in the request
+    ids_and_scores: List[Tuple[int, float]]
 
 
 class RerankDoc(BaseModel):
@@ -28,3 +42,73 @@ class RerankDoc(BaseModel):
 
 class RerankDocsResponse(BaseModel):
     docs: List[RerankDoc]
+    # True when the docs are in rerank order, see RerankIDResponse
+    reranked: bool = True
+
+
+class CircuitBreakerStats(BaseModel):
+    state: Literal["closed", "open", "half_open"]
+    consecutive_failures: int
+    calls: int
+    successes: int
+    failures: int
+    rejected: int
+    opened: int
+
+
+class FallbackStats(BaseModel):
+    calls: int
+    retries: int
+    fallbacks: int
+    deadline_exceeded: int
+    short_circuited: int
+
+
+class CacheStats(BaseModel):
+    hits: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+    size: int
+
+
+class DocumentPreparationStats(BaseModel):
+    documents: int
+    cache_hits: int
+    truncated: int
+    # over the prepared documents, cache hits excluded
+    mean_raw_chars: float
+    mean_prepared_chars: float
+
+
+class PayloadStats(BaseModel):
+    # provider requests before chunking, with the documents and characters they sent
+    requests: int
+    documents: int
+    chars: int
+    mean_chars_per_document: float
+
+
+class CascadeStats(BaseModel):
+    skip_gap: float
+    window_gap: float
+    max_window_ratio: float
+    # requests by decision: skip, window or full
+    decisions: Dict[str, int]
+    candidates: int
+    reranked: int
+    reranked_ratio: float
+
+
+class StatsResponse(BaseModel):
+    # by dependency
+    circuit_breakers: Dict[str, CircuitBreakerStats]
+    # by service method
+    fallbacks: Dict[str, FallbackStats]
+    # scores by (query, document) pair, None when disabled
+    cache: Optional[CacheStats]
+    document_preparation: DocumentPreparationStats
+    payload: PayloadStats
+    # None when disabled
+    cascade: Optional[CascadeStats]
@@ -1,8 +1,25 @@
-from typing import List, Tuple
+import asyncio
+import os
+from typing import List, Optional, Tuple
 
 from utils import load_config, logger
 
+from ..core.cascade import SKIP, WINDOW, RerankCascade
+from ..core.chunked_rerank import rerank_in_chunks
 from ..core.cohere_reranker import CohereReranker
+from ..core.document_preparation import DocumentPreparer
+from ..core.rerank_cache import RerankScoreCache
+from ..core.resilience import (
+    circuit_breaker_stats,
+    fallback_metrics,
+    mark_not_reranked,
+)
+from ..core.text_store import ProductTextStore, load_product_text_store
+from ..exceptions import (
+    ProductTextStoreUnavailable,
+    RerankUnavailable,
+    UnknownProductError,
+)
 from ..fallbacks import (
     async_error_handler_with_fallback,
     default_fallback_data_docs,
@@ -12,15 +29,91 @@ from ..schemas import RerankDocsResponse
 
 config = load_config()
 columns_to_rerank = config["columns_to_rerank"]
+RETRIES = config["resilience"]["retries"]
+BASE_DELAY_S = config["resilience"]["base_delay_s"]
+MAX_DELAY_S = config["resilience"]["max_delay_s"]
+DEADLINE_S = config["resilience"]["deadline_s"]
+cache_config = config["cache"]
+chunking_config = config["chunking"]
+preparation_config = config["document_preparation"]
+cascade_config = config["cascade"]
 
 cohere_reranker: CohereReranker = CohereReranker()
+document_preparer: DocumentPreparer = DocumentPreparer(
+    columns_to_rerank,
+    max_chars=preparation_config["max_chars"],
+    cache_size=preparation_config["cache_size"],
+)
+rerank_cache: Optional[RerankScoreCache] = (
+    RerankScoreCache(
+        model=config["model"],
+        max_size=cache_config["max_size"],
+        ttl_seconds=cache_config["ttl_seconds"],
+        disk_path=cache_config["disk_path"],
+    )
+    if cache_config["enabled"]
+    else None
+)
+rerank_cascade: Optional[RerankCascade] = (
+    RerankCascade(
+        skip_gap=cascade_config["skip_gap"],
+        window_gap=cascade_config["window_gap"],
+        max_window_ratio=cascade_config["max_window_ratio"],
+    )
+    if cascade_config["enabled"]
+    else None
+)
+# written by the retriever batch pipeline, needed by the rerank by product id endpoint
+product_text_store: Optional[ProductTextStore] = load_product_text_store(
+    os.getenv("PRODUCT_TEXT_STORE_PATH")
+)
+# caps the chunks in flight to the provider across every request
+rerank_semaphore = asyncio.Semaphore(chunking_config["max_concurrency"])
 
 
 class RerankService:
     """Service in charge of reranking documents given a query"""
 
+    def __init__(self):
+        """Initializes the payload counters of the provider requests."""
+        self.provider_requests = 0
+        self.provider_documents = 0
+        self.provider_chars = 0
+
+    async def _provider_rerank(
+        self, query: str, documents_list: List[str], top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Sends documents to the provider, in concurrent chunks when chunking is enabled.
+
+        Args:
+            query (str): search query
+            documents_list (List[str]): document texts
+            top_n (int): number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: top_n (index in documents_list, score) pairs by decreasing
+            score
+        """
+        self.provider_requests += 1
+        self.provider_documents += len(documents_list)
+        self.provider_chars += sum(len(text) for text in documents_list)
+        if not chunking_config["enabled"]:
+            return await cohere_reranker.rerank_scores(query, documents_list, top_n)
+        return await rerank_in_chunks(
+            cohere_reranker.rerank_scores,
+            query,
+            documents_list,
+            top_n,
+            chunk_size=chunking_config["chunk_size"],
+            semaphore=rerank_semaphore,
+        )
+
     @async_error_handler_with_fallback(
-        fallback=default_fallback_data_ids, retries=3, delay=3
+        fallback=default_fallback_data_ids,
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
     )
     async def rerank_get_ids(
         self, query: str, documents: dict, top_n: int
@@ -29,6 +122,15 @@ class RerankService:
         Ranks the provided documents based on their relevance to the input query and returns the top N document
         indices with their relevance scores.
 
+        With the cascade policy, the retrieval scores of the documents decide whether they are
+        returned as retrieved with their retrieval scores (skip, the request is flagged as not
+        reranked), whether only the ambiguous
+        window around the top_n boundary is reranked, or whether every document is. Document
+        texts are normalized and clipped to the configured character budget. When the cache is
+        enabled, scores are looked up by (query, document) pair and only the documents without
+        a cached score are sent to the provider. Large candidate lists are split in chunks
+        reranked concurrently and merged on relevance score.
+
         Args:
             query (str): The search query string used to rank the documents.
             documents (dict): A dictionary containing a list of documents under the key "docs". Each document is
@@ -39,16 +141,66 @@ class RerankService:
             List[Tuple[int, float]]: A list of tuples, each containing the index of a top-ranked document and its
             corresponding relevance score.
         """
-        documents_list = [
-            " ".join(str(doc.get(col, "")) for col in columns_to_rerank)
-            for doc in documents["docs"]
-        ]
+        docs = documents["docs"]
+        positions = None
+        if rerank_cascade is not None:
+            decision, positions = rerank_cascade.decide(
+                [doc.get("score") for doc in docs], top_n
+            )
+            if decision == SKIP:
+                mark_not_reranked("cascade_skip")
+                return [(int(i), float(docs[i]["score"])) for i in positions]
+            if decision == WINDOW:
+                docs = [docs[i] for i in positions]
+        documents_list = document_preparer.prepare(docs)
         logger.debug(documents_list)
-        res = await cohere_reranker.rerank(query, documents_list, top_n)
-        return [(r.index, r.relevance_score) for r in res.results]
+        results = await self._rank_texts(query, documents_list, top_n)
+        if positions is not None:
+            return [(int(positions[i]), score) for i, score in results]
+        return results
+
+    async def _rank_texts(
+        self, query: str, documents_list: List[str], top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Scores document texts, from the cache when enabled and from the provider otherwise.
+
+        Args:
+            query (str): search query
+            documents_list (List[str]): prepared document texts
+            top_n (int): number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: top_n (index in documents_list, score) pairs by decreasing
+            score
+        """
+        if rerank_cache is None:
+            return await self._provider_rerank(query, documents_list, top_n)
+        scores = rerank_cache.get_many(query, documents_list)
+        # only the documents without a cached score are sent, each distinct text once
+        missing = list(
+            dict.fromkeys(
+                text
+                for text, score in zip(documents_list, scores, strict=True)
+                if score is None
+            )
+        )
+        if missing:
+            results = await self._provider_rerank(query, missing, len(missing))
+            new_scores = {missing[index]: score for index, score in results}
+            rerank_cache.put_many(query, list(new_scores), list(new_scores.values()))
+            scores = [
+                new_scores[text] if score is None else score
+                for text, score in zip(documents_list, scores, strict=True)
+            ]
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [(i, scores[i]) for i in ranked[:top_n]]
 
     @async_error_handler_with_fallback(
-        fallback=default_fallback_data_docs, retries=3, delay=3
+        fallback=default_fallback_data_docs,
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
     )
     async def rerank(
         self, query: str, documents: dict, top_n: int
@@ -67,3 +219,77 @@ class RerankService:
         results = await self.rerank_get_ids(query, documents, top_n)
         ranked_ids = [x[0] for x in results]
         return [documents["docs"][i] for i in ranked_ids]
+
+    async def rerank_product_ids(
+        self, query: str, product_ids: List[int], top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Ranks catalog products by relevance to the query, reading their texts from the
+        product text store instead of receiving the documents.
+
+        Args:
+            query (str): The search query string used to rank the products.
+            product_ids (List[int]): ids of the candidate products.
+            top_n (int): The number of top-ranked products to return.
+
+        The stored texts have no ratings, so the popularity fallback of rerank_get_ids would
+        only echo the request order: a failed rerank is raised instead, letting the caller
+        fall back to its own ranking.
+
+        Raises:
+            ProductTextStoreUnavailable: if no product text store is loaded
+            UnknownProductError: if some product ids are not in the store
+            RerankUnavailable: if the products could not be reranked, retries included
+
+        Returns:
+            List[Tuple[int, float]]: product id and relevance score of the top_n products,
+            by decreasing relevance.
+        """
+        if product_text_store is None:
+            raise ProductTextStoreUnavailable(
+                "No product text store found at PRODUCT_TEXT_STORE_PATH"
+            )
+        unknown_ids = product_text_store.unknown_ids(product_ids)
+        if unknown_ids:
+            raise UnknownProductError(f"Unknown product ids: {unknown_ids[:10]}")
+        docs = product_text_store.docs(product_ids)
+        results = await self._rerank_stored_docs(query, {"docs": docs}, top_n)
+        if results is None:
+            raise RerankUnavailable("The products could not be reranked")
+        return [(product_ids[i], score) for i, score in results]
+
+    @async_error_handler_with_fallback(
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
+    )
+    async def _rerank_stored_docs(
+        self, query: str, documents: dict, top_n: int
+    ) -> Optional[List[Tuple[int, float]]]:
+        # rerank_get_ids runs nested in this call, so it retries here and returns None
+        # instead of its popularity fallback
+        return await self.rerank_get_ids(query, documents, top_n)
+
+    def stats(self) -> dict:
+        """Collects the runtime counters of the rerank pipeline.
+
+        Returns:
+            dict: counters per component
+        """
+        return {
+            "circuit_breakers": circuit_breaker_stats(),
+            "fallbacks": fallback_metrics.stats(),
+            "cache": rerank_cache.stats() if rerank_cache else None,
+            "document_preparation": document_preparer.stats(),
+            "cascade": rerank_cascade.stats() if rerank_cascade else None,
+            "payload": {
+                "requests": self.provider_requests,
+                "documents": self.provider_documents,
+                "chars": self.provider_chars,
+                "mean_chars_per_document": (
+                    self.provider_chars / self.provider_documents
+                    if self.provider_documents
+                    else 0.0
+                ),
+            },
+        }
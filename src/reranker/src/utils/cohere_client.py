@@ -0,0 +1,100 @@
+import asyncio
+import importlib.util
+import os
+import weakref
+from typing import Optional
+
+import cohere
+import httpx
+
+from .load_config import load_config
+
+config = load_config()
+provider_config = config["provider"]
+
+COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, cohere.AsyncClientV2]" = weakref.WeakKeyDictionary()
+
+
+def build_async_client(
+    api_key: Optional[str],
+    base_url: Optional[str] = None,
+    timeout_s: float = 10,
+    connect_timeout_s: float = 2,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry_s: float = 30,
+    http2: bool = True,
+) -> cohere.AsyncClientV2:
+    """Builds a natively async Cohere client on top of a tuned httpx connection pool.
+
+    Args:
+        api_key (Optional[str]): Cohere API key.
+        base_url (Optional[str], optional): API base url, e.g. a local stub server. If None, the
+        Cohere production environment is used. Defaults to None.
+        timeout_s (float, optional): default request timeout. Defaults to 10.
+        connect_timeout_s (float, optional): connection establishment timeout. Defaults to 2.
+        max_connections (int, optional): maximum number of concurrent connections. Defaults to 100.
+        max_keepalive_connections (int, optional): idle connections kept alive for reuse.
+        Defaults to 20.
+        keepalive_expiry_s (float, optional): time an idle connection is kept. Defaults to 30.
+        http2 (bool, optional): negotiate HTTP/2 when the h2 package is installed. Defaults to True.
+
+    Returns:
+        cohere.AsyncClientV2: the async client
+    """
+    httpx_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        ),
+        timeout=httpx.Timeout(timeout_s, connect=connect_timeout_s),
+        http2=http2 and importlib.util.find_spec("h2") is not None,
+    )
+    return cohere.AsyncClientV2(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout_s,
+        httpx_client=httpx_client,
+    )
+
+
+def get_cohere_client() -> cohere.AsyncClientV2:
+    """Returns the shared async Cohere client of the running event loop, creating it on first
+    use. Connection pools are bound to an event loop, so each loop gets its own client.
+
+    Returns:
+        cohere.AsyncClientV2: the shared async client
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = build_async_client(
+            api_key=COHERE_API_KEY,
+            base_url=provider_config["base_url"] or os.getenv("CO_API_URL"),
+            timeout_s=provider_config["timeout_s"],
+            connect_timeout_s=provider_config["connect_timeout_s"],
+            max_connections=provider_config["max_connections"],
+            max_keepalive_connections=provider_config["max_keepalive_connections"],
+            keepalive_expiry_s=provider_config["keepalive_expiry_s"],
+            http2=provider_config["http2"],
+        )
+        _clients[loop] = client
+    return client
+
+
+def request_options(timeout_s: float) -> dict:
+    """Builds the per-call Cohere request options.
+
+    Args:
+        timeout_s (float): timeout of the call
+
+    Returns:
+        dict: request options with the call timeout and the configured provider retries
+    """
+    return {
+        "timeout_in_seconds": timeout_s,
+        "max_retries": provider_config["max_retries"],
+    }
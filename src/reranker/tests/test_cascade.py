@@ -0,0 +1,38 @@
+from src.reranker.src.app.core.cascade import RerankCascade
+
+
+class TestRerankCascade:
+    """Test suite for the score-gap rerank cascade."""
+
+    def test_skip_on_large_gap(self):
+        """Test that a clearly separated top_n is returned without reranking."""
+        cascade = RerankCascade(skip_gap=0.5)
+        decision, positions = cascade.decide([0.2, 0.9, 0.15, 0.95, 0.1], top_n=2)
+        assert decision == "skip"
+        assert positions.tolist() == [3, 1]
+
+    def test_window_around_the_boundary(self):
+        """Test that only the candidates close to the top_n-th score are reranked."""
+        cascade = RerankCascade(skip_gap=0.5, window_gap=0.2)
+        scores = [1.0, 0.8, 0.75, 0.7, 0.3, 0.2, 0.1, 0.0]
+        decision, positions = cascade.decide(scores, top_n=2)
+        assert decision == "window"
+        assert positions.tolist() == [0, 1, 2, 3]
+
+    def test_full_rerank_on_flat_or_missing_scores(self):
+        """Test that flat, missing or too few scores fall through to a full rerank."""
+        cascade = RerankCascade(window_gap=0.2, max_window_ratio=0.8)
+        assert cascade.decide([0.5, 0.5, 0.5], top_n=1) == ("full", None)
+        assert cascade.decide([1.0, 0.95, 0.9, 0.85, 0.0], 1) == ("full", None)
+        assert cascade.decide([1.0, None, 0.5], top_n=1) == ("full", None)
+        assert cascade.decide([1.0, 0.5], top_n=2) == ("full", None)
+
+    def test_stats(self):
+        """Test the decision counters and the reranked share."""
+        cascade = RerankCascade(skip_gap=0.5, window_gap=0.2)
+        cascade.decide([0.95, 0.1, 0.0, 0.05], top_n=1)
+        cascade.decide([0.5, 0.5], top_n=1)
+
+        stats = cascade.stats()
+        assert stats["decisions"] == {"skip": 1, "window": 0, "full": 1}
+        assert stats["candidates"] == 6 and stats["reranked"] == 2
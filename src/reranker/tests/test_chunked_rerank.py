@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.reranker.src.app.core.chunked_rerank import merge_ranked, rerank_in_chunks
+
+
+class FakeReranker:
+    """Scores documents by their numeric value and tracks the calls in flight."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def __call__(self, query, documents, top_n):
+        self.calls.append(list(documents))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_on in documents:
+                raise ConnectionError("provider down")
+            ranked = sorted(
+                enumerate(float(doc) for doc in documents),
+                key=lambda result: result[1],
+                reverse=True,
+            )
+            return ranked[:top_n]
+        finally:
+            self.in_flight -= 1
+
+
+def test_merge_ranked():
+    """Test the k-way merge of sorted chunk rankings."""
+    merged = merge_ranked([[(0, 0.9), (1, 0.2)], [(2, 0.5)], [(3, 0.95)]], top_n=3)
+    assert merged == [(3, 0.95), (0, 0.9), (2, 0.5)]
+
+
+class TestRerankInChunks:
+    """Test suite for the chunked rerank fan-out."""
+
+    def test_global_top_n_with_original_indexes(self):
+        """Test that chunk results are mapped back and merged into the global ranking."""
+        documents = [str(value) for value in (3, 9, 1, 7, 8, 2, 6)]
+        reranker = FakeReranker()
+
+        results = asyncio.run(
+            rerank_in_chunks(reranker, "q", documents, top_n=3, chunk_size=3)
+        )
+
+        assert results == [(1, 9.0), (4, 8.0), (3, 7.0)]
+        assert [len(call) for call in reranker.calls] == [3, 3, 1]
+
+    def test_small_lists_are_sent_at_once(self):
+        """Test that lists within the chunk size need a single request."""
+        reranker = FakeReranker()
+        results = asyncio.run(rerank_in_chunks(reranker, "q", ["1", "2"], 1, 10))
+        assert results == [(1, 2.0)]
+        assert len(reranker.calls) == 1
+
+    def test_concurrency_is_capped(self):
+        """Test that the semaphore bounds the chunks in flight."""
+        reranker = FakeReranker()
+
+        async def main():
+            return await rerank_in_chunks(
+                reranker,
+                "q",
+                [str(value) for value in range(20)],
+                top_n=20,
+                chunk_size=2,
+                semaphore=asyncio.Semaphore(3),
+            )
+
+        results = asyncio.run(main())
+        assert [index for index, _ in results] == list(range(19, -1, -1))
+        assert reranker.max_in_flight == 3
+
+    def test_failed_chunk_fails_the_call(self):
+        """Test that the error of a chunk is raised."""
+        reranker = FakeReranker(fail_on="4")
+        with pytest.raises(ConnectionError):
+            asyncio.run(
+                rerank_in_chunks(
+                    reranker, "q", [str(value) for value in range(6)], 2, 2
+                )
+            )
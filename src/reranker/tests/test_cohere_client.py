@@ -0,0 +1,64 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.reranker.src.utils.cohere_client import build_async_client
+
+
+class StubCohereHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Cohere v2 rerank endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        results = sorted(
+            (
+                {"index": i, "relevance_score": len(doc) / 100}
+                for i, doc in enumerate(body["documents"])
+            ),
+            key=lambda r: r["relevance_score"],
+            reverse=True,
+        )[: body["top_n"]]
+        payload = json.dumps({"id": "stub", "results": results}).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server():
+    """Run the stub Cohere server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCohereHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_rerank_against_stub_server(stub_server):
+    """Test that the async client reranks through the pooled httpx client."""
+    client = build_async_client(api_key="test", base_url=stub_server, http2=False)
+
+    response = asyncio.run(
+        client.rerank(
+            model="rerank-v3.5",
+            query="chair",
+            documents=["a", "ccc", "bb"],
+            top_n=2,
+            request_options={"timeout_in_seconds": 1, "max_retries": 0},
+        )
+    )
+
+    assert [(r.index, r.relevance_score) for r in response.results] == [
+        (1, 0.03),
+        (2, 0.02),
+    ]
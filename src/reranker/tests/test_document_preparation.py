@@ -0,0 +1,59 @@
+from src.reranker.src.app.core.document_preparation import (
+    DocumentPreparer,
+    clip,
+    normalize_text,
+)
+
+COLUMNS = ["product_name", "product_description"]
+
+
+def test_normalize_text():
+    """Test that tags, entities and repeated whitespace are removed."""
+    text = normalize_text("  soft <b>velvet</b>&amp;\n\tlinen<br/>pillow ")
+    assert text == "soft velvet & linen pillow"
+
+
+def test_clip_at_word_boundary():
+    """Test that texts are clipped on whole words, or hard clipped for a single word."""
+    assert clip("turquoise velvet pillow", 17) == "turquoise velvet"
+    assert clip("turquoise velvet pillow", 16) == "turquoise velvet"
+    assert clip("turquoise", 4) == "turq"
+    assert clip("pillow", 10) == "pillow"
+
+
+class TestDocumentPreparer:
+    """Test suite for the preparation of the reranked texts."""
+
+    def test_name_kept_and_description_clipped(self):
+        """Test that the budget only clips the lower priority columns."""
+        preparer = DocumentPreparer(COLUMNS, max_chars=30)
+        doc = {
+            "product_name": "turquoise velvet pillow",
+            "product_description": "a soft pillow for your sofa",
+        }
+
+        assert preparer.prepare_text(doc) == "turquoise velvet pillow a soft"
+        long_name = {"product_name": "x" * 40, "product_description": "soft"}
+        assert preparer.prepare_text(long_name) == "x" * 40
+        assert preparer.stats()["truncated"] == 2
+
+    def test_missing_fields(self):
+        """Test that missing values are skipped instead of sent as text."""
+        preparer = DocumentPreparer(COLUMNS, max_chars=10)
+        assert preparer.prepare_text({"product_name": "sofa"}) == "sofa"
+        doc = {"product_name": None, "product_description": "large grey sofa"}
+        assert preparer.prepare_text(doc) == "large grey"
+
+    def test_texts_cached_by_product_id(self):
+        """Test that the texts of known products are reused."""
+        preparer = DocumentPreparer(COLUMNS, cache_size=1)
+        doc = {"product_id": 7, "product_name": "sofa", "product_description": "grey"}
+
+        assert preparer.prepare([doc, doc, {"product_name": "bed"}]) == [
+            "sofa grey",
+            "sofa grey",
+            "bed",
+        ]
+        stats = preparer.stats()
+        assert stats["documents"] == 3 and stats["cache_hits"] == 1
+        assert stats["mean_prepared_chars"] == 6
@@ -0,0 +1,91 @@
+import sqlite3
+
+from src.reranker.src.app.core.rerank_cache import RerankScoreCache
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRerankScoreCache:
+    """Test suite for the per (query, document) rerank score cache."""
+
+    def test_partial_hits_on_overlapping_candidates(self):
+        """Test that only the documents not scored before are misses."""
+        cache = RerankScoreCache("rerank-v3.5")
+        cache.put_many("blue sofa", ["sofa a", "sofa b"], [0.9, 0.4])
+
+        scores = cache.get_many("  Blue   SOFA ", ["sofa b", "sofa c", "sofa a"])
+
+        assert scores == [0.4, None, 0.9]
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    def test_key_depends_on_model_and_query(self):
+        """Test that scores are not shared across models or queries."""
+        cache = RerankScoreCache("rerank-v3.5")
+        other_model = RerankScoreCache("rerank-v4")
+        assert cache.keys("sofa", ["a"]) != other_model.keys("sofa", ["a"])
+        assert cache.keys("sofa", ["a"]) != cache.keys("chair", ["a"])
+
+    def test_lru_and_ttl_eviction(self, monkeypatch):
+        """Test that entries are evicted by size and by age."""
+        clock = FakeTime()
+        monkeypatch.setattr("time.time", clock)
+        cache = RerankScoreCache("m", max_size=2, ttl_seconds=60)
+        cache.put_many("q", ["a", "b"], [1.0, 2.0])
+        cache.get_many("q", ["a"])
+        cache.put_many("q", ["c"], [3.0])
+        assert cache.get_many("q", ["a", "b", "c"]) == [1.0, None, 3.0]
+
+        clock.now += 61
+        assert cache.get_many("q", ["a", "c"]) == [None, None]
+
+    def test_disk_tier_is_shared(self, tmp_path):
+        """Test that a second cache on the same file reuses the stored scores."""
+        path = str(tmp_path / "rerank_cache.sqlite")
+        first = RerankScoreCache("m", disk_path=path)
+        first.put_many("q", ["a", "b"], [0.5, 0.25])
+        first.flush()
+
+        cache = RerankScoreCache("m", disk_path=path)
+        assert cache.get_many("q", ["b", "a", "z"]) == [0.25, 0.5, None]
+        assert cache.stats()["disk_hits"] == 2
+        assert cache.get_many("q", ["a"]) == [0.5]
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_disk_hit_keeps_the_stored_expiry(self, tmp_path, monkeypatch):
+        """Test that a score warmed from disk expires when it was stored to."""
+        clock = FakeTime()
+        monkeypatch.setattr("time.time", clock)
+        path = str(tmp_path / "rerank_cache.sqlite")
+        first = RerankScoreCache("m", ttl_seconds=60, disk_path=path)
+        first.put_many("q", ["a"], [0.5])
+        first.flush()
+
+        cache = RerankScoreCache("m", ttl_seconds=60, disk_path=path)
+        clock.now += 50
+        assert cache.get_many("q", ["a"]) == [0.5]
+        clock.now += 11
+        assert cache.get_many("q", ["a"]) == [None]
+
+    def test_expired_disk_rows_are_purged(self, tmp_path, monkeypatch):
+        """Test that the writer deletes the expired rows of the disk tier."""
+        clock = FakeTime()
+        monkeypatch.setattr("time.time", clock)
+        path = str(tmp_path / "rerank_cache.sqlite")
+        cache = RerankScoreCache(
+            "m", ttl_seconds=60, disk_path=path, purge_interval_s=60
+        )
+        cache.put_many("q", ["a", "b"], [0.5, 0.25])
+        cache.flush()
+        clock.now += 61
+        cache.put_many("q", ["c"], [0.75])
+        cache.flush()
+
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute("SELECT COUNT(*) FROM rerank_scores").fetchone()
+        assert rows == (1,)
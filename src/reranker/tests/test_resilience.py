@@ -0,0 +1,30 @@
+import asyncio
+
+from src.reranker.src.app.core.resilience import (
+    mark_not_reranked,
+    request_status_scope,
+)
+
+
+def test_not_reranked_flag_is_shared_with_tasks():
+    """Test that a request ranked without the reranker is flagged, from spawned tasks too."""
+
+    async def skipped_rerank():
+        mark_not_reranked("cascade_skip")
+
+    async def main():
+        with request_status_scope() as status:
+            await asyncio.gather(skipped_rerank())
+        return status
+
+    status = asyncio.run(main())
+    assert not status.reranked
+    assert status.reasons == ["cascade_skip"]
+
+
+def test_requests_are_reranked_by_default():
+    """Test that the flag is only cleared inside its own scope."""
+    mark_not_reranked("fallback")
+    with request_status_scope() as status:
+        pass
+    assert status.reranked and status.reasons == []
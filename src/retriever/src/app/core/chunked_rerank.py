@@ -0,0 +1,74 @@
+import asyncio
+import heapq
+from itertools import islice
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+# rerank(query, documents, top_n) -> [(index in documents, relevance score)] by decreasing score
+RerankFunction = Callable[[str, List[str], int], Awaitable[List[Tuple[int, float]]]]
+
+
+def merge_ranked(
+    chunk_results: Sequence[List[Tuple[int, float]]], top_n: int
+) -> List[Tuple[int, float]]:
+    """K-way merge of per chunk rankings into a global ranking.
+
+    Args:
+        chunk_results (Sequence[List[Tuple[int, float]]]): (index, score) pairs of each chunk,
+        by decreasing score, with indexes already mapped to the full candidate list
+        top_n (int): number of results to keep
+
+    Returns:
+        List[Tuple[int, float]]: top_n (index, score) pairs by decreasing score
+    """
+    merged = heapq.merge(*chunk_results, key=lambda result: -result[1])
+    return list(islice(merged, top_n))
+
+
+async def rerank_in_chunks(
+    rerank: RerankFunction,
+    query: str,
+    documents: List[str],
+    top_n: int,
+    chunk_size: int,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> List[Tuple[int, float]]:
+    """Reranks documents in chunks of at most chunk_size documents, sent concurrently.
+
+    Relevance scores do not depend on the other documents of a request, so each chunk only
+    needs its own top_n and the global top_n is a merge of the chunk rankings. When a chunk
+    fails, the other chunks are cancelled and the error is raised.
+
+    Args:
+        rerank (RerankFunction): reranks one chunk
+        query (str): search query
+        documents (List[str]): document texts
+        top_n (int): number of results to return
+        chunk_size (int): maximum number of documents per request
+        semaphore (Optional[asyncio.Semaphore], optional): caps the number of chunks in flight,
+        shared by every request. If None, every chunk is sent at once. Defaults to None.
+
+    Returns:
+        List[Tuple[int, float]]: top_n (index in documents, score) pairs by decreasing score
+    """
+    if len(documents) <= chunk_size:
+        return (await rerank(query, documents, top_n))[:top_n]
+
+    async def rerank_chunk(start: int) -> List[Tuple[int, float]]:
+        chunk = documents[start : start + chunk_size]
+        if semaphore is None:
+            results = await rerank(query, chunk, min(top_n, len(chunk)))
+        else:
+            async with semaphore:
+                results = await rerank(query, chunk, min(top_n, len(chunk)))
+        return [(start + index, score) for index, score in results]
+
+    tasks = [
+        asyncio.ensure_future(rerank_chunk(start))
+        for start in range(0, len(documents), chunk_size)
+    ]
+    try:
+        chunk_results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return merge_ranked(chunk_results, top_n)
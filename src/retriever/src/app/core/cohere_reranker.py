@@ -0,0 +1,47 @@
+from typing import List, Tuple
+
+from utils import get_cohere_client, load_config, request_options
+
+from .resilience import get_circuit_breaker
+
+config = load_config()
+circuit_breaker_config = config["resilience"]["circuit_breaker"]
+
+
+class CohereReranker:
+    """Class that provides an asynchronous interface for reranking documents using the Cohere API."""
+
+    def __init__(self, model: str, timeout_s: float = 5):
+        """Initializes the reranker with the shared circuit breaker of the rerank provider.
+
+        Args:
+            model (str): Cohere rerank model
+            timeout_s (float, optional): timeout of a rerank request. Defaults to 5.
+        """
+        self.model = model
+        self.timeout_s = timeout_s
+        self.breaker = get_circuit_breaker("cohere_rerank", **circuit_breaker_config)
+
+    async def rerank_scores(
+        self, query: str, documents: List[str], top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Re-ranks documents and returns their indexes and relevance scores.
+
+        Args:
+            query (str): The search query to rank documents against.
+            documents (List[str]): A list of documents to be re-ranked.
+            top_n (int): The number of top-ranked documents to return.
+
+        Returns:
+            List[Tuple[int, float]]: (index in documents, relevance score) of the top_n documents,
+            sorted by relevance in descending order.
+        """
+        res = await self.breaker.call(
+            get_cohere_client().rerank,
+            model=self.model,
+            query=query,
+            documents=documents,
+            top_n=top_n,
+            request_options=request_options(self.timeout_s),
+        )
+        return [(r.index, r.relevance_score) for r in res.results]
@@ -0,0 +1,78 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+from ..exceptions import StageTimeoutError
+from .resilience import stage_deadline_scope
+
+
+class CPUWorkerPool:
+    """Dedicated thread pool for the CPU-bound retrieval stages.
+
+    Sparse products, NumPy reductions and FAISS searches release the GIL, so running them here
+    keeps the event loop free to serve other requests and to keep network calls in flight.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initializes the pool.
+
+        Args:
+            max_workers (Optional[int], optional): number of worker threads. If None, uses the
+            ThreadPoolExecutor default. Defaults to None.
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # created lazily so every forked worker process owns its threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="retrieval-cpu"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs a blocking function in the pool without blocking the event loop.
+
+        Args:
+            func (Callable[..., Any]): function to run
+            *args: positional arguments of func
+            **kwargs: keyword arguments of func
+
+        Returns:
+            Any: the result of func
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        """Waits for the running tasks and releases the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+async def run_stage(
+    awaitable: Awaitable, timeout_s: Optional[float], stage: str
+) -> Any:
+    """Awaits a retrieval stage within its time budget.
+
+    Args:
+        awaitable (Awaitable): the stage coroutine or future
+        timeout_s (Optional[float]): time budget in seconds, None for no limit
+        stage (str): stage name, used in the error message
+
+    Raises:
+        StageTimeoutError: if the stage does not finish in time
+
+    Returns:
+        Any: the result of the stage
+    """
+    try:
+        with stage_deadline_scope(timeout_s):
+            return await asyncio.wait_for(awaitable, timeout=timeout_s)
+    except asyncio.TimeoutError as e:
+        raise StageTimeoutError(f"{stage} stage exceeded {timeout_s}s") from e
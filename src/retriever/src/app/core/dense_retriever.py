@@ -1,44 +1,321 @@
 import asyncio
-import os
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
-import cohere
+import faiss
 import numpy as np
-from utils import load_config
+from utils import get_cohere_client, load_config, request_options
 
 from ..utils import faiss_connection
 from .base_model import RetrievalBase
+from .embedding_batcher import EmbeddingMicroBatcher
+from .embedding_cache import QueryEmbeddingCache
+from .hedging import RequestHedger
+from .resilience import get_circuit_breaker
 
 config = load_config()
 cohere_model = config["retrievers"]["dense"]["model"]
 max_tokens = config["retrievers"]["dense"]["max_tokens"]
+# texts per embed request, below the provider limit of 96
+MAX_EMBED_BATCH = config["retrievers"]["dense"]["max_processing_batch"]
 output_dim = config["retrievers"]["dense"]["output_dim"]
-
-
-COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-co = cohere.ClientV2(COHERE_API_KEY)
+index_config = config["retrievers"]["dense"]["index"]
+ARTIFACTS_MMAP = config["artifacts"]["mmap"]
+query_cache_config = config["retrievers"]["dense"]["query_cache"]
+query_batching_config = config["retrievers"]["dense"]["query_batching"]
+hedging_config = config["retrievers"]["dense"]["hedging"]
+QUERY_EMBED_TIMEOUT_S = config["provider"]["query_embed_timeout_s"]
+circuit_breaker_config = config["resilience"]["circuit_breaker"]
+# filters selecting at most 1 / ID_SELECTOR_BATCH_RATIO of the products use an id set
+ID_SELECTOR_BATCH_RATIO = 32
 
 
 class DenseRetriever(RetrievalBase):
     def __init__(self):
         """Initializes the DenseRetriever with the specified similarity method."""
-        self.index = faiss_connection.load_index()
+        self.index = faiss_connection.load_index(mmap=ARTIFACTS_MMAP)
+        self.index_metadata = faiss_connection.load_index_metadata()
+        self._set_search_params()
+        self.embed_breaker = get_circuit_breaker(
+            "cohere_embed", **circuit_breaker_config
+        )
+        self.query_cache = (
+            QueryEmbeddingCache(
+                model=cohere_model,
+                output_dim=output_dim,
+                max_tokens=max_tokens,
+                max_size=query_cache_config["max_size"],
+                ttl_seconds=query_cache_config["ttl_seconds"],
+                disk_path=query_cache_config["disk_path"],
+            )
+            if query_cache_config["enabled"]
+            else None
+        )
+        self.embed_hedger = (
+            RequestHedger(
+                window=hedging_config["window"],
+                quantile=hedging_config["quantile"],
+                min_samples=hedging_config["min_samples"],
+                min_delay_s=hedging_config["min_delay_ms"] / 1000,
+            )
+            if hedging_config["enabled"]
+            else None
+        )
+        self.query_batcher = (
+            EmbeddingMicroBatcher(
+                self.embed_texts,
+                max_batch_size=query_batching_config["max_batch_size"],
+                max_wait_ms=query_batching_config["max_wait_ms"],
+            )
+            if query_batching_config["enabled"]
+            else None
+        )
+
+    def _set_search_params(self) -> None:
+        """Applies the approximate search parameters (nprobe for IVF indexes, efSearch for
+        HNSW) to the loaded index. Values in the config take precedence over the ones saved
+        in the index metadata at build time.
+        """
+        search_params = {
+            **self.index_metadata.get("search_params", {}),
+            **{
+                key: index_config[key]
+                for key in ("nprobe", "ef_search")
+                if index_config.get(key) is not None
+            },
+        }
+        index_type = self.index_metadata.get("type", "flat")
+        parameter_space = faiss.ParameterSpace()
+        if index_type in ("ivf_flat", "ivf_pq", "opq_ivf_pq"):
+            if "nprobe" in search_params:
+                parameter_space.set_index_parameter(
+                    self.index, "nprobe", search_params["nprobe"]
+                )
+            # needed to reconstruct candidate vectors from the inverted lists
+            faiss.extract_index_ivf(self.index).make_direct_map()
+        elif index_type == "hnsw" and "ef_search" in search_params:
+            parameter_space.set_index_parameter(
+                self.index, "efSearch", search_params["ef_search"]
+            )
 
     async def get_embeddings_async(self, texts: List[str]):
-        """Run async embeddings request.
+        """Run async embeddings request, hedged when enabled.
 
         Args:
             texts (List[str]): texts to be embedded
         """
-        return await asyncio.to_thread(
-            co.embed,
+        if self.embed_hedger is None:
+            return await self._request_embeddings(texts)
+        return await self.embed_hedger.call(self._request_embeddings, texts)
+
+    async def _request_embeddings(self, texts: List[str]):
+        """Sends one embeddings request through the circuit breaker of the embedding provider.
+
+        Args:
+            texts (List[str]): texts to be embedded
+        """
+        return await self.embed_breaker.call(
+            get_cohere_client().embed,
             texts=texts,
             input_type="search_document",
             model=cohere_model,
             max_tokens=max_tokens,
             output_dimension=output_dim,
             embedding_types=["float"],
+            request_options=request_options(QUERY_EMBED_TIMEOUT_S),
+        )
+
+    async def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embeds a list of texts in a single request and L2-normalizes each row.
+
+        Args:
+            texts (List[str]): texts to be embedded
+
+        Returns:
+            np.ndarray: matrix with one normalized embedding per text
+        """
+        response = await self.get_embeddings_async(texts)
+        embeddings = np.array(response.embeddings.float_, dtype=np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    async def embed_query(self, query: str) -> np.ndarray:
+        """Embeds a query and L2-normalizes it so inner products against the index are
+        cosine similarities. Embeddings are served from the query cache when enabled, and
+        concurrent misses are grouped into one request by the query batcher.
+
+        Args:
+            query (str): The input query string to be embedded.
+
+        Returns:
+            np.ndarray: The normalized query embedding.
+        """
+        if self.query_cache is not None:
+            cached_embedding = self.query_cache.get(query)
+            if cached_embedding is not None:
+                return cached_embedding
+        if self.query_batcher is not None:
+            norm_query_embedding = await self.query_batcher.embed(query)
+        else:
+            norm_query_embedding = (await self.embed_texts([query]))[0]
+        if self.query_cache is not None:
+            self.query_cache.put(query, norm_query_embedding)
+        return norm_query_embedding
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeds several queries, serving cached ones from the query cache and embedding the
+        misses in concurrent requests of at most max_processing_batch texts.
+
+        Args:
+            queries (List[str]): The input query strings.
+
+        Returns:
+            np.ndarray: matrix with one normalized embedding per query
+        """
+        embeddings = np.zeros((len(queries), output_dim), dtype=np.float32)
+        missing = []
+        for position, query in enumerate(queries):
+            cached_embedding = (
+                self.query_cache.get(query) if self.query_cache is not None else None
+            )
+            if cached_embedding is None:
+                missing.append(position)
+            else:
+                embeddings[position] = cached_embedding
+        if missing:
+            missing_queries = list(dict.fromkeys(queries[i] for i in missing))
+            missing_embeddings = np.concatenate(
+                await asyncio.gather(
+                    *(
+                        self.embed_texts(
+                            missing_queries[start : start + MAX_EMBED_BATCH]
+                        )
+                        for start in range(0, len(missing_queries), MAX_EMBED_BATCH)
+                    )
+                )
+            )
+            rows = dict(zip(missing_queries, missing_embeddings, strict=True))
+            for position in missing:
+                embeddings[position] = rows[queries[position]]
+            if self.query_cache is not None:
+                for query, embedding in rows.items():
+                    self.query_cache.put(query, embedding)
+        return embeddings
+
+    def _search_parameters(
+        self, allowed: Optional[np.ndarray]
+    ) -> Tuple[Optional[faiss.SearchParameters], Optional[np.ndarray]]:
+        """Builds the FAISS search parameters restricting the search to the allowed products.
+
+        Small selections use an IDSelectorBatch (hash set of ids), larger ones an
+        IDSelectorBitmap over the packed mask. The approximate search parameters of the index
+        (nprobe, efSearch) are carried over, since per-call parameters replace them.
+
+        Args:
+            allowed (Optional[np.ndarray]): boolean mask over the index products, None for no
+            restriction.
+
+        Returns:
+            Tuple[Optional[faiss.SearchParameters], Optional[np.ndarray]]: the parameters and the
+            buffer the selector points to, which must outlive the search.
+        """
+        if allowed is None:
+            return None, None
+        allowed_ids = np.flatnonzero(allowed)
+        if allowed_ids.shape[0] * ID_SELECTOR_BATCH_RATIO <= allowed.shape[0]:
+            buffer = allowed_ids.astype(np.int64)
+            selector = faiss.IDSelectorBatch(buffer.shape[0], faiss.swig_ptr(buffer))
+        else:
+            buffer = np.packbits(allowed, bitorder="little")
+            selector = faiss.IDSelectorBitmap(allowed.shape[0], faiss.swig_ptr(buffer))
+        index_type = self.index_metadata.get("type", "flat")
+        if index_type in ("ivf_flat", "ivf_pq", "opq_ivf_pq"):
+            params = faiss.SearchParametersIVF(
+                sel=selector, nprobe=faiss.extract_index_ivf(self.index).nprobe
+            )
+        elif index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(
+                sel=selector, efSearch=faiss.downcast_index(self.index).hnsw.efSearch
+            )
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        return params, buffer
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Searches the index for the k nearest products of several queries at once.
+
+        Args:
+            query_embeddings (np.ndarray): Normalized query embeddings, one per row.
+            k (int): Number of neighbours to return per query.
+            allowed (Optional[np.ndarray], optional): boolean mask of the products that can be
+            returned, applied inside the search. Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (queries x k) similarity scores and product indices.
+            Empty slots are marked with index -1.
+        """
+        params, _buffer = self._search_parameters(allowed)
+        return self.index.search(
+            np.ascontiguousarray(query_embeddings), k=k, params=params
+        )
+
+    def search(
+        self, query_embedding: np.ndarray, k: int, allowed: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Searches the index for the k nearest products to an already embedded query.
+
+        Args:
+            query_embedding (np.ndarray): Normalized query embedding.
+            k (int): Number of neighbours to return.
+            allowed (Optional[np.ndarray], optional): boolean mask of the products that can be
+            returned, applied inside the search. Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Similarity scores and product indices. Empty slots
+            returned by FAISS (index -1) are dropped.
+        """
+        params, _buffer = self._search_parameters(allowed)
+        distances, idxs = self.index.search(
+            query_embedding[None, :], k=k, params=params
         )
+        found = idxs[0] >= 0
+        return distances[0][found], idxs[0][found]
+
+    def score_all(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Computes the similarity between an already embedded query and every product,
+        aligned with the index positions.
+
+        Args:
+            query_embedding (np.ndarray): Normalized query embedding.
+
+        Returns:
+            np.ndarray: Similarity scores of every product, zero for products FAISS did not return.
+        """
+        distances, idxs = self.search(query_embedding, k=self.index.ntotal)
+        scores = np.zeros(self.index.ntotal, dtype=np.float32)
+        scores[idxs] = distances
+        return scores
+
+    def score_candidates(
+        self, query_embedding: np.ndarray, candidate_ids: np.ndarray
+    ) -> np.ndarray:
+        """Computes the similarity between a query and a given set of products by
+        reconstructing their vectors from the index.
+
+        Args:
+            query_embedding (np.ndarray): Normalized query embedding.
+            candidate_ids (np.ndarray): Product indices to score.
+
+        Returns:
+            np.ndarray: Similarity scores aligned with candidate_ids.
+        """
+        vectors = self.index.reconstruct_batch(
+            np.asarray(candidate_ids, dtype=np.int64)
+        )
+        return vectors @ query_embedding
 
     async def score(
         self, query: str, top_n: Union[int, None] = None, return_unsorted=False
@@ -57,28 +334,24 @@ class DenseRetriever(RetrievalBase):
             a list of corresponding product indices.
 
         """
-        query_embedding = await self.get_embeddings_async([query])
-        query_embedding = np.array(query_embedding.embeddings.float_, dtype=np.float32)[
-            0
-        ]
-        norm_query_embedding = query_embedding / np.linalg.norm(query_embedding)
-        distances, idxs = self.index.search(
-            norm_query_embedding[None, :], k=self.index.ntotal if not top_n else top_n
+        norm_query_embedding = await self.embed_query(query)
+        distances, idxs = self.search(
+            norm_query_embedding, k=self.index.ntotal if not top_n else top_n
         )
         if return_unsorted:
             return self._unsorted_scores(distances, idxs)
-        return distances[0], idxs[0]
+        return distances, idxs
 
     def _unsorted_scores(
-        self, distances: List[float], idxs: List[int]
+        self, distances: np.ndarray, idxs: np.ndarray
     ) -> Tuple[List[float], List[int]]:
         """Generates a list of dense scores aligned with the full index, filling in zeros
         for non-selected indices.
 
         Args:
-            distances (List[float]): A list containing the similarity or distance scores
+            distances (np.ndarray): An array containing the similarity or distance scores
             for selected items.
-            idxs (List[int]): A list containing the indices of the selected items in the index.
+            idxs (np.ndarray): An array containing the indices of the selected items in the index.
 
         Returns:
             Tuple[List[float], List[int]]:
@@ -87,8 +360,7 @@ class DenseRetriever(RetrievalBase):
 
         """
         dense_scores_unsorted = np.zeros(self.index.ntotal, dtype=np.float32)
-        for score, idx in zip(distances[0], idxs[0], strict=False):
-            dense_scores_unsorted[idx] = score
+        dense_scores_unsorted[idxs] = distances
         return dense_scores_unsorted.tolist(), [*range(self.index.ntotal)]
 
     async def retrieve(self, query: str, top_n: int) -> List[int]:
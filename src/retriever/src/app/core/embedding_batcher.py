@@ -0,0 +1,101 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class EmbeddingMicroBatcher:
+    """Collects concurrent single-text embedding requests into provider-sized batches.
+
+    Texts arriving within max_wait_ms of the first pending one (or until max_batch_size texts are
+    pending) are sent in a single embedding call, and each caller receives its own row.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Awaitable[np.ndarray]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+    ):
+        """Initializes the batcher.
+
+        Args:
+            embed_batch (Callable[[List[str]], Awaitable[np.ndarray]]): coroutine function that
+            embeds a list of texts and returns one row per text.
+            max_batch_size (int, optional): maximum number of texts per call. Defaults to 32.
+            max_wait_ms (float, optional): maximum time a text waits for the batch to fill.
+            Defaults to 5.
+        """
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embeds a single text as part of the next batch.
+
+        Args:
+            text (str): text to be embedded
+
+        Returns:
+            np.ndarray: the embedding of the text
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Sends the pending texts, up to max_batch_size, as one embedding call."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._pending[: self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size :]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait_ms / 1000, self._flush
+            )
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        # keep a reference so the task is not garbage collected while in flight
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embeds a batch, deduplicating repeated texts, and resolves every caller."""
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            embeddings = await self.embed_batch(unique_texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        rows = dict(zip(unique_texts, embeddings, strict=True))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(rows[text])
+
+    def stats(self) -> dict:
+        """Returns the batching counters.
+
+        Returns:
+            dict: number of provider calls, texts embedded and mean batch size
+        """
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,243 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a query so trivially different spellings share a cache entry.
+
+    Args:
+        query (str): raw query text
+
+    Returns:
+        str: NFKC normalized, lowercased query with collapsed whitespace
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+class QueryEmbeddingCache:
+    """Bounded cache of normalized query embeddings with LRU and TTL eviction.
+
+    Entries live in an in-process LRU tier and, optionally, in a SQLite file that is shared by
+    every worker on the host and survives restarts. Keys combine the normalized query with the
+    embedding model parameters, so changing the model, output_dim or max_tokens never returns
+    stale vectors. Disk writes are committed by a background thread, so put never blocks the
+    event loop on SQLite, and the expired rows are purged by the same thread. Disk reads run
+    outside the lock of the in-process tier and give up on a locked file after
+    disk_read_timeout_s, counting as a miss.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        output_dim: int,
+        max_tokens: int,
+        max_size: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        purge_interval_s: float = 3600,
+        disk_read_timeout_s: float = 0.05,
+    ):
+        """Initializes the cache.
+
+        Args:
+            model (str): embedding model name, part of the cache key.
+            output_dim (int): embedding dimension, part of the cache key.
+            max_tokens (int): embedding max tokens, part of the cache key.
+            max_size (int, optional): maximum number of in-process entries. Defaults to 10000.
+            ttl_seconds (Optional[float], optional): time to live of an entry. If None, entries
+            only expire through LRU eviction. Defaults to None.
+            disk_path (Optional[str], optional): path of the SQLite file used as second tier. If
+            None, only the in-process tier is used. Defaults to None.
+            purge_interval_s (float, optional): minimum time between two deletions of the
+            expired disk rows. Defaults to 3600.
+            disk_read_timeout_s (float, optional): time a disk read waits for a locked SQLite
+            file before counting as a miss. Defaults to 0.05.
+        """
+        self.key_prefix = f"{model}|{output_dim}|{max_tokens}|"
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.purge_interval_s = purge_interval_s
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._writes: Optional[queue.Queue] = None
+        if disk_path:
+            self._disk = self._open_disk_tier(disk_path)
+            # lookups run on the event loop, a busy file is a miss instead of a stall
+            self._disk.execute(
+                f"PRAGMA busy_timeout = {int(disk_read_timeout_s * 1000)}"
+            )
+            self._writes = queue.Queue()
+            threading.Thread(
+                target=self._write_behind,
+                args=(disk_path,),
+                name="query-embedding-cache-writer",
+                daemon=True,
+            ).start()
+
+    @staticmethod
+    def _open_disk_tier(disk_path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(disk_path, check_same_thread=False, timeout=1)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings "
+            "(key TEXT PRIMARY KEY, expires_at REAL, embedding BLOB)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS query_embeddings_expires_at "
+            "ON query_embeddings (expires_at)"
+        )
+        connection.commit()
+        return connection
+
+    def key(self, query: str) -> str:
+        """Builds the cache key of a query.
+
+        Args:
+            query (str): raw query text
+
+        Returns:
+            str: hex digest of the normalized query and the embedding parameters
+        """
+        return hashlib.sha1(
+            (self.key_prefix + normalize_query(query)).encode("utf-8")
+        ).hexdigest()
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Returns the cached embedding of a query, if present and not expired.
+
+        Args:
+            query (str): raw query text
+
+        Returns:
+            Optional[np.ndarray]: the cached embedding, or None on a miss
+        """
+        key = self.key(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._entries[key]
+        # the memory tier is not locked during the disk read, so lookups and puts of other
+        # queries do not wait on SQLite
+        entry = self._get_from_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            # keep the stored expiry, a disk hit does not extend the life of the entry. An
+            # entry put during the read is newer and kept
+            if key not in self._entries:
+                self._set_in_memory(key, entry[1], entry[0])
+            return entry[1]
+
+    def put(self, query: str, embedding: np.ndarray) -> None:
+        """Stores the embedding of a query in every cache tier, the disk write is queued to
+        the writer thread.
+
+        Args:
+            query (str): raw query text
+            embedding (np.ndarray): query embedding
+        """
+        key = self.key(query)
+        embedding = np.asarray(embedding, dtype=np.float32)
+        expires_at = self._expires_at()
+        with self._lock:
+            self._set_in_memory(key, embedding, expires_at)
+        if self._writes is not None:
+            self._writes.put((key, expires_at, embedding.tobytes()))
+
+    def flush(self) -> None:
+        """Waits until the queued disk writes are committed."""
+        if self._writes is not None:
+            self._writes.join()
+
+    def _write_behind(self, disk_path: str):
+        # the writer thread has its own connection, WAL lets it commit while workers read
+        connection = self._open_disk_tier(disk_path)
+        last_purge = float("-inf")
+        while True:
+            rows = [self._writes.get()]
+            while True:
+                try:
+                    rows.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)", rows
+                )
+                now = time.time()
+                if now - last_purge >= self.purge_interval_s:
+                    connection.execute(
+                        "DELETE FROM query_embeddings WHERE expires_at <= ?", (now,)
+                    )
+                    last_purge = now
+                connection.commit()
+            except sqlite3.Error:
+                # the disk tier is best effort, a lost write only costs a later miss
+                connection.rollback()
+            finally:
+                for _ in rows:
+                    self._writes.task_done()
+
+    def _set_in_memory(self, key: str, embedding: np.ndarray, expires_at: float):
+        self._entries[key] = (expires_at, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get_from_disk(
+        self, key: str, now: float
+    ) -> Optional[Tuple[float, np.ndarray]]:
+        if self._disk is None:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT expires_at, embedding FROM query_embeddings WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error:
+            # the disk tier is best effort, a locked or unreadable file is a miss
+            return None
+        if row is None or row[0] <= now:
+            return None
+        return row[0], np.frombuffer(row[1], dtype=np.float32)
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters of the cache.
+
+        Returns:
+            dict: hits per tier, misses, hit rate and current in-process size
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
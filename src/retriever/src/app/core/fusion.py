@@ -0,0 +1,181 @@
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from ..exceptions import WrongFusionStrategy
+
+# (lexical_scores, dense_scores, alpha, mask, **params) -> fused scores
+FusionStrategy = Callable[..., np.ndarray]
+
+
+def _valid(scores: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+    return np.ones(scores.shape, dtype=bool) if mask is None else mask
+
+
+def minmax_normalize(
+    scores: np.ndarray, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Rescales the scores of each row to [0, 1]. Rows with a single distinct score become 0.
+
+    Args:
+        scores (np.ndarray): 1D scores or (queries x candidates) scores.
+        mask (Optional[np.ndarray], optional): valid candidates, the others are ignored in the
+        row statistics. Defaults to None.
+
+    Returns:
+        np.ndarray: normalized scores
+    """
+    valid = _valid(scores, mask)
+    low = np.min(scores, axis=-1, keepdims=True, where=valid, initial=np.inf)
+    high = np.max(scores, axis=-1, keepdims=True, where=valid, initial=-np.inf)
+    # rows without valid candidates
+    low[~np.isfinite(low)] = 0
+    spread = high - low
+    spread[~(spread > 0)] = np.inf
+    return np.where(valid, (scores - low) / spread, 0)
+
+
+def zscore_normalize(
+    scores: np.ndarray, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Standardizes the scores of each row to zero mean and unit variance. Rows with a single
+    distinct score become 0.
+
+    Args:
+        scores (np.ndarray): 1D scores or (queries x candidates) scores.
+        mask (Optional[np.ndarray], optional): valid candidates, the others are ignored in the
+        row statistics. Defaults to None.
+
+    Returns:
+        np.ndarray: normalized scores
+    """
+    valid = _valid(scores, mask)
+    mean = np.mean(scores, axis=-1, keepdims=True, where=valid)
+    std = np.std(scores, axis=-1, keepdims=True, where=valid)
+    std[~(std > 0)] = np.inf
+    return np.where(valid, (scores - mean) / std, 0)
+
+
+NORMALIZERS: Dict[str, Callable[..., np.ndarray]] = {
+    "minmax": minmax_normalize,
+    "zscore": zscore_normalize,
+    "none": lambda scores, mask=None: scores,
+}
+
+
+def reciprocal_ranks(
+    scores: np.ndarray, rrf_k: float = 60, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Computes 1 / (rrf_k + rank) of every candidate, ranks starting at 1 within each row.
+
+    Args:
+        scores (np.ndarray): 1D scores or (queries x candidates) scores.
+        rrf_k (float, optional): rank smoothing constant. Defaults to 60.
+        mask (Optional[np.ndarray], optional): valid candidates, the others are ranked last
+        and get 0. Defaults to None.
+
+    Returns:
+        np.ndarray: reciprocal ranks, aligned with scores
+    """
+    valid = _valid(scores, mask)
+    order = np.argsort(-np.where(valid, scores, -np.inf), axis=-1, kind="stable")
+    ranks = np.empty(scores.shape, dtype=np.int64)
+    np.put_along_axis(
+        ranks,
+        order,
+        np.broadcast_to(np.arange(1, scores.shape[-1] + 1), scores.shape),
+        axis=-1,
+    )
+    return np.where(valid, 1 / (rrf_k + ranks), 0)
+
+
+def convex_combination(
+    lexical_scores: np.ndarray,
+    dense_scores: np.ndarray,
+    alpha: float,
+    mask: Optional[np.ndarray] = None,
+    **params,
+) -> np.ndarray:
+    """alpha * lexical + (1 - alpha) * dense over the raw scores."""
+    return alpha * lexical_scores + (1 - alpha) * dense_scores
+
+
+def weighted_sum(
+    lexical_scores: np.ndarray,
+    dense_scores: np.ndarray,
+    alpha: float,
+    mask: Optional[np.ndarray] = None,
+    normalization: str = "minmax",
+    **params,
+) -> np.ndarray:
+    """Convex combination of the scores after normalizing each retriever per query, so signals
+    with different scales weigh as configured."""
+    normalize = NORMALIZERS[normalization]
+    return convex_combination(
+        normalize(lexical_scores, mask), normalize(dense_scores, mask), alpha
+    )
+
+
+def reciprocal_rank_fusion(
+    lexical_scores: np.ndarray,
+    dense_scores: np.ndarray,
+    alpha: float,
+    mask: Optional[np.ndarray] = None,
+    rrf_k: float = 60,
+    **params,
+) -> np.ndarray:
+    """Weighted reciprocal rank fusion, only the candidate ranks in each retriever are used.
+    alpha = 0.5 ranks as the classic unweighted RRF."""
+    return convex_combination(
+        reciprocal_ranks(lexical_scores, rrf_k, mask),
+        reciprocal_ranks(dense_scores, rrf_k, mask),
+        alpha,
+    )
+
+
+FUSION_STRATEGIES: Dict[str, FusionStrategy] = {
+    "convex": convex_combination,
+    "weighted_sum": weighted_sum,
+    "rrf": reciprocal_rank_fusion,
+}
+
+
+def fuse(
+    lexical_scores: np.ndarray,
+    dense_scores: np.ndarray,
+    strategy: str = "convex",
+    alpha: float = 0.5,
+    mask: Optional[np.ndarray] = None,
+    **params,
+) -> np.ndarray:
+    """Fuses the lexical and dense scores of the same candidates.
+
+    Args:
+        lexical_scores (np.ndarray): 1D scores or (queries x candidates) scores of the lexical
+        retriever.
+        dense_scores (np.ndarray): dense retriever scores, aligned with lexical_scores.
+        strategy (str, optional): convex, weighted_sum or rrf. Defaults to "convex".
+        alpha (float, optional): weight of the lexical signal, the dense one gets 1 - alpha.
+        Defaults to 0.5.
+        mask (Optional[np.ndarray], optional): valid candidates, for padded batched inputs.
+        Invalid candidates get -inf. Defaults to None.
+        **params: strategy parameters (normalization, rrf_k)
+
+    Raises:
+        WrongFusionStrategy: if the strategy is unknown
+
+    Returns:
+        np.ndarray: fused scores, aligned with the inputs
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise WrongFusionStrategy(
+            f"Fusion strategy {strategy} is not supported. Must be one of {list(FUSION_STRATEGIES)}"
+        )
+    lexical_scores = np.asarray(lexical_scores, dtype=np.float32)
+    dense_scores = np.asarray(dense_scores, dtype=np.float32)
+    scores = FUSION_STRATEGIES[strategy](
+        lexical_scores, dense_scores, alpha, mask=mask, **params
+    )
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    return scores
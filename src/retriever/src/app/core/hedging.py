@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+import numpy as np
+
+
+class RequestHedger:
+    """Hedged requests against a remote dependency.
+
+    The latency of recent requests is tracked over a sliding window. When a request is still
+    running after the configured latency quantile (p95 by default), a second identical request
+    is sent and the first response wins, the other request is cancelled. Only the slowest
+    requests are duplicated, so the extra load stays around 1 - quantile while the tail
+    latency drops to roughly quantile latency plus one typical request.
+    """
+
+    def __init__(
+        self,
+        window: int = 512,
+        quantile: float = 0.95,
+        min_samples: int = 20,
+        min_delay_s: float = 0.0,
+    ):
+        """Initializes the hedger.
+
+        Args:
+            window (int, optional): number of recent latencies kept. Defaults to 512.
+            quantile (float, optional): latency quantile after which a request is hedged.
+            Defaults to 0.95.
+            min_samples (int, optional): latencies needed before hedging. Defaults to 20.
+            min_delay_s (float, optional): lower bound of the hedging delay. Defaults to 0.0.
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self._latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, latency_s: float) -> None:
+        self._latencies.append(latency_s)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Time after which a running request is hedged, None while there are too few samples."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        return max(
+            float(np.quantile(np.fromiter(self._latencies, float), self.quantile)),
+            self.min_delay_s,
+        )
+
+    async def _timed(self, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # lower bound of the latency of the losing request
+            self.record(time.perf_counter() - start)
+            raise
+        self.record(time.perf_counter() - start)
+        return result
+
+    async def call(self, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Calls func, and calls it a second time if the first call is slower than the hedging
+        delay. Returns the first successful result.
+
+        Args:
+            func (Callable[..., Awaitable]): async function sending the request
+            *args: positional arguments of func
+            **kwargs: keyword arguments of func
+
+        Returns:
+            Any: the result of the first call to succeed. If both fail, the first error is raised.
+        """
+        self.requests += 1
+        delay_s = self.hedge_delay()
+        if delay_s is None:
+            return await self._timed(func, *args, **kwargs)
+        first = asyncio.ensure_future(self._timed(func, *args, **kwargs))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay_s)
+            if done:
+                return first.result()
+            self.hedged += 1
+            hedge = asyncio.ensure_future(self._timed(func, *args, **kwargs))
+            pending.add(hedge)
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is hedge
+                        return task.result()
+                    errors.append(task)
+            raise (first if first in errors else errors[0]).exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        """Hedging counters and the current hedging delay."""
+        delay_s = self.hedge_delay()
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_ms": None if delay_s is None else delay_s * 1000,
+        }
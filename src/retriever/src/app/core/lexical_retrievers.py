@@ -1,22 +1,70 @@
+from typing import List, Optional, Tuple
+
 import numpy as np
+from scipy.sparse import csr_matrix, diags
 from scipy.sparse._csr import spmatrix
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 
 from ..exceptions import WrongSimilarityMethod
 from .base_model import RetrievalBase
+from .topk import top_k_indices
+
+
+def prenormalized_cosine(
+    query_vectors: spmatrix, matrix: spmatrix, dense_output: bool = True
+):
+    """Cosine similarity between L2-normalized query vectors and the L2-normalized rows of a
+    matrix. Both sides are already unit length, so it is a single sparse dot product that
+    does not re-validate or re-normalize the matrix on every call.
+
+    Args:
+        query_vectors (spmatrix): L2-normalized (queries x terms) vectors.
+        matrix (spmatrix): CSR (documents x terms) matrix with L2-normalized rows.
+        dense_output (bool, optional): If True, returns a dense array, otherwise a CSR matrix.
+        Defaults to True.
+
+    Returns:
+        Union[np.ndarray, spmatrix]: (queries x documents) similarity scores.
+    """
+    query_vectors = query_vectors.astype(matrix.dtype, copy=False)
+    if dense_output:
+        return np.asarray(matrix @ query_vectors.toarray().T).T
+    return (matrix @ query_vectors.T).T.tocsr()
+
+
+def top_k_allowed(
+    scores: np.ndarray, k: int, allowed: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Top k indices of the scores among the allowed rows.
+
+    Args:
+        scores (np.ndarray): 1D scores
+        k (int): number of indices to return
+        allowed (Optional[np.ndarray], optional): boolean row mask, None allows every row.
+        Defaults to None.
+
+    Returns:
+        np.ndarray: up to k allowed indices, best first
+    """
+    if allowed is None:
+        return top_k_indices(scores, k)
+    top = top_k_indices(np.where(allowed, scores, -np.inf), k)
+    return top[allowed[top]]
 
 
 class TFIDFRetriever(RetrievalBase):
     def __init__(self, similarity_method="cosine"):
         """Initializes the LexicalRetriever with the specified similarity method.
 
+        The TF-IDF matrix rows are expected to be L2-normalized (see prenormalize_rows), so
+        cosine similarity is computed as a plain sparse dot product.
+
         Args:
             similarity_method (str, optional): The similarity method to use. Currently,
             only "cosine" is supported. Defaults to "cosine".
         """
         if similarity_method == "cosine":
-            self.similarity_algorithm = cosine_similarity
+            self.similarity_algorithm = prenormalized_cosine
         else:
             raise WrongSimilarityMethod(
                 f"Similarity method {similarity_method} is not supported for LexicalRetriever. Must be cosine"
@@ -45,12 +93,32 @@ class TFIDFRetriever(RetrievalBase):
         ).flatten()
         return similarity_scores
 
+    def score_batch(
+        self, queries: List[str], vectorizer: TfidfVectorizer, tfidf_matrix: spmatrix
+    ) -> spmatrix:
+        """Calculates similarity scores between several queries and the TF-IDF matrix with a
+        single sparse matrix-matrix product.
+
+        Args:
+            queries (List[str]): The input query strings.
+            vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the queries.
+            tfidf_matrix (spmatrix): The TF-IDF matrix representing the corpus documents.
+
+        Returns:
+            spmatrix: A sparse (queries x documents) matrix of similarity scores.
+        """
+        query_vectors = vectorizer.transform(queries)
+        return self.similarity_algorithm(
+            query_vectors, tfidf_matrix, dense_output=False
+        )
+
     def retrieve(
         self,
         query: str,
         vectorizer: TfidfVectorizer,
         tfidf_matrix: spmatrix,
         top_n: int,
+        allowed: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """Retrieves the indices of the top_n most similar documents to the given query based on
         TF-IDF similarity scores.
@@ -60,16 +128,295 @@ class TFIDFRetriever(RetrievalBase):
             vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the query.
             tfidf_matrix (spmatrix): The TF-IDF matrix representing the corpus of documents.
             top_n (int): The number of top similar documents to retrieve.
+            allowed (Optional[np.ndarray], optional): Boolean mask of the documents that can be
+            returned. Defaults to None.
 
         Returns:
             np.ndarray: An array of indices corresponding to the top_n most similar documents, sorted
             by descending similarity.
         """
         similarity_scores = self.score(query, vectorizer, tfidf_matrix)
-        return similarity_scores.argsort()[-top_n:][::-1]
+        return top_k_allowed(similarity_scores, top_n, allowed)
+
+    def score_candidates(
+        self,
+        query: str,
+        vectorizer: TfidfVectorizer,
+        tfidf_matrix: spmatrix,
+        candidate_ids: np.ndarray,
+    ) -> np.ndarray:
+        """Calculates similarity scores between a query and a subset of the TF-IDF matrix
+        rows, so the cost depends on the number of candidates instead of the corpus size.
+
+        Args:
+            query (str): The input query string to be vectorized and compared.
+            vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the query.
+            tfidf_matrix (spmatrix): The TF-IDF matrix representing the corpus of documents.
+            candidate_ids (np.ndarray): Row indices of the documents to score.
+
+        Returns:
+            np.ndarray: An array of similarity scores aligned with candidate_ids.
+        """
+        query_vector = vectorizer.transform([query])
+        return self.similarity_algorithm(
+            query_vector, tfidf_matrix[candidate_ids]
+        ).flatten()
 
 
 class BM25Retriever(RetrievalBase):
-    """To be implemented"""
+    def __init__(self, bm25_matrix: spmatrix):
+        """Initializes the retriever with the per-term upper bounds of the BM25 impact matrix.
+
+        BM25 scores are unbounded, so query scores are divided by the best score the query could
+        reach (the sum of the maximum impact of each query term). The ranking is unchanged and the
+        scores stay in [0, 1], the same range as the dense cosine scores they are fused with.
+
+        Args:
+            bm25_matrix (spmatrix): (documents x terms) BM25 impact matrix computed by the batch
+            pipeline.
+        """
+        self.term_upper_bounds = (
+            csr_matrix(bm25_matrix).max(axis=0).toarray().ravel().astype(np.float32)
+        )
+
+    def _query_vectors(
+        self, queries: List[str], vectorizer: CountVectorizer
+    ) -> spmatrix:
+        """Turns queries into term count vectors scaled by their score upper bound."""
+        query_vectors = csr_matrix(vectorizer.transform(queries), dtype=np.float32)
+        upper_bounds = query_vectors @ self.term_upper_bounds
+        upper_bounds[upper_bounds == 0] = 1
+        return csr_matrix(diags(1 / upper_bounds) @ query_vectors, dtype=np.float32)
+
+    def score(
+        self, query: str, vectorizer: CountVectorizer, bm25_matrix: spmatrix
+    ) -> np.ndarray:
+        """Calculates the normalized BM25 score of every document with a single sparse dot
+        product over the query term columns of the impact matrix.
+
+        Args:
+            query (str): The input query string.
+            vectorizer (CountVectorizer): The fitted term count vectorizer.
+            bm25_matrix (spmatrix): The BM25 impact matrix of the corpus documents.
+
+        Returns:
+            np.ndarray: An array of scores between the query and each document.
+        """
+        query_vector = self._query_vectors([query], vectorizer)
+        return np.asarray(bm25_matrix @ query_vector.toarray().T).ravel()
+
+    def score_batch(
+        self, queries: List[str], vectorizer: CountVectorizer, bm25_matrix: spmatrix
+    ) -> spmatrix:
+        """Calculates the normalized BM25 scores of several queries with a single sparse
+        matrix-matrix product.
+
+        Args:
+            queries (List[str]): The input query strings.
+            vectorizer (CountVectorizer): The fitted term count vectorizer.
+            bm25_matrix (spmatrix): The BM25 impact matrix of the corpus documents.
+
+        Returns:
+            spmatrix: A sparse (queries x documents) matrix of scores.
+        """
+        query_vectors = self._query_vectors(queries, vectorizer)
+        return (bm25_matrix @ query_vectors.T).T.tocsr()
+
+    def retrieve(
+        self,
+        query: str,
+        vectorizer: CountVectorizer,
+        bm25_matrix: spmatrix,
+        top_n: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Retrieves the indices of the top_n documents with the highest BM25 score.
+
+        Args:
+            query (str): The input query string.
+            vectorizer (CountVectorizer): The fitted term count vectorizer.
+            bm25_matrix (spmatrix): The BM25 impact matrix of the corpus documents.
+            top_n (int): The number of top documents to retrieve.
+            allowed (Optional[np.ndarray], optional): Boolean mask of the documents that can be
+            returned. Defaults to None.
+
+        Returns:
+            np.ndarray: An array of indices of the top_n documents, sorted by descending score.
+        """
+        return top_k_allowed(self.score(query, vectorizer, bm25_matrix), top_n, allowed)
+
+    def score_candidates(
+        self,
+        query: str,
+        vectorizer: CountVectorizer,
+        bm25_matrix: spmatrix,
+        candidate_ids: np.ndarray,
+    ) -> np.ndarray:
+        """Calculates the normalized BM25 scores of a subset of the documents.
+
+        Args:
+            query (str): The input query string.
+            vectorizer (CountVectorizer): The fitted term count vectorizer.
+            bm25_matrix (spmatrix): The BM25 impact matrix of the corpus documents.
+            candidate_ids (np.ndarray): Row indices of the documents to score.
+
+        Returns:
+            np.ndarray: An array of scores aligned with candidate_ids.
+        """
+        return self.score(query, vectorizer, bm25_matrix[candidate_ids])
+
+
+class InvertedIndexRetriever(TFIDFRetriever):
+    def __init__(self, tfidf_matrix: spmatrix, similarity_method="cosine"):
+        """Initializes the retriever by building a term -> postings inverted index over the
+        columns of the TF-IDF matrix, i.e. over the fitted vectorizer vocabulary.
 
-    pass
+        Each posting list holds the sorted ids of the documents containing the term and their
+        weights, together with the maximum weight of the term, used as its score upper bound.
+
+        Args:
+            tfidf_matrix (spmatrix): The L2-normalized TF-IDF matrix of the corpus.
+            similarity_method (str, optional): The similarity method to use. Currently,
+            only "cosine" is supported. Defaults to "cosine".
+        """
+        super().__init__(similarity_method)
+        postings = csr_matrix(tfidf_matrix).tocsc()
+        postings.sort_indices()
+        self.n_docs = postings.shape[0]
+        self.postings_ptr = postings.indptr
+        self.postings_docs = postings.indices
+        self.postings_weights = postings.data
+        self.max_weights = np.zeros(postings.shape[1], dtype=postings.dtype)
+        non_empty = np.diff(postings.indptr) > 0
+        if non_empty.any():
+            self.max_weights[non_empty] = np.maximum.reduceat(
+                postings.data, postings.indptr[:-1][non_empty]
+            )
+
+    def _query_terms(
+        self, query: str, vectorizer: TfidfVectorizer
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        query_vector = vectorizer.transform([query])
+        return query_vector.indices, query_vector.data.astype(self.max_weights.dtype)
+
+    def _postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, stop = self.postings_ptr[term], self.postings_ptr[term + 1]
+        return self.postings_docs[start:stop], self.postings_weights[start:stop]
+
+    def score(
+        self, query: str, vectorizer: TfidfVectorizer, tfidf_matrix: spmatrix = None
+    ) -> np.ndarray:
+        """Calculates similarity scores between a query and every document by traversing only
+        the posting lists of the query terms.
+
+        Args:
+            query (str): The input query string to be vectorized and compared.
+            vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the query.
+            tfidf_matrix (spmatrix, optional): Unused, the postings are built at init time.
+
+        Returns:
+            np.ndarray: An array of similarity scores between the query and each document.
+        """
+        similarity_scores = np.zeros(self.n_docs, dtype=self.max_weights.dtype)
+        for term, query_weight in zip(
+            *self._query_terms(query, vectorizer), strict=True
+        ):
+            docs, weights = self._postings(term)
+            similarity_scores[docs] += query_weight * weights
+        return similarity_scores
+
+    def top_k(
+        self,
+        query: str,
+        vectorizer: TfidfVectorizer,
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the exact top k documents with MaxScore dynamic pruning.
+
+        Query terms are processed term-at-a-time by decreasing upper bound (query weight times
+        the maximum weight of the term). Once the summed upper bounds of the remaining terms
+        fall below the current k-th best score, documents not seen yet cannot enter the top k:
+        the remaining terms only update the existing candidates, and candidates whose partial
+        score plus the remaining bound cannot reach the threshold are dropped.
+
+        Args:
+            query (str): The input query string.
+            vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the query.
+            k (int): Number of documents to return.
+            allowed (Optional[np.ndarray], optional): Boolean mask of the documents that can be
+            returned. Postings of other documents are skipped. Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Top document ids and their scores, best first.
+        """
+        terms, query_weights = self._query_terms(query, vectorizer)
+        if terms.shape[0] == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        upper_bounds = query_weights * self.max_weights[terms]
+        order = np.argsort(-upper_bounds, kind="stable")
+        # summed upper bound of the terms processed after each one
+        remaining_bounds = np.append(np.cumsum(upper_bounds[order][::-1])[::-1][1:], 0)
+
+        candidate_docs = np.empty(0, dtype=self.postings_docs.dtype)
+        candidate_scores = np.empty(0, dtype=np.float64)
+        admitting = True
+        for term, query_weight, remaining_bound in zip(
+            terms[order], query_weights[order], remaining_bounds, strict=True
+        ):
+            docs, weights = self._postings(term)
+            if allowed is not None:
+                keep = allowed[docs]
+                docs, weights = docs[keep], weights[keep]
+            contributions = query_weight * weights
+            if admitting:
+                candidate_docs, inverse = np.unique(
+                    np.concatenate([candidate_docs, docs]), return_inverse=True
+                )
+                candidate_scores = np.bincount(
+                    inverse,
+                    weights=np.concatenate([candidate_scores, contributions]),
+                    minlength=candidate_docs.shape[0],
+                )
+            elif candidate_docs.shape[0]:
+                positions = np.searchsorted(docs, candidate_docs)
+                found = positions < docs.shape[0]
+                found[found] = docs[positions[found]] == candidate_docs[found]
+                candidate_scores[found] += contributions[positions[found]]
+
+            if candidate_docs.shape[0] >= k > 0:
+                threshold = np.partition(candidate_scores, -k)[-k]
+                admitting = admitting and remaining_bound >= threshold
+                keep = candidate_scores + remaining_bound >= threshold
+                candidate_docs = candidate_docs[keep]
+                candidate_scores = candidate_scores[keep]
+
+        top_positions = top_k_indices(candidate_scores, k)
+        return candidate_docs[top_positions], candidate_scores[top_positions]
+
+    def retrieve(
+        self,
+        query: str,
+        vectorizer: TfidfVectorizer,
+        tfidf_matrix: spmatrix = None,
+        top_n: int = 10,
+        allowed: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Retrieves the indices of the top_n most similar documents to the given query using
+        the inverted index, so the cost depends on the posting lengths of the query terms
+        instead of the corpus size.
+
+        Args:
+            query (str): The input query string to search for similar documents.
+            vectorizer (TfidfVectorizer): The fitted TF-IDF vectorizer used to transform the query.
+            tfidf_matrix (spmatrix, optional): Unused, the postings are built at init time.
+            top_n (int, optional): The number of top similar documents to retrieve. Defaults to 10.
+            allowed (Optional[np.ndarray], optional): Boolean mask of the documents that can be
+            returned. Defaults to None.
+
+        Returns:
+            np.ndarray: An array of indices corresponding to the top_n most similar documents, sorted
+            by descending similarity.
+        """
+        ids, _ = self.top_k(query, vectorizer, top_n, allowed)
+        return ids
@@ -0,0 +1,121 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class QueryVectorizer:
+    """Query-side replacement of the fitted sklearn TfidfVectorizer and CountVectorizer.
+
+    It reproduces the sklearn word analyzer (lowercasing and token pattern, unigrams) and the
+    tf-idf weighting from the saved artifacts alone, so the retriever does not unpickle the
+    sklearn estimators. The vocabulary is a sorted string table: sklearn sorts the features
+    alphabetically, so the position of a term in the table is its matrix column and lookups
+    are a binary search.
+    """
+
+    def __init__(
+        self,
+        vocabulary: np.ndarray,
+        idf: Optional[np.ndarray] = None,
+        lowercase: bool = True,
+        token_pattern: str = DEFAULT_TOKEN_PATTERN,
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        dtype=np.float32,
+    ):
+        """Initializes the vectorizer.
+
+        Args:
+            vocabulary (np.ndarray): sorted array of the vocabulary terms.
+            idf (Optional[np.ndarray], optional): idf weight of each term. If None, term counts
+            are returned (CountVectorizer behaviour). Defaults to None.
+            lowercase (bool, optional): lowercase the text before tokenizing. Defaults to True.
+            token_pattern (str, optional): regular expression of a token. Defaults to the
+            sklearn one.
+            norm (Optional[str], optional): "l2", "l1" or None. Defaults to "l2".
+            sublinear_tf (bool, optional): replace tf with 1 + log(tf). Defaults to False.
+            binary (bool, optional): set every non-zero term frequency to 1. Defaults to False.
+            dtype (optional): dtype of the output. Defaults to np.float32.
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.lowercase = lowercase
+        self.token_pattern = re.compile(token_pattern)
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.dtype = dtype
+
+    def __len__(self) -> int:
+        return self.vocabulary.shape[0]
+
+    def _columns(self, text: str) -> np.ndarray:
+        """Tokenizes a text and returns the vocabulary column of each known token."""
+        if self.lowercase:
+            text = text.lower()
+        # casting to the fixed-width vocabulary dtype truncates longer tokens, which could
+        # then match a shorter term, so tokens longer than every term are dropped first
+        max_length = self.vocabulary.dtype.itemsize // np.dtype("U1").itemsize
+        tokens = np.array(
+            [
+                token
+                for token in self.token_pattern.findall(text)
+                if len(token) <= max_length
+            ],
+            dtype=self.vocabulary.dtype,
+        )
+        if tokens.shape[0] == 0 or len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        positions = np.searchsorted(self.vocabulary, tokens)
+        positions[positions == len(self)] = 0
+        return positions[self.vocabulary[positions] == tokens]
+
+    def _weights(self, columns: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Applies the term frequency transform, the idf weights and the row norm."""
+        weights = counts.astype(np.float64)
+        if self.binary:
+            weights[:] = 1
+        elif self.sublinear_tf:
+            weights = np.log(weights) + 1
+        if self.idf is not None:
+            weights *= self.idf[columns]
+        if self.norm == "l2":
+            norm = np.sqrt(np.dot(weights, weights))
+        elif self.norm == "l1":
+            norm = np.abs(weights).sum()
+        else:
+            norm = 0
+        if norm > 0:
+            weights /= norm
+        return weights
+
+    def transform(self, texts: List[str]) -> csr_matrix:
+        """Turns texts into (texts x vocabulary) sparse vectors.
+
+        Args:
+            texts (List[str]): texts to vectorize
+
+        Returns:
+            csr_matrix: one row per text with sorted column indices
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            columns, counts = np.unique(self._columns(text), return_counts=True)
+            indices.append(columns)
+            data.append(self._weights(columns, counts))
+            indptr.append(indptr[-1] + columns.shape[0])
+        return csr_matrix(
+            (
+                np.concatenate(data).astype(self.dtype) if data else [],
+                np.concatenate(indices) if indices else [],
+                indptr,
+            ),
+            shape=(len(texts), len(self)),
+        )
@@ -0,0 +1,224 @@
+import asyncio
+import weakref
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import pandas as pd
+from utils import logger
+
+from .chunked_rerank import RerankFunction, rerank_in_chunks
+from .cpu_pool import run_stage
+from .document_preparation import DocumentPreparer
+from .resilience import get_circuit_breaker, mark_degraded
+
+
+class CandidateReranker(ABC):
+    """Base class for the rerankers of the search pipeline"""
+
+    @abstractmethod
+    async def rerank(
+        self, query: str, docs: pd.DataFrame, top_n: int
+    ) -> List[Tuple[int, float]]:
+        """Ranks retrieved products by relevance to the query.
+
+        Args:
+            query (str): search query
+            docs (pd.DataFrame): retrieved products, with their product_id and text columns
+            top_n (int): number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: top_n (row in docs, relevance score) pairs by decreasing
+            relevance
+        """
+        pass
+
+
+class LocalReranker(CandidateReranker):
+    """Reranks the retrieved products in process with the rerank provider.
+
+    Texts are built from the product rows already fetched for the response, so nothing is
+    serialized between retrieval and reranking. They are prepared and chunked with the rules
+    of the reranker service (see DocumentPreparer and rerank_in_chunks), so the local and
+    remote modes send the provider the same texts.
+    """
+
+    def __init__(
+        self,
+        rerank_scores: RerankFunction,
+        columns: Sequence[str],
+        max_chars: Optional[int] = None,
+        cache_size: int = 50000,
+        chunk_size: int = 100,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Initializes the reranker.
+
+        Args:
+            rerank_scores (RerankFunction): provider call reranking one chunk
+            columns (Sequence[str]): product columns joined into the reranked text, by
+            decreasing priority
+            max_chars (Optional[int], optional): character budget of a text, None for no
+            budget. Defaults to None.
+            cache_size (int, optional): maximum number of prepared texts kept, 0 to disable the
+            cache. Defaults to 50000.
+            chunk_size (int, optional): maximum number of texts per provider request. Defaults
+            to 100.
+            max_concurrency (Optional[int], optional): chunks in flight to the provider, shared
+            by every request. If None, every chunk is sent at once. Defaults to None.
+        """
+        self.rerank_scores = rerank_scores
+        self.preparer = DocumentPreparer(
+            columns, max_chars=max_chars, cache_size=cache_size
+        )
+        self.chunk_size = chunk_size
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    def texts(self, docs: pd.DataFrame) -> List[str]:
+        """Prepares the text of each product, see DocumentPreparer.
+
+        Args:
+            docs (pd.DataFrame): retrieved products
+
+        Returns:
+            List[str]: text of each product, in docs order
+        """
+        records = docs[["product_id", *self.preparer.columns]].to_dict("records")
+        return self.preparer.prepare(
+            [
+                {
+                    column: None if pd.isna(value) else value
+                    for column, value in r.items()
+                }
+                for r in records
+            ]
+        )
+
+    async def rerank(
+        self, query: str, docs: pd.DataFrame, top_n: int
+    ) -> List[Tuple[int, float]]:
+        return await rerank_in_chunks(
+            self.rerank_scores,
+            query,
+            self.texts(docs),
+            top_n,
+            chunk_size=self.chunk_size,
+            semaphore=self.semaphore,
+        )
+
+
+class RemoteReranker(CandidateReranker):
+    """Reranks the retrieved products with the reranker service, when it is deployed apart.
+
+    Only the product ids are sent (rerank_by_ids), the reranker reads the texts from its
+    product text store. Requests go through a pooled HTTP client per event loop, so
+    connections to the reranker are kept alive between searches. The reranker answers a
+    failed rerank with an error status, raised here so search degrades to the retrieval order.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout_s: float = 5,
+        connect_timeout_s: float = 1,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_s: float = 30,
+        circuit_breaker_config: Optional[Dict] = None,
+    ):
+        """Initializes the reranker.
+
+        Args:
+            base_url (str): url of the reranker service
+            timeout_s (float, optional): timeout of a rerank request. Defaults to 5.
+            connect_timeout_s (float, optional): connection establishment timeout. Defaults
+            to 1.
+            max_connections (int, optional): maximum number of concurrent connections.
+            Defaults to 100.
+            max_keepalive_connections (int, optional): idle connections kept alive for reuse.
+            Defaults to 20.
+            keepalive_expiry_s (float, optional): time an idle connection is kept. Defaults
+            to 30.
+            circuit_breaker_config (Optional[Dict], optional): parameters of the circuit
+            breaker of the reranker service, see CircuitBreaker. Defaults to None.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout_s, connect=connect_timeout_s)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self.breaker = get_circuit_breaker(
+            "reranker_service", **(circuit_breaker_config or {})
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        # connection pools are bound to an event loop, so each loop gets its own client
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+            self._clients[loop] = client
+        return client
+
+    async def _post(self, payload: dict) -> dict:
+        response = await self._client().post("/rerank/rerank_by_ids", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def rerank(
+        self, query: str, docs: pd.DataFrame, top_n: int
+    ) -> List[Tuple[int, float]]:
+        product_ids = docs["product_id"].tolist()
+        body = await self.breaker.call(
+            self._post,
+            {"query": query, "product_ids": product_ids, "top_n": top_n},
+        )
+        rows = {product_id: row for row, product_id in enumerate(product_ids)}
+        return [
+            (rows[product_id], score) for product_id, score in body["ids_and_scores"]
+        ]
+
+
+async def rerank_candidates(
+    reranker: Optional[CandidateReranker],
+    query: str,
+    docs: pd.DataFrame,
+    top_n: int,
+    timeout_s: Optional[float] = None,
+) -> Tuple[pd.DataFrame, bool]:
+    """Reranks the retrieved candidates of a search.
+
+    Without reranker or candidates, the retrieval top_n is returned. When reranking fails or
+    times out, the retrieval top_n is returned too and the request is flagged as degraded.
+
+    Args:
+        reranker (Optional[CandidateReranker]): reranker of the candidates, None to keep the
+        retrieval order
+        query (str): search query
+        docs (pd.DataFrame): retrieved products with their retrieval scores, best first
+        top_n (int): number of results to return
+        timeout_s (Optional[float], optional): time budget of the rerank. If None, no limit.
+        Defaults to None.
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: the top_n products with their scores, best first, and
+        whether they were reranked (relevance scores) or not (retrieval scores)
+    """
+    if reranker is None or docs.empty:
+        return docs.head(top_n), False
+    try:
+        results = await run_stage(
+            reranker.rerank(query, docs, top_n), timeout_s, "rerank"
+        )
+    except Exception as e:
+        logger.warning(f"Rerank failed, returning the retrieval order: {e!r}")
+        mark_degraded("rerank")
+        return docs.head(top_n), False
+    reranked = docs.iloc[[row for row, _ in results]].reset_index(drop=True)
+    reranked["scores"] = [score for _, score in results]
+    return reranked, True
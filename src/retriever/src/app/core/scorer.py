@@ -1,31 +1,78 @@
 import logging
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 from utils import load_config
 
+from .fusion import fuse
+from .topk import top_k_indices
+
 config = load_config()
 logging.warning(config)
 LEXICAL_ALPHA = config["scorer"]["lexical_score_mixture_alpha"]
+FUSION_STRATEGY = config["scorer"]["fusion"]["strategy"]
+FUSION_PARAMS = {
+    "normalization": config["scorer"]["fusion"]["normalization"],
+    "rrf_k": config["scorer"]["fusion"]["rrf_k"],
+}
 
 
 def score_mixture(
-    lexical_scores, dense_scores, top_n, return_score=False
+    lexical_scores,
+    dense_scores,
+    top_n,
+    return_score=False,
+    candidate_ids=None,
+    alpha: Optional[float] = None,
+    mask: Optional[np.ndarray] = None,
 ) -> Union[List[int], Tuple[List[int], None]]:
-    """Combines lexical and dense scores using a weighted sum and returns the indices of the top-scoring items.
+    """Fuses lexical and dense scores with the configured fusion strategy and returns the indices of the
+    top-scoring items. 2D score arrays (one row per query) are fused row-wise.
 
     Args:
         lexical_scores (np.ndarray): Array of scores from a lexical model.
         dense_scores (np.ndarray): Array of scores from a dense model.
         top_n (int): Number of top items to return.
         return_score (bool, optional): If True, also returns the corresponding scores. Defaults to False.
+        candidate_ids (np.ndarray, optional): Item ids the score arrays are aligned with, 1D or one row per
+        query. If None, the scores are assumed to cover the whole catalog and positions are returned as ids.
+        Defaults to None.
+        alpha (Optional[float], optional): Weight of the lexical signal for this request. If None, uses the
+        configured lexical_score_mixture_alpha. Defaults to None.
+        mask (Optional[np.ndarray], optional): Valid entries, e.g. of padded 2D inputs. Invalid entries are never
+        returned, so rows may hold fewer than top_n ids. Defaults to None.
 
     Returns:
         Union[List[int], Tuple[List[int], np.ndarray]]:
             If return_score is False, returns a list of indices of the top-scoring items.
             If return_score is True, returns a tuple containing the list of indices and their corresponding scores.
     """
-    scores = LEXICAL_ALPHA * lexical_scores + (1 - LEXICAL_ALPHA) * dense_scores
-    top_ids = scores.argsort()[-top_n:][::-1]
+    scores = fuse(
+        lexical_scores,
+        dense_scores,
+        strategy=FUSION_STRATEGY,
+        alpha=LEXICAL_ALPHA if alpha is None else alpha,
+        mask=mask,
+        **FUSION_PARAMS,
+    )
+    top_positions = top_k_indices(scores, top_n)
+    top_ids = (
+        top_positions
+        if candidate_ids is None
+        else np.take_along_axis(np.asarray(candidate_ids), top_positions, axis=-1)
+    )
+    top_scores = np.take_along_axis(scores, top_positions, axis=-1)
+    if mask is None:
+        top_ids = top_ids.tolist()
+    elif top_ids.ndim == 1:
+        found = np.isfinite(top_scores)
+        top_ids, top_scores = top_ids[found].tolist(), top_scores[found]
+    else:
+        found = np.isfinite(top_scores)
+        top_ids = [
+            row[valid].tolist() for row, valid in zip(top_ids, found, strict=True)
+        ]
+        top_scores = [row[valid] for row, valid in zip(top_scores, found, strict=True)]
     if return_score:
-        return top_ids.tolist(), scores[top_ids]
-    return top_ids.tolist()
+        return top_ids, top_scores
+    return top_ids
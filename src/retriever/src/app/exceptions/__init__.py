@@ -1,3 +1,19 @@
-from .exceptions import WrongRetrievalMethod, WrongSimilarityMethod
+from .exceptions import (
+    CircuitOpenError,
+    StageTimeoutError,
+    WrongArtifactVersion,
+    WrongFusionStrategy,
+    WrongRerankMode,
+    WrongRetrievalMethod,
+    WrongSimilarityMethod,
+)
 
-__all__ = ["WrongRetrievalMethod", "WrongSimilarityMethod"]
+__all__ = [
+    "CircuitOpenError",
+    "StageTimeoutError",
+    "WrongArtifactVersion",
+    "WrongFusionStrategy",
+    "WrongRerankMode",
+    "WrongRetrievalMethod",
+    "WrongSimilarityMethod",
+]
@@ -8,3 +8,33 @@ class WrongSimilarityMethod(Exception):
     """Exception to be raised when the selected similarity method is not available"""
 
     pass
+
+
+class StageTimeoutError(Exception):
+    """Exception to be raised when a retrieval stage exceeds its time budget"""
+
+    pass
+
+
+class WrongArtifactVersion(Exception):
+    """Exception to be raised when the artifacts were saved in an unsupported format version"""
+
+    pass
+
+
+class WrongFusionStrategy(Exception):
+    """Exception to be raised when the selected score fusion strategy is not available"""
+
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Exception to be raised when a call is rejected because the circuit of its dependency is open"""
+
+    pass
+
+
+class WrongRerankMode(Exception):
+    """Exception to be raised when the selected search rerank mode is not available"""
+
+    pass
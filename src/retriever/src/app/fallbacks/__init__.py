@@ -2,10 +2,12 @@ from .fallback_wrapper import (
     async_error_handler_with_fallback,
     default_fallback_data_docs,
     default_fallback_data_ids,
+    default_fallback_data_ids_batch,
 )
 
 __all__ = [
     "async_error_handler_with_fallback",
     "default_fallback_data_docs",
     "default_fallback_data_ids",
+    "default_fallback_data_ids_batch",
 ]
@@ -1,81 +1,126 @@
 import asyncio
 import functools
-from typing import List
+from typing import List, Tuple, Union
 
 import pandas as pd
 from utils import logger
 
+from ..core.resilience import (
+    backoff_delay,
+    deadline_scope,
+    fallback_metrics,
+    in_deadline_scope,
+    mark_degraded,
+    remaining_budget,
+)
+from ..exceptions import CircuitOpenError
 
-def async_error_handler_with_fallback(fallback=None, retries=0, delay=0):
+
+def async_error_handler_with_fallback(
+    fallback=None, retries=0, delay=0, max_delay=None, deadline_s=None
+):
     """
     Async decorator to wrap async methods with error handling and fallback.
 
+    Every call gets a deadline shared through a context variable. Attempts are cut at the
+    deadline, retries wait a jittered exponential backoff and are skipped when the backoff
+    would overrun the deadline or when the circuit of the failing dependency is open. Calls
+    nested in another wrapped call run once and let the outer call retry or fall back, so
+    retries never multiply. Fallback responses flag the request as degraded.
+
     Args:
         fallback: Async function or sync function to call as fallback if the wrapped function fails.
                   If None, returns None on failure.
         retries: Number of retry attempts before fallback.
-        delay: Delay in seconds between retries.
+        delay: Base delay in seconds of the backoff between retries.
+        max_delay: Maximum delay in seconds between retries. If None, the delay is not capped.
+        deadline_s: Time budget in seconds of the call, retries included. If None, no limit.
     """
 
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            attempts = 0
-            while True:
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    attempts += 1
-                    logger.warning(f"Error in {func.__name__}: {e}, attempt {attempts}")
-                    if attempts > retries:
-                        if fallback:
-                            logger.warning(f"Using fallback for {func.__name__}")
-                            if asyncio.iscoroutinefunction(fallback):
-                                return await fallback(*args, **kwargs)
+            if in_deadline_scope():
+                return await func(*args, **kwargs)
+            name = func.__name__
+            fallback_metrics.record(name, "calls")
+            with deadline_scope(deadline_s):
+                attempts = 0
+                while True:
+                    try:
+                        return await asyncio.wait_for(
+                            func(*args, **kwargs), timeout=remaining_budget()
+                        )
+                    except Exception as e:
+                        attempts += 1
+                        logger.warning(f"Error in {name}: {e}, attempt {attempts}")
+                        pause = backoff_delay(attempts, delay, max_delay)
+                        remaining = remaining_budget()
+                        out_of_time = remaining is not None and pause >= remaining
+                        if isinstance(e, CircuitOpenError):
+                            fallback_metrics.record(name, "short_circuited")
+                        elif out_of_time:
+                            fallback_metrics.record(name, "deadline_exceeded")
+                        if (
+                            attempts > retries
+                            or out_of_time
+                            or isinstance(e, CircuitOpenError)
+                        ):
+                            fallback_metrics.record(name, "fallbacks")
+                            mark_degraded("fallback")
+                            if fallback:
+                                logger.warning(f"Using fallback for {name}")
+                                if asyncio.iscoroutinefunction(fallback):
+                                    return await fallback(*args, **kwargs)
+                                else:
+                                    return fallback(*args, **kwargs)
                             else:
-                                return fallback(*args, **kwargs)
-                        else:
-                            logger.warning(
-                                f"No fallback defined for {func.__name__}, returning None"
-                            )
-                            return None
-                    if delay:
-                        await asyncio.sleep(delay)
+                                logger.warning(
+                                    f"No fallback defined for {name}, returning None"
+                                )
+                                return None
+                        fallback_metrics.record(name, "retries")
+                        if pause:
+                            await asyncio.sleep(pause)
 
         return wrapper
 
     return decorator
 
 
-def default_fallback_data_ids(*args, **kwargs) -> List[int]:
-    """Placeholder function to handle errors.
-    A good approach might be to recommend on item's popularity for fallback
+def default_fallback_data_ids(
+    self, query, top_n, return_score=False, alpha=None, filters=None, *args, **kwargs
+) -> Union[List[int], Tuple[List[int], List[float]]]:
+    """Serves the most popular products matching the request filters, from the rankings
+    precomputed by the batch pipeline.
+
+    Returns:
+        Union[List[int], Tuple[List[int], List[float]]]: same output as retrieve_ids, with
+        popularity scores
+    """
+    ids, scores = self.popular_ids(top_n, filters)
+    return (ids, scores) if return_score else ids
+
+
+def default_fallback_data_ids_batch(
+    self, queries: List[str], top_n, alpha=None, filters=None, *args, **kwargs
+) -> List[List[int]]:
+    """Serves the most popular products matching the request filters to every query.
 
     Returns:
-        RetrievalIDResponse: a fallback response with items ids
+        List[List[int]]: the same popular ids for each query
     """
-    return [0, 1, 2]
+    ids, _ = self.popular_ids(top_n, filters)
+    return [list(ids) for _ in queries]
 
 
-def default_fallback_data_docs(*args, **kwargs) -> pd.DataFrame:
-    """Placeholder function to handle errors.
-    A good approach might be to recommend on item's popularity for fallback
+async def default_fallback_data_docs(
+    self, query, top_n, alpha=None, filters=None, *args, **kwargs
+) -> pd.DataFrame:
+    """Serves the most popular products matching the request filters, with the same columns
+    as retrieve_docs.
 
     Returns:
-        RetrievalIDResponse: a fallback response with items ids
+        pd.DataFrame: the popular products with their popularity scores
     """
-    placeholder_df = pd.DataFrame(
-        {
-            "product_id": [0],
-            "product_name": ["armchair"],
-            "product_class": ["chairs"],
-            "category_hierarchy": ["chairs"],
-            "product_description": ["an armchair"],
-            "product_features": [""],
-            "rating_count": [10],
-            "average_rating": [4.5],
-            "review_count": [5],
-            "score": [0],
-        }
-    )
-    return placeholder_df
+    return await self.docs_from_ids(*self.popular_ids(top_n, filters))
@@ -7,6 +7,15 @@ retrieve_ids_examples = {
                         "summary": "Send a query and retrieve top similar documents IDs",
                         "value": {"query": "turquoise pillow", "top_n": 10},
                     },
+                    "filtered": {
+                        "summary": "Retrieve only well rated products of a category",
+                        "value": {
+                            "query": "turquoise pillow",
+                            "top_n": 10,
+                            "category_prefix": "Décor & Pillows",
+                            "min_average_rating": 4,
+                        },
+                    },
                 }
             }
         }
@@ -23,6 +32,58 @@ retrieve_docs_examples = {
                         "summary": "Send a query and retrieve top similar documents",
                         "value": {"query": "turquoise pillow", "top_n": 10},
                     },
+                    "fields": {
+                        "summary": "Retrieve only the names and scores of the top documents",
+                        "value": {
+                            "query": "turquoise pillow",
+                            "top_n": 10,
+                            "fields": ["product_id", "product_name", "score"],
+                        },
+                    },
+                }
+            }
+        }
+    }
+}
+
+
+retrieve_ids_batch_examples = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "examples": {
+                    "default": {
+                        "summary": "Send several queries and retrieve top similar documents IDs for each one",
+                        "value": {
+                            "queries": ["turquoise pillow", "wooden desk"],
+                            "top_n": 10,
+                        },
+                    },
+                }
+            }
+        }
+    }
+}
+
+
+search_examples = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "examples": {
+                    "default": {
+                        "summary": "Send a query and get the top reranked documents",
+                        "value": {"query": "turquoise pillow", "top_n": 10},
+                    },
+                    "candidates": {
+                        "summary": "Rerank more candidates and return only names and scores",
+                        "value": {
+                            "query": "turquoise pillow",
+                            "top_n": 10,
+                            "candidates_n": 100,
+                            "fields": ["product_id", "product_name", "score"],
+                        },
+                    },
                 }
             }
         }
@@ -1,10 +1,16 @@
-import numpy as np
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from utils import logger
 
 from .. import schemas
+from ..core.resilience import request_status_scope
 from ..services import RetrievalService
-from .examples import retrieve_docs_examples, retrieve_ids_examples
+from ..utils import docs_payload
+from .examples import (
+    retrieve_docs_examples,
+    retrieve_ids_batch_examples,
+    retrieve_ids_examples,
+)
 
 router = APIRouter()
 
@@ -20,37 +26,64 @@ async def retrieve_docs_ids(
     request: schemas.RetrievalRequest,
 ) -> schemas.RetrievalIDResponse:
     logger.info(f"New request: {request.query}")
-    doc_ids = await retrieval_service.retrieve_ids(
-        request.query, request.top_n, return_score=False
-    )
-    response = schemas.RetrievalIDResponse(ids=doc_ids)
+    with request_status_scope() as status:
+        doc_ids = await retrieval_service.retrieve_ids(
+            request.query,
+            request.top_n,
+            return_score=False,
+            alpha=request.alpha,
+            filters=request.filters(),
+            dense_timeout_s=request.dense_timeout_s,
+        )
+    response = schemas.RetrievalIDResponse(ids=doc_ids, degraded=status.degraded)
+    return response
+
+
+@router.post(
+    "/retrieve_ids_batch",
+    response_model=schemas.RetrievalBatchIDResponse,
+    openapi_extra=retrieve_ids_batch_examples,
+)
+async def retrieve_docs_ids_batch(
+    request: schemas.RetrievalBatchRequest,
+) -> schemas.RetrievalBatchIDResponse:
+    logger.info(f"New batch request: {len(request.queries)} queries")
+    with request_status_scope() as status:
+        doc_ids = await retrieval_service.retrieve_ids_batch(
+            request.queries,
+            request.top_n,
+            alpha=request.alpha,
+            filters=request.filters(),
+            dense_timeout_s=request.dense_timeout_s,
+        )
+    response = schemas.RetrievalBatchIDResponse(ids=doc_ids, degraded=status.degraded)
     return response
 
 
 @router.post(
     "/retrieve_docs",
     response_model=schemas.RetrievalDocsResponse,
+    response_class=ORJSONResponse,
     openapi_extra=retrieve_docs_examples,
 )
 async def retrieve_docs(
-    request: schemas.RetrievalRequest,
-) -> schemas.RetrievalDocsResponse:
-    doc = await retrieval_service.retrieve_docs(request.query, request.top_n)
-    response = []
-    for _, d in doc.replace({np.nan: None}).iterrows():
-        response.append(
-            schemas.RetrievalDoc(
-                product_id=d.product_id,
-                product_name=d.product_name,
-                product_class=d.product_class,
-                category_hierarchy=d["category hierarchy"],
-                product_description=d.product_description,
-                product_features=d.product_features,
-                rating_count=d.rating_count,
-                average_rating=d.average_rating,
-                review_count=d.review_count,
-                score=d.scores,
-            )
+    request: schemas.RetrievalDocsRequest,
+) -> ORJSONResponse:
+    with request_status_scope() as status:
+        doc = await retrieval_service.retrieve_docs(
+            request.query,
+            request.top_n,
+            alpha=request.alpha,
+            filters=request.filters(),
+            dense_timeout_s=request.dense_timeout_s,
         )
-    response = schemas.RetrievalDocsResponse(docs=response)
-    return response
+    # built column-wise from the retrieved arrays and encoded with orjson, bypassing the
+    # per-row response model validation
+    return ORJSONResponse(
+        {**docs_payload(doc, request.fields), "degraded": status.degraded}
+    )
+
+
+@router.get("/stats", response_model=schemas.StatsResponse)
+async def stats() -> schemas.StatsResponse:
+    return schemas.StatsResponse(**retrieval_service.stats())
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
 from .retriever import router as retrieve_route
+from .search import router as search_route
 
 main_router = APIRouter()
 
 main_router.include_router(
     retrieve_route, prefix="/retrieval", tags=["retrieval endpoint"]
 )
+main_router.include_router(search_route, tags=["search endpoint"])
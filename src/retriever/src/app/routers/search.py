@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from utils import logger
+
+from .. import schemas
+from ..core.resilience import request_status_scope
+from ..services import SearchService
+from ..utils import docs_payload
+from .examples import search_examples
+from .retriever import retrieval_service
+
+router = APIRouter()
+
+search_service: SearchService = SearchService(retrieval_service)
+
+
+@router.post(
+    "/search",
+    response_model=schemas.SearchResponse,
+    response_class=ORJSONResponse,
+    openapi_extra=search_examples,
+)
+async def search(
+    request: schemas.SearchRequest,
+) -> ORJSONResponse:
+    logger.info(f"New search: {request.query}")
+    with request_status_scope() as status:
+        docs, reranked = await search_service.search(
+            request.query,
+            request.top_n,
+            candidates_n=request.candidates_n,
+            alpha=request.alpha,
+            filters=request.filters(),
+            dense_timeout_s=request.dense_timeout_s,
+            rerank=request.rerank,
+        )
+    return ORJSONResponse(
+        {
+            **docs_payload(docs, request.fields),
+            "degraded": status.degraded,
+            "reranked": reranked,
+        }
+    )
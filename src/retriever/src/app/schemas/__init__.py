@@ -1,13 +1,37 @@
 from .schemas import (
+    BatcherStats,
+    CacheStats,
+    CircuitBreakerStats,
+    FallbackStats,
+    HedgingStats,
+    RetrievalBatchIDResponse,
+    RetrievalBatchRequest,
     RetrievalDoc,
+    RetrievalDocsRequest,
     RetrievalDocsResponse,
+    RetrievalFilters,
     RetrievalIDResponse,
     RetrievalRequest,
+    SearchRequest,
+    SearchResponse,
+    StatsResponse,
 )
 
 __all__ = [
+    "BatcherStats",
+    "CacheStats",
+    "CircuitBreakerStats",
+    "FallbackStats",
+    "HedgingStats",
+    "RetrievalBatchIDResponse",
+    "RetrievalBatchRequest",
     "RetrievalDoc",
+    "RetrievalDocsRequest",
     "RetrievalDocsResponse",
+    "RetrievalFilters",
     "RetrievalIDResponse",
     "RetrievalRequest",
+    "SearchRequest",
+    "SearchResponse",
+    "StatsResponse",
 ]
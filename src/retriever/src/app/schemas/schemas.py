@@ -1,29 +1,150 @@
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
-class RetrievalRequest(BaseModel):
+class RetrievalFilters(BaseModel):
+    # attribute filters, applied inside the search so filtered queries still fill top_n
+    product_class: Optional[str] = None
+    # case insensitive prefix of the category hierarchy, on whole segments
+    category_prefix: Optional[str] = None
+    min_average_rating: Optional[float] = Field(default=None, ge=0, le=5)
+
+    def filters(self) -> Dict[str, Union[str, float]]:
+        """The filters set in the request."""
+        return {
+            name: value
+            for name in ("product_class", "category_prefix", "min_average_rating")
+            if (value := getattr(self, name)) is not None
+        }
+
+
+class RetrievalRequest(RetrievalFilters):
     query: str
     top_n: int
+    # weight of the lexical score in the fusion, the configured one when not set
+    alpha: Optional[float] = Field(default=None, ge=0, le=1)
+    # time budget of the dense stage, capped by the configured one. Past it the response is
+    # lexical-only and flagged as degraded
+    dense_timeout_s: Optional[float] = Field(default=None, gt=0)
 
 
 class RetrievalIDResponse(BaseModel):
     ids: List[int]
+    # True when served without the dense signal or from a fallback
+    degraded: bool = False
+
+
+DocField = Literal[
+    "product_id",
+    "product_name",
+    "product_class",
+    "category_hierarchy",
+    "product_description",
+    "product_features",
+    "rating_count",
+    "average_rating",
+    "review_count",
+    "score",
+]
+
+
+class RetrievalDocsRequest(RetrievalRequest):
+    # response fields to return, every field when not set
+    fields: Optional[List[DocField]] = None
+
+
+class SearchRequest(RetrievalDocsRequest):
+    # retrieved candidates passed to the reranker, the configured number when not set. Capped
+    # so a request cannot fetch and rerank a large part of the catalog
+    candidates_n: Optional[int] = Field(default=None, gt=0, le=1000)
+    # False returns the retrieval top_n without reranking
+    rerank: bool = True
+
+
+class RetrievalBatchRequest(RetrievalFilters):
+    queries: List[str]
+    top_n: int
+    alpha: Optional[float] = Field(default=None, ge=0, le=1)
+    dense_timeout_s: Optional[float] = Field(default=None, gt=0)
+
+
+class RetrievalBatchIDResponse(BaseModel):
+    ids: List[List[int]]
+    degraded: bool = False
 
 
 class RetrievalDoc(BaseModel):
-    product_id: int
-    product_name: str
-    product_class: Optional[str]
-    category_hierarchy: Optional[str]
-    product_description: Optional[str]
-    product_features: Optional[str]
-    rating_count: Optional[float]
-    average_rating: Optional[float]
-    review_count: Optional[float]
-    score: float
+    # every field is optional: the request `fields` projects the response, and a missing
+    # catalog value is returned as null
+    product_id: Optional[int] = None
+    product_name: Optional[str] = None
+    product_class: Optional[str] = None
+    category_hierarchy: Optional[str] = None
+    product_description: Optional[str] = None
+    product_features: Optional[str] = None
+    rating_count: Optional[float] = None
+    average_rating: Optional[float] = None
+    review_count: Optional[float] = None
+    score: Optional[float] = None
 
 
 class RetrievalDocsResponse(BaseModel):
     docs: List[RetrievalDoc]
+    degraded: bool = False
+
+
+class SearchResponse(RetrievalDocsResponse):
+    # True when the scores are rerank relevance scores, False for retrieval scores
+    reranked: bool
+
+
+class CacheStats(BaseModel):
+    hits: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+    size: int
+
+
+class BatcherStats(BaseModel):
+    batches: int
+    texts: int
+    mean_batch_size: float
+
+
+class CircuitBreakerStats(BaseModel):
+    state: Literal["closed", "open", "half_open"]
+    consecutive_failures: int
+    calls: int
+    successes: int
+    failures: int
+    rejected: int
+    opened: int
+
+
+class FallbackStats(BaseModel):
+    calls: int
+    retries: int
+    fallbacks: int
+    deadline_exceeded: int
+    short_circuited: int
+
+
+class HedgingStats(BaseModel):
+    requests: int
+    hedged: int
+    hedge_wins: int
+    hedge_delay_ms: Optional[float]
+
+
+class StatsResponse(BaseModel):
+    query_embedding_cache: Optional[CacheStats]
+    query_embedding_batcher: Optional[BatcherStats]
+    # by dependency
+    circuit_breakers: Dict[str, CircuitBreakerStats]
+    # by service method
+    fallbacks: Dict[str, FallbackStats]
+    query_embedding_hedging: Optional[HedgingStats]
+    lexical_only_responses: int
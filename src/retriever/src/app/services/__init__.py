@@ -1,3 +1,4 @@
 from .retrieval import RetrievalService
+from .search import SearchService
 
-__all__ = ["RetrievalService"]
+__all__ = ["RetrievalService", "SearchService"]
@@ -1,57 +1,160 @@
+import asyncio
 import os
-from typing import List, Tuple, Union
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
+from batch_embedings.generators.popularity import popularity_scores
 from batch_embedings.utils import load_data_from_csv
 from utils import load_config, logger
 
+from ..core.cpu_pool import CPUWorkerPool, run_stage
 from ..core.dense_retriever import DenseRetriever
-from ..core.lexical_retrievers import TFIDFRetriever
+from ..core.lexical_retrievers import (
+    BM25Retriever,
+    InvertedIndexRetriever,
+    TFIDFRetriever,
+)
+from ..core.resilience import circuit_breaker_stats, fallback_metrics, mark_degraded
 from ..core.scorer import score_mixture
-from ..exceptions import WrongRetrievalMethod
+from ..core.topk import top_k_indices
+from ..exceptions import CircuitOpenError, StageTimeoutError, WrongRetrievalMethod
 from ..fallbacks import (
     async_error_handler_with_fallback,
     default_fallback_data_docs,
     default_fallback_data_ids,
+    default_fallback_data_ids_batch,
+)
+from ..utils import (
+    CatalogFilterIndex,
+    InMemoryProductStore,
+    PopularityRanking,
+    ProductStore,
+    SQLiteProductStore,
+    load_bm25_artifacts,
+    load_popularity_artifacts,
+    load_tfidf_artifacts,
 )
-from ..utils import load_tfidf_artifacts
 
 config = load_config()
 LEXICAL_METHOD = config["retrievers"]["lexical"]["method"]
-DATA = load_data_from_csv(os.getenv("DATA_PATH"))
+LEXICAL_ENGINE = config["retrievers"]["lexical"]["engine"]
+FUSION_MODE = config["scorer"]["fusion_mode"]
+CANDIDATE_POOL_SIZE = config["scorer"]["candidate_pool_size"]
+ARTIFACTS_MMAP = config["artifacts"]["mmap"]
+BATCH_CHUNK_SIZE = config["scorer"]["batch_chunk_size"]
+CPU_WORKERS = config["concurrency"]["cpu_workers"]
+LEXICAL_TIMEOUT_S = config["concurrency"]["lexical_timeout_s"]
+DENSE_TIMEOUT_S = config["concurrency"]["dense_timeout_s"]
+FUSION_TIMEOUT_S = config["concurrency"]["fusion_timeout_s"]
+DEGRADE_TO_LEXICAL = config["concurrency"]["degrade_to_lexical"]
+# fusion weight of the lexical signal when the dense one is missing
+LEXICAL_ONLY_ALPHA = 1.0
+RETRIES = config["resilience"]["retries"]
+BASE_DELAY_S = config["resilience"]["base_delay_s"]
+MAX_DELAY_S = config["resilience"]["max_delay_s"]
+DEADLINE_S = config["resilience"]["deadline_s"]
+PRODUCT_STORE_BACKEND = config["product_store"]["backend"]
+PRODUCT_STORE_SQLITE_PATH = config["product_store"]["sqlite_path"]
+
+if PRODUCT_STORE_BACKEND == "sqlite":
+    product_store: ProductStore = SQLiteProductStore.build(
+        os.getenv("DATA_PATH"), PRODUCT_STORE_SQLITE_PATH
+    )
+    # only the filterable and popularity attributes are kept in memory
+    catalog = pd.read_csv(
+        os.getenv("DATA_PATH"),
+        sep="\t",
+        usecols=[
+            "product_class",
+            "category hierarchy",
+            "average_rating",
+            "rating_count",
+            "review_count",
+        ],
+    )
+else:
+    catalog = load_data_from_csv(os.getenv("DATA_PATH"))
+    product_store: ProductStore = InMemoryProductStore(catalog)
+filter_index = CatalogFilterIndex(catalog)
+popularity_ranking = load_popularity_artifacts(mmap=ARTIFACTS_MMAP)
+if popularity_ranking is None:
+    logger.warning("Popularity artifacts not found, ranking the catalog at startup")
+    scores = popularity_scores(
+        catalog["average_rating"].to_numpy(),
+        catalog["rating_count"].to_numpy(),
+        catalog["review_count"].to_numpy(),
+        prior_count=config["fallback"]["popularity"]["prior_count"],
+    )
+    popularity_ranking = PopularityRanking(scores, np.argsort(-scores, kind="stable"))
+    del scores
+del catalog
 
 if LEXICAL_METHOD == "tfidf":
-    lexical_retriever = TFIDFRetriever()
-    vectorizer, tfidf_matrix = load_tfidf_artifacts()
+    vectorizer, tfidf_matrix = load_tfidf_artifacts(mmap=ARTIFACTS_MMAP)
+    if LEXICAL_ENGINE == "inverted_index":
+        lexical_retriever = InvertedIndexRetriever(tfidf_matrix)
+    else:
+        lexical_retriever = TFIDFRetriever()
     scoring_kwargs = {"vectorizer": vectorizer, "tfidf_matrix": tfidf_matrix}
 elif LEXICAL_METHOD == "bm25":
-    pass
+    vectorizer, bm25_matrix = load_bm25_artifacts(mmap=ARTIFACTS_MMAP)
+    lexical_retriever = BM25Retriever(bm25_matrix)
+    scoring_kwargs = {"vectorizer": vectorizer, "bm25_matrix": bm25_matrix}
 else:
-    WrongRetrievalMethod(
-        "Selected method for lexical retrieval is not supported {LEXICAL_METHOD}. Must be tfidf or bm25"
+    raise WrongRetrievalMethod(
+        f"Selected method for lexical retrieval is not supported {LEXICAL_METHOD}. Must be tfidf or bm25"
     )
 
 dense_retriever: DenseRetriever = DenseRetriever()
+cpu_pool = CPUWorkerPool(max_workers=CPU_WORKERS)
 
 
 class RetrievalService:
     """Service in charge of retrieving documents given a query"""
 
+    def __init__(self):
+        self.lexical_only_responses = 0
+
     @async_error_handler_with_fallback(
-        fallback=default_fallback_data_ids, retries=3, delay=3
+        fallback=default_fallback_data_ids,
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
     )
     async def retrieve_ids(
-        self, query, top_n, return_score=False
+        self,
+        query,
+        top_n,
+        return_score=False,
+        alpha=None,
+        filters=None,
+        dense_timeout_s=None,
     ) -> Union[List[int], Tuple[List[int], None]]:
         """Retrieves the top N document IDs relevant to the given query using a mixture of lexical and
         dense retrieval scores.
 
+        The query embedding request is in flight while the lexical scores are computed in the CPU
+        pool, so the latency is bounded by the slowest stage instead of their sum. Each stage has its
+        own time budget. When the dense stage runs out of time, or the circuit of the embedding
+        provider is open, the lexical scores computed meanwhile are returned on their own and the
+        request is flagged as degraded.
+
+        Filters are resolved to a row bitmap that is applied inside both searches, so a filtered
+        query still returns top_n matching products when there are enough of them.
+
         Args:
             query (str): The input query string to search for relevant documents.
             top_n (int): The number of top document IDs to retrieve.
             return_score (bool, optional): If True, also returns the corresponding scores for the retrieved
             IDs. Defaults to False.
+            alpha (Optional[float], optional): Weight of the lexical signal for this request. If None, uses
+            the configured one. Defaults to None.
+            filters (Optional[Dict], optional): product_class, category_prefix and min_average_rating
+            filters, see CatalogFilterIndex.mask. Defaults to None.
+            dense_timeout_s (Optional[float], optional): Time budget of the dense stage for this
+            request, capped by the configured one. Defaults to None.
 
             Returns:
             Union[List[int], Tuple[List[int], None]]:
@@ -60,30 +163,450 @@ class RetrievalService:
                 their corresponding scores.
 
         """
-        lexical_score = lexical_retriever.score(query=query, **scoring_kwargs)
-        logger.debug(lexical_score)
-        dense_score, _ = await dense_retriever.score(query, return_unsorted=True)
+        allowed = filter_index.mask(**(filters or {}))
+        if allowed is not None and not allowed.any():
+            return ([], []) if return_score else []
+        if FUSION_MODE == "candidates":
+            return await self._retrieve_ids_from_candidates(
+                query, top_n, return_score, alpha, allowed, dense_timeout_s
+            )
+        lexical_score, dense_score = await asyncio.gather(
+            run_stage(
+                cpu_pool.run(lexical_retriever.score, query=query, **scoring_kwargs),
+                LEXICAL_TIMEOUT_S,
+                "lexical",
+            ),
+            self._dense_stage(self._dense_scores(query), dense_timeout_s),
+        )
+        if dense_score is None:
+            dense_score = np.zeros_like(lexical_score)
+            alpha = LEXICAL_ONLY_ALPHA
         logger.debug(lexical_score)
-        return score_mixture(lexical_score, np.array(dense_score), top_n, return_score)
+        logger.debug(dense_score)
+        return await run_stage(
+            cpu_pool.run(
+                score_mixture,
+                lexical_score,
+                dense_score,
+                top_n,
+                return_score,
+                alpha=alpha,
+                mask=allowed,
+            ),
+            FUSION_TIMEOUT_S,
+            "fusion",
+        )
+
+    async def _dense_stage(
+        self, awaitable: Awaitable, dense_timeout_s: Optional[float] = None
+    ) -> Any:
+        """Awaits a dense stage within its time budget.
+
+        Args:
+            awaitable (Awaitable): the dense stage
+            dense_timeout_s (Optional[float], optional): time budget of the request, capped by
+            the configured one. Defaults to None.
+
+        Returns:
+            Any: the result of the stage, or None when the request has to be served lexical-only
+        """
+        timeout_s = (
+            DENSE_TIMEOUT_S
+            if dense_timeout_s is None
+            else min(dense_timeout_s, DENSE_TIMEOUT_S)
+        )
+        try:
+            return await run_stage(awaitable, timeout_s, "dense")
+        except (StageTimeoutError, CircuitOpenError) as e:
+            if not DEGRADE_TO_LEXICAL:
+                raise
+            logger.warning(f"Serving lexical-only results: {e}")
+            mark_degraded("dense")
+            self.lexical_only_responses += 1
+            return None
+
+    async def _dense_scores(self, query: str) -> np.ndarray:
+        """Embeds the query and scores every product in the CPU pool."""
+        query_embedding = await dense_retriever.embed_query(query)
+        return await cpu_pool.run(dense_retriever.score_all, query_embedding)
+
+    async def _dense_candidates(
+        self, query: str, allowed: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Embeds the query and searches its CANDIDATE_POOL_SIZE nearest allowed products in the
+        CPU pool, returning the query embedding and the product indices."""
+        query_embedding = await dense_retriever.embed_query(query)
+        _, dense_ids = await cpu_pool.run(
+            dense_retriever.search, query_embedding, CANDIDATE_POOL_SIZE, allowed
+        )
+        return query_embedding, dense_ids
+
+    async def _retrieve_ids_from_candidates(
+        self,
+        query: str,
+        top_n: int,
+        return_score: bool = False,
+        alpha: Optional[float] = None,
+        allowed: Optional[np.ndarray] = None,
+        dense_timeout_s: Optional[float] = None,
+    ) -> Union[List[int], Tuple[List[int], None]]:
+        """Fuses lexical and dense scores over a candidate pool instead of the whole catalog.
+
+        The top CANDIDATE_POOL_SIZE items of each retriever are merged and only that union is
+        scored with both signals, so the per-query cost depends on the pool size and not on the
+        catalog size. The lexical top-k runs in the CPU pool while the query is being embedded.
+
+        Args:
+            query (str): The input query string to search for relevant documents.
+            top_n (int): The number of top document IDs to retrieve.
+            return_score (bool, optional): If True, also returns the fused scores. Defaults to False.
+            alpha (Optional[float], optional): Weight of the lexical signal for this request.
+            Defaults to None.
+            allowed (Optional[np.ndarray], optional): Bitmap of the products matching the
+            filters, both candidate searches only return those. Defaults to None.
+            dense_timeout_s (Optional[float], optional): Time budget of the dense stage for this
+            request. Defaults to None.
+
+        Returns:
+            Union[List[int], Tuple[List[int], None]]: Same output as retrieve_ids.
+        """
+        lexical_ids, dense_candidates = await asyncio.gather(
+            run_stage(
+                cpu_pool.run(
+                    lexical_retriever.retrieve,
+                    query=query,
+                    top_n=CANDIDATE_POOL_SIZE,
+                    allowed=allowed,
+                    **scoring_kwargs,
+                ),
+                LEXICAL_TIMEOUT_S,
+                "lexical",
+            ),
+            self._dense_stage(self._dense_candidates(query, allowed), dense_timeout_s),
+        )
+        if dense_candidates is None:
+            query_embedding, candidate_ids = None, lexical_ids
+        else:
+            query_embedding, dense_ids = dense_candidates
+            candidate_ids = np.union1d(lexical_ids, dense_ids)
+        return await run_stage(
+            cpu_pool.run(
+                self._fuse_candidates,
+                query,
+                query_embedding,
+                candidate_ids,
+                top_n,
+                return_score,
+                alpha,
+            ),
+            FUSION_TIMEOUT_S,
+            "fusion",
+        )
+
+    @staticmethod
+    def _fuse_candidates(
+        query: str,
+        query_embedding: Optional[np.ndarray],
+        candidate_ids: np.ndarray,
+        top_n: int,
+        return_score: bool,
+        alpha: Optional[float],
+    ) -> Union[List[int], Tuple[List[int], None]]:
+        """Scores the candidate union with both retrievers and fuses the scores. Without query
+        embedding, only the lexical scores are used."""
+        lexical_score = lexical_retriever.score_candidates(
+            query=query, candidate_ids=candidate_ids, **scoring_kwargs
+        )
+        if query_embedding is None:
+            dense_score = np.zeros_like(lexical_score)
+            alpha = LEXICAL_ONLY_ALPHA
+        else:
+            dense_score = dense_retriever.score_candidates(
+                query_embedding, candidate_ids
+            )
+        logger.debug(f"Fusing {candidate_ids.shape[0]} candidates")
+        return score_mixture(
+            lexical_score,
+            dense_score,
+            top_n,
+            return_score,
+            candidate_ids=candidate_ids,
+            alpha=alpha,
+        )
+
+    @async_error_handler_with_fallback(
+        fallback=default_fallback_data_ids_batch,
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
+    )
+    async def retrieve_ids_batch(
+        self,
+        queries: List[str],
+        top_n: int,
+        alpha: Optional[float] = None,
+        filters: Optional[Dict] = None,
+        dense_timeout_s: Optional[float] = None,
+    ) -> List[List[int]]:
+        """Retrieves the top N document IDs of several queries at once.
+
+        All queries are embedded in one request and searched with a single FAISS call over the
+        query matrix, lexical scores come from one sparse matrix-matrix product computed in the
+        CPU pool while the embedding request is in flight, and the fusion runs row-wise in NumPy
+        over chunks of BATCH_CHUNK_SIZE queries to bound memory. In candidates fusion mode each
+        query fuses the union of its lexical and dense top candidate_pool_size, as a padded
+        (queries x candidates) matrix. In full mode the whole catalog is fused and dense scores
+        outside the FAISS results count as zero. Like retrieve_ids, the batch is served
+        lexical-only when the dense stage runs out of time.
+
+        Args:
+            queries (List[str]): The input query strings.
+            top_n (int): The number of top document IDs to retrieve per query.
+            alpha (Optional[float], optional): Weight of the lexical signal for this request. If
+            None, uses the configured one. Defaults to None.
+            filters (Optional[Dict], optional): filters applied to every query, see
+            retrieve_ids. Defaults to None.
+            dense_timeout_s (Optional[float], optional): Time budget of the dense stage for this
+            request. Defaults to None.
+
+        Returns:
+            List[List[int]]: The top N retrieved document IDs of each query, in input order.
+        """
+        allowed = filter_index.mask(**(filters or {}))
+        if allowed is not None and not allowed.any():
+            return [[] for _ in queries]
+        n_products = dense_retriever.index.ntotal
+        k = n_products if FUSION_MODE == "full" else CANDIDATE_POOL_SIZE
+        lexical_scores, dense_results = await asyncio.gather(
+            run_stage(
+                cpu_pool.run(lexical_retriever.score_batch, queries, **scoring_kwargs),
+                LEXICAL_TIMEOUT_S,
+                "lexical",
+            ),
+            self._dense_stage(
+                self._dense_search_batch(queries, k, allowed), dense_timeout_s
+            ),
+        )
+        if dense_results is None:
+            # no dense neighbours, so only the lexical candidates are fused
+            dense_results = (
+                None,
+                np.zeros((len(queries), 0), dtype=np.float32),
+                np.full((len(queries), 0), -1, dtype=np.int64),
+            )
+            alpha = LEXICAL_ONLY_ALPHA
+        fuse_batch = (
+            self._fuse_batch_full
+            if FUSION_MODE == "full"
+            else self._fuse_batch_candidates
+        )
+        return await run_stage(
+            cpu_pool.run(
+                fuse_batch, lexical_scores, *dense_results, top_n, alpha, allowed
+            ),
+            FUSION_TIMEOUT_S,
+            "fusion",
+        )
+
+    async def _dense_search_batch(
+        self, queries: List[str], k: int, allowed: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Embeds the queries in one request and searches them in the CPU pool among the allowed
+        products, returning the query embeddings, the scores and the product indices."""
+        query_embeddings = await dense_retriever.embed_queries(queries)
+        dense_distances, dense_ids = await cpu_pool.run(
+            dense_retriever.search_batch, query_embeddings, k, allowed
+        )
+        return query_embeddings, dense_distances, dense_ids
+
+    @staticmethod
+    def _fuse_batch_full(
+        lexical_scores,
+        query_embeddings: np.ndarray,
+        dense_distances: np.ndarray,
+        dense_ids: np.ndarray,
+        top_n: int,
+        alpha: Optional[float],
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[List[int]]:
+        """Fuses the catalog-wide batch scores row-wise over chunks of BATCH_CHUNK_SIZE queries.
+        Products outside the allowed bitmap are masked out of the fusion."""
+        n_products = dense_retriever.index.ntotal
+        doc_ids = []
+        for start in range(0, dense_ids.shape[0], BATCH_CHUNK_SIZE):
+            stop = start + BATCH_CHUNK_SIZE
+            chunk_ids = dense_ids[start:stop]
+            dense_scores = np.zeros((chunk_ids.shape[0], n_products), dtype=np.float32)
+            rows, slots = np.nonzero(chunk_ids >= 0)
+            dense_scores[rows, chunk_ids[rows, slots]] = dense_distances[start:stop][
+                rows, slots
+            ]
+            doc_ids.extend(
+                score_mixture(
+                    lexical_scores[start:stop].toarray(),
+                    dense_scores,
+                    top_n,
+                    alpha=alpha,
+                    mask=(
+                        None
+                        if allowed is None
+                        else np.broadcast_to(allowed, dense_scores.shape)
+                    ),
+                )
+            )
+        return doc_ids
+
+    @staticmethod
+    def _fuse_batch_candidates(
+        lexical_scores,
+        query_embeddings: Optional[np.ndarray],
+        dense_distances: np.ndarray,
+        dense_ids: np.ndarray,
+        top_n: int,
+        alpha: Optional[float],
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[List[int]]:
+        """Fuses, for each query, the union of its lexical and dense top candidates.
+
+        Candidates are laid out as a (queries x 2 * candidate_pool_size) matrix per chunk of
+        BATCH_CHUNK_SIZE queries. Each row is sorted so repeated ids are adjacent, and only the
+        first occurrence of every id is kept valid in the fusion mask. Lexical candidates are
+        taken among the allowed products, as the dense ones already are.
+        """
+        doc_ids = []
+        for start in range(0, dense_ids.shape[0], BATCH_CHUNK_SIZE):
+            stop = start + BATCH_CHUNK_SIZE
+            chunk_lexical = lexical_scores[start:stop].toarray()
+            lexical_candidates = top_k_indices(
+                chunk_lexical
+                if allowed is None
+                else np.where(allowed, chunk_lexical, -np.inf),
+                CANDIDATE_POOL_SIZE,
+            )
+            candidates = np.sort(
+                np.concatenate([dense_ids[start:stop], lexical_candidates], axis=1),
+                axis=1,
+            )
+            mask = candidates >= 0
+            mask[:, 1:] &= candidates[:, 1:] != candidates[:, :-1]
+            if allowed is not None:
+                mask &= allowed[np.maximum(candidates, 0)]
+            candidates[~mask] = 0
+            lexical_candidates = np.take_along_axis(chunk_lexical, candidates, axis=1)
+            dense_candidates = np.zeros(candidates.shape, dtype=np.float32)
+            if query_embeddings is not None:
+                for row, query_embedding in enumerate(query_embeddings[start:stop]):
+                    dense_candidates[row, mask[row]] = dense_retriever.score_candidates(
+                        query_embedding, candidates[row, mask[row]]
+                    )
+            doc_ids.extend(
+                score_mixture(
+                    lexical_candidates,
+                    dense_candidates,
+                    top_n,
+                    candidate_ids=candidates,
+                    alpha=alpha,
+                    mask=mask,
+                )
+            )
+        return doc_ids
 
     @async_error_handler_with_fallback(
-        fallback=default_fallback_data_docs, retries=3, delay=3
+        fallback=default_fallback_data_docs,
+        retries=RETRIES,
+        delay=BASE_DELAY_S,
+        max_delay=MAX_DELAY_S,
+        deadline_s=DEADLINE_S,
     )
-    async def retrieve_docs(self, query: str, top_n: int) -> pd.DataFrame:
+    async def retrieve_docs(
+        self,
+        query: str,
+        top_n: int,
+        alpha: Optional[float] = None,
+        filters: Optional[Dict] = None,
+        dense_timeout_s: Optional[float] = None,
+    ) -> pd.DataFrame:
         """Retrieves the top N documents most relevant to the given query.
 
         Args:
             query (str): The search query string used to retrieve relevant documents.
             top_n (int): The number of top documents to retrieve based on relevance.
+            alpha (Optional[float], optional): Weight of the lexical signal for this request.
+            Defaults to None.
+            filters (Optional[Dict], optional): see retrieve_ids. Defaults to None.
+            dense_timeout_s (Optional[float], optional): see retrieve_ids. Defaults to None.
 
         Resturns:
-            pd.DataFrame: A DataFrame containing the merged product data and their relevance
-            scores, sorted in descending order of scores.
+            pd.DataFrame: A DataFrame containing the product data and their relevance scores,
+            sorted in descending order of scores.
 
         """
-        # For this sample code will use the csv as a base, in production this may be a query against the products DB
-        ids, scores = await self.retrieve_ids(query, top_n, return_score=True)
-        scores_df = pd.DataFrame({"product_id": ids, "scores": scores})
-        return DATA.merge(scores_df, how="inner", on="product_id").sort_values(
-            by="scores", ascending=False
+        ids, scores = await self.retrieve_ids(
+            query,
+            top_n,
+            return_score=True,
+            alpha=alpha,
+            filters=filters,
+            dense_timeout_s=dense_timeout_s,
         )
+        return await self.docs_from_ids(ids, scores)
+
+    async def docs_from_ids(self, ids: List[int], scores: List[float]) -> pd.DataFrame:
+        """Fetches the products of the given ids from the product store.
+
+        Args:
+            ids (List[int]): product ids, best first
+            scores (List[float]): scores of the products
+
+        Returns:
+            pd.DataFrame: the product data with a scores column, in the order of the ids
+        """
+        # ids come best first, so the rows are gathered in score order from the product store
+        found, columns = await cpu_pool.run(
+            product_store.get_columns, np.asarray(ids, dtype=np.int64)
+        )
+        docs = pd.DataFrame(columns, columns=product_store.columns)
+        docs["scores"] = np.asarray(scores)[found]
+        return docs
+
+    def popular_ids(
+        self, top_n: int, filters: Optional[Dict] = None
+    ) -> Tuple[List[int], List[float]]:
+        """Most popular products matching the filters, from the precomputed rankings. Served by
+        the fallbacks.
+
+        Args:
+            top_n (int): number of products to return
+            filters (Optional[Dict], optional): see retrieve_ids. Defaults to None.
+
+        Returns:
+            Tuple[List[int], List[float]]: product ids and popularity scores, most popular first
+        """
+        filters = filters or {}
+        return popularity_ranking.top(
+            top_n,
+            product_class=filters.get("product_class"),
+            allowed=filter_index.mask(**filters),
+        )
+
+    def stats(self) -> dict:
+        """Collects the runtime counters of the retrieval pipeline.
+
+        Returns:
+            dict: counters per component, None for disabled components
+        """
+        query_cache = dense_retriever.query_cache
+        query_batcher = dense_retriever.query_batcher
+        return {
+            "query_embedding_cache": query_cache.stats() if query_cache else None,
+            "query_embedding_batcher": query_batcher.stats() if query_batcher else None,
+            "circuit_breakers": circuit_breaker_stats(),
+            "fallbacks": fallback_metrics.stats(),
+            "query_embedding_hedging": (
+                dense_retriever.embed_hedger.stats()
+                if dense_retriever.embed_hedger
+                else None
+            ),
+            "lexical_only_responses": self.lexical_only_responses,
+        }
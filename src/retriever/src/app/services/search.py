@@ -0,0 +1,137 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from utils import load_config
+
+from ..core.cohere_reranker import CohereReranker
+from ..core.rerankers import (
+    CandidateReranker,
+    LocalReranker,
+    RemoteReranker,
+    rerank_candidates,
+)
+from ..exceptions import WrongRerankMode
+from .retrieval import RetrievalService
+
+config = load_config()
+search_config = config["search"]
+circuit_breaker_config = config["resilience"]["circuit_breaker"]
+CANDIDATES_N = search_config["candidates_n"]
+RERANK_TIMEOUT_S = search_config["rerank_timeout_s"]
+RERANK_MODE = os.getenv("RERANK_MODE") or search_config["rerank_mode"]
+
+
+def build_candidate_reranker(
+    mode: str, reranker_url: Optional[str] = None
+) -> Optional[CandidateReranker]:
+    """Builds the reranker of the search pipeline.
+
+    Args:
+        mode (str): local, remote or none
+        reranker_url (Optional[str], optional): url of the reranker service, needed by the
+        remote mode. Defaults to None.
+
+    Raises:
+        WrongRerankMode: if the mode is not supported or the remote mode has no url
+
+    Returns:
+        Optional[CandidateReranker]: the reranker, None when search does not rerank
+    """
+    if mode == "none":
+        return None
+    if mode == "local":
+        local_config = search_config["local"]
+        return LocalReranker(
+            CohereReranker(
+                local_config["model"], timeout_s=RERANK_TIMEOUT_S
+            ).rerank_scores,
+            columns=local_config["columns_to_rerank"],
+            max_chars=local_config["max_chars"],
+            cache_size=local_config["cache_size"],
+            chunk_size=local_config["chunk_size"],
+            max_concurrency=local_config["max_concurrency"],
+        )
+    if mode == "remote":
+        if not reranker_url:
+            raise WrongRerankMode("The remote rerank mode needs RERANKER_URL to be set")
+        remote_config = search_config["remote"]
+        return RemoteReranker(
+            reranker_url,
+            timeout_s=RERANK_TIMEOUT_S,
+            connect_timeout_s=remote_config["connect_timeout_s"],
+            max_connections=remote_config["max_connections"],
+            max_keepalive_connections=remote_config["max_keepalive_connections"],
+            keepalive_expiry_s=remote_config["keepalive_expiry_s"],
+            circuit_breaker_config=circuit_breaker_config,
+        )
+    raise WrongRerankMode(
+        f"Selected rerank mode is not supported {mode}. Must be local, remote or none"
+    )
+
+
+candidate_reranker: Optional[CandidateReranker] = build_candidate_reranker(
+    RERANK_MODE, os.getenv("RERANKER_URL")
+)
+
+
+class SearchService:
+    """Service in charge of the full search pipeline: retrieval, then reranking of the
+    retrieved candidates, in a single request"""
+
+    def __init__(self, retrieval_service: RetrievalService):
+        """Initializes the service.
+
+        Args:
+            retrieval_service (RetrievalService): service retrieving the candidates
+        """
+        self.retrieval_service = retrieval_service
+
+    async def search(
+        self,
+        query: str,
+        top_n: int,
+        candidates_n: Optional[int] = None,
+        alpha: Optional[float] = None,
+        filters: Optional[Dict] = None,
+        dense_timeout_s: Optional[float] = None,
+        rerank: bool = True,
+    ) -> Tuple[pd.DataFrame, bool]:
+        """Retrieves candidates for the query and reranks them.
+
+        The candidates stay in process between the stages: the product rows fetched once from
+        the product store feed the reranker and the response. When reranking fails or times
+        out, the retrieval order is returned and the request is flagged as degraded (see
+        rerank_candidates).
+
+        Args:
+            query (str): The search query string.
+            top_n (int): The number of products to return.
+            candidates_n (Optional[int], optional): Number of retrieved candidates passed to the
+            reranker, at least top_n. If None, uses the configured one. Defaults to None.
+            alpha (Optional[float], optional): see RetrievalService.retrieve_ids. Defaults to
+            None.
+            filters (Optional[Dict], optional): see RetrievalService.retrieve_ids. Defaults to
+            None.
+            dense_timeout_s (Optional[float], optional): see RetrievalService.retrieve_ids.
+            Defaults to None.
+            rerank (bool, optional): If False, returns the retrieval top_n. Defaults to True.
+
+        Returns:
+            Tuple[pd.DataFrame, bool]: the product data with their scores, best first, and
+            whether they were reranked (relevance scores) or not (retrieval scores)
+        """
+        reranker = candidate_reranker if rerank else None
+        n_candidates = (
+            top_n if reranker is None else max(candidates_n or CANDIDATES_N, top_n)
+        )
+        ids, scores = await self.retrieval_service.retrieve_ids(
+            query,
+            n_candidates,
+            return_score=True,
+            alpha=alpha,
+            filters=filters,
+            dense_timeout_s=dense_timeout_s,
+        )
+        docs = await self.retrieval_service.docs_from_ids(ids, scores)
+        return await rerank_candidates(reranker, query, docs, top_n, RERANK_TIMEOUT_S)
@@ -1,3 +1,23 @@
-from .load_artifacts import load_bm25_artifacts, load_tfidf_artifacts
+from .doc_payload import DOC_FIELDS, docs_payload
+from .filter_index import CatalogFilterIndex, normalize_category_path
+from .load_artifacts import (
+    load_bm25_artifacts,
+    load_popularity_artifacts,
+    load_tfidf_artifacts,
+)
+from .popularity import PopularityRanking
+from .product_store import InMemoryProductStore, ProductStore, SQLiteProductStore
 
-__all__ = ["load_tfidf_artifacts", "load_bm25_artifacts"]
+__all__ = [
+    "DOC_FIELDS",
+    "docs_payload",
+    "CatalogFilterIndex",
+    "normalize_category_path",
+    "load_tfidf_artifacts",
+    "load_bm25_artifacts",
+    "load_popularity_artifacts",
+    "PopularityRanking",
+    "InMemoryProductStore",
+    "ProductStore",
+    "SQLiteProductStore",
+]
@@ -1,9 +1,43 @@
+import json
 import os
 
 import faiss
 
 ARTIFACTS_SAVE_PATH = os.getenv("ARTIFACTS_SAVE_PATH")
+IVF_INDEX_TYPES = ("ivf_flat", "ivf_pq", "opq_ivf_pq")
 
 
-def load_index():
-    return faiss.read_index(ARTIFACTS_SAVE_PATH + "products_index.faiss")
+def load_index(mmap: bool = False):
+    """Load the FAISS index.
+
+    Args:
+        mmap (bool, optional): If True, the index data is memory-mapped read-only instead of
+        copied to the process heap, so every worker shares the same page cache copy. IVF
+        inverted lists are mapped with IO_FLAG_MMAP and flat codes (Flat, HNSW) with
+        IO_FLAG_MMAP_IFC. Defaults to False.
+
+    Returns:
+        faiss.Index: the loaded index
+    """
+    io_flags = 0
+    if mmap:
+        index_type = load_index_metadata().get("type", "flat")
+        io_flags = (
+            faiss.IO_FLAG_MMAP
+            if index_type in IVF_INDEX_TYPES
+            else faiss.IO_FLAG_MMAP_IFC
+        ) | faiss.IO_FLAG_READ_ONLY
+    return faiss.read_index(ARTIFACTS_SAVE_PATH + "products_index.faiss", io_flags)
+
+
+def load_index_metadata() -> dict:
+    """Load the metadata saved next to the FAISS index.
+
+    Returns:
+        dict: index metadata. Empty if the index was built without metadata (exact flat index).
+    """
+    metadata_path = ARTIFACTS_SAVE_PATH + "products_index.json"
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, "r") as f:
+        return json.load(f)
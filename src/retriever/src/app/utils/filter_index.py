@@ -0,0 +1,117 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_SEPARATOR = "/"
+
+
+def normalize_category_path(path: str) -> str:
+    """Normalizes a category hierarchy path so prefixes compare segment by segment.
+
+    Args:
+        path (str): category path, e.g. "Furniture / Living Room Furniture"
+
+    Returns:
+        str: lowercased segments joined by " / "
+    """
+    segments = [
+        " ".join(segment.lower().split()) for segment in path.split(CATEGORY_SEPARATOR)
+    ]
+    return " / ".join(segment for segment in segments if segment)
+
+
+class CatalogFilterIndex:
+    """Attribute indexes over the catalog rows, built once at startup.
+
+    product_class and every category hierarchy prefix map to the sorted rows holding them
+    (inverted indexes), and average ratings are kept sorted so a minimum rating is a binary
+    search. A filter combines them into a boolean bitmap over the rows, which is applied
+    inside the dense and lexical searches.
+    """
+
+    def __init__(
+        self,
+        products_df: pd.DataFrame,
+        product_class_column: str = "product_class",
+        category_column: str = "category hierarchy",
+        rating_column: str = "average_rating",
+    ):
+        """Builds the indexes. Rows are positions in products_df, i.e. index and matrix rows.
+
+        Args:
+            products_df (pd.DataFrame): product catalog, in index order
+            product_class_column (str, optional): Defaults to "product_class".
+            category_column (str, optional): Defaults to "category hierarchy".
+            rating_column (str, optional): Defaults to "average_rating".
+        """
+        self.n_rows = products_df.shape[0]
+        self.product_class_rows = self._inverted_index(
+            products_df[product_class_column]
+        )
+        prefixes = {}
+        for row, path in enumerate(products_df[category_column]):
+            if not isinstance(path, str):
+                continue
+            segments = normalize_category_path(path).split(" / ")
+            for depth in range(1, len(segments) + 1):
+                prefixes.setdefault(" / ".join(segments[:depth]), []).append(row)
+        self.category_prefix_rows = {
+            prefix: np.array(rows, dtype=np.int64) for prefix, rows in prefixes.items()
+        }
+        ratings = products_df[rating_column].to_numpy(dtype=np.float64)
+        rated = np.flatnonzero(~np.isnan(ratings))
+        order = np.argsort(ratings[rated], kind="stable")
+        self.rating_rows = rated[order]
+        self.sorted_ratings = ratings[rated][order]
+
+    @staticmethod
+    def _inverted_index(column: pd.Series) -> Dict[str, np.ndarray]:
+        codes, values = pd.factorize(column, sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+        return {
+            str(value): order[bounds[code] : bounds[code + 1]]
+            for code, value in enumerate(values)
+        }
+
+    def _bitmap(self, rows: np.ndarray) -> np.ndarray:
+        bitmap = np.zeros(self.n_rows, dtype=bool)
+        bitmap[rows] = True
+        return bitmap
+
+    def mask(
+        self,
+        product_class: Optional[str] = None,
+        category_prefix: Optional[str] = None,
+        min_average_rating: Optional[float] = None,
+    ) -> Optional[np.ndarray]:
+        """Builds the bitmap of the rows matching every given filter.
+
+        Args:
+            product_class (Optional[str], optional): exact product class. Defaults to None.
+            category_prefix (Optional[str], optional): category hierarchy prefix, matched on
+            whole segments and case insensitive. Defaults to None.
+            min_average_rating (Optional[float], optional): minimum average rating, unrated
+            products are excluded. Defaults to None.
+
+        Returns:
+            Optional[np.ndarray]: boolean mask over the rows, None if no filter is given
+        """
+        bitmaps = []
+        empty = np.empty(0, dtype=np.int64)
+        if product_class is not None:
+            bitmaps.append(
+                self._bitmap(self.product_class_rows.get(product_class, empty))
+            )
+        if category_prefix is not None:
+            prefix = normalize_category_path(category_prefix)
+            bitmaps.append(self._bitmap(self.category_prefix_rows.get(prefix, empty)))
+        if min_average_rating is not None:
+            start = np.searchsorted(
+                self.sorted_ratings, min_average_rating, side="left"
+            )
+            bitmaps.append(self._bitmap(self.rating_rows[start:]))
+        if not bitmaps:
+            return None
+        return np.logical_and.reduce(bitmaps)
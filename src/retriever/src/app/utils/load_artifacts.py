@@ -1,23 +1,201 @@
+import json
 import os
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
 import joblib
+import numpy as np
 from scipy.sparse._csr import csr_matrix
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils.extmath import row_norms
+
+from ..core.query_vectorizer import QueryVectorizer
+from ..exceptions import WrongArtifactVersion
+from .popularity import PopularityRanking
 
 ARTIFACTS_SAVE_PATH = os.getenv("ARTIFACTS_SAVE_PATH")
+# latest lexical artifact format version this loader understands
+ARTIFACT_FORMAT_VERSION = 1
+# latest popularity artifact format version this loader understands
+POPULARITY_FORMAT_VERSION = 1
+
+
+def load_csr_arrays(path_prefix: str, mmap: bool = False) -> csr_matrix:
+    """Load a sparse matrix saved as raw CSR .npy arrays.
+
+    Args:
+        path_prefix (str): path and file name prefix of the saved arrays
+        mmap (bool, optional): If True, the arrays are memory-mapped read-only, so every
+        process shares the same page cache copy. Defaults to False.
+
+    Returns:
+        csr_matrix: the loaded matrix
+    """
+    mmap_mode = "r" if mmap else None
+    data = np.load(f"{path_prefix}_data.npy", mmap_mode=mmap_mode)
+    indices = np.load(f"{path_prefix}_indices.npy", mmap_mode=mmap_mode)
+    indptr = np.load(f"{path_prefix}_indptr.npy", mmap_mode=mmap_mode)
+    shape = tuple(np.load(f"{path_prefix}_shape.npy"))
+    return csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+def prenormalize_rows(matrix: csr_matrix) -> csr_matrix:
+    """Casts a matrix to float32 CSR with L2-normalized rows, once at load time.
+
+    Matrices that already are float32 with unit rows are returned untouched, so memory-mapped
+    artifacts stay shared between processes. Older float64 artifacts are converted.
+
+    Args:
+        matrix (csr_matrix): document matrix
+
+    Returns:
+        csr_matrix: float32 matrix with L2-normalized rows
+    """
+    matrix = csr_matrix(matrix, copy=False)
+    if matrix.dtype == np.float32:
+        norms = row_norms(matrix)
+        if np.allclose(norms[norms > 0], 1, atol=1e-4):
+            return matrix
+    return normalize(matrix.astype(np.float32), norm="l2", copy=False)
+
+
+def load_manifest(method: str) -> Optional[dict]:
+    """Load the manifest of the versioned lexical artifacts of a method.
+
+    Args:
+        method (str): lexical method, tfidf or bm25
+
+    Raises:
+        WrongArtifactVersion: if the artifacts were written by a newer format version
+
+    Returns:
+        Optional[dict]: the manifest, or None for legacy joblib artifacts
+    """
+    manifest_path = f"{ARTIFACTS_SAVE_PATH}{method}_manifest.json"
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest["format_version"] > ARTIFACT_FORMAT_VERSION:
+        raise WrongArtifactVersion(
+            f"Artifact format version {manifest['format_version']} is not supported. Must be <= {ARTIFACT_FORMAT_VERSION}"
+        )
+    return manifest
 
 
-def load_tfidf_artifacts() -> Tuple[TfidfVectorizer, csr_matrix]:
+def load_lexical_artifacts(
+    manifest: dict, mmap: bool = False
+) -> Tuple[QueryVectorizer, csr_matrix]:
+    """Load lexical artifacts saved in the versioned format.
+
+    Args:
+        manifest (dict): manifest of the artifacts
+        mmap (bool, optional): If True, the matrix and vocabulary are memory-mapped.
+        Defaults to False.
+
+    Returns:
+        Tuple[QueryVectorizer, csr_matrix]: query vectorizer and document matrix
+    """
+    mmap_mode = "r" if mmap else None
+    idf = (
+        np.load(ARTIFACTS_SAVE_PATH + manifest["idf"], mmap_mode=mmap_mode)
+        if manifest["idf"]
+        else None
+    )
+    vectorizer = QueryVectorizer(
+        vocabulary=np.load(
+            ARTIFACTS_SAVE_PATH + manifest["vocabulary"], mmap_mode=mmap_mode
+        ),
+        idf=idf,
+        **manifest["vectorizer"],
+    )
+    matrix = load_csr_arrays(ARTIFACTS_SAVE_PATH + manifest["matrix"], mmap=mmap)
+    return vectorizer, matrix
+
+
+def load_tfidf_artifacts(
+    mmap: bool = False,
+) -> Tuple[Union[QueryVectorizer, TfidfVectorizer], csr_matrix]:
     """Load TFIDF artifacts
 
+    Artifacts in the versioned format are loaded without sklearn deserialization. Legacy
+    joblib artifacts are still supported.
+
+    Args:
+        mmap (bool, optional): If True, the tfidf matrix is memory-mapped from its raw CSR
+        arrays instead of read into the process heap. Legacy artifacts fall back to the joblib
+        matrix when the raw arrays were not generated. Defaults to False.
+
     Returns:
-        Tuple[TfidfVectorizer, csr_matrix]: tfidf vectorizer and tfidf matrix
+        Tuple[Union[QueryVectorizer, TfidfVectorizer], csr_matrix]: query vectorizer and
+        float32 tfidf matrix with L2-normalized rows
     """
-    tfidf_matrix = joblib.load(ARTIFACTS_SAVE_PATH + "tfidf_matrix.joblib")
+    manifest = load_manifest("tfidf")
+    if manifest is not None:
+        vectorizer, tfidf_matrix = load_lexical_artifacts(manifest, mmap=mmap)
+        return vectorizer, prenormalize_rows(tfidf_matrix)
+    matrix_prefix = ARTIFACTS_SAVE_PATH + "tfidf_matrix"
+    if mmap and os.path.exists(f"{matrix_prefix}_indptr.npy"):
+        tfidf_matrix = load_csr_arrays(matrix_prefix, mmap=True)
+    else:
+        tfidf_matrix = joblib.load(ARTIFACTS_SAVE_PATH + "tfidf_matrix.joblib")
     vectorizer = joblib.load(ARTIFACTS_SAVE_PATH + "tfidf_vectorizer.joblib")
-    return vectorizer, tfidf_matrix
+    return vectorizer, prenormalize_rows(tfidf_matrix)
+
+
+def load_bm25_artifacts(
+    mmap: bool = False,
+) -> Tuple[Union[QueryVectorizer, CountVectorizer], csr_matrix]:
+    """Load BM25 artifacts
+
+    Args:
+        mmap (bool, optional): If True, the impact matrix is memory-mapped from its raw CSR
+        arrays instead of read into the process heap. Defaults to False.
+
+    Returns:
+        Tuple[Union[QueryVectorizer, CountVectorizer], csr_matrix]: term count vectorizer and
+        float32 BM25 impact matrix
+    """
+    manifest = load_manifest("bm25")
+    if manifest is not None:
+        return load_lexical_artifacts(manifest, mmap=mmap)
+    bm25_matrix = load_csr_arrays(ARTIFACTS_SAVE_PATH + "bm25_matrix", mmap=mmap)
+    vectorizer = joblib.load(ARTIFACTS_SAVE_PATH + "bm25_vectorizer.joblib")
+    return vectorizer, bm25_matrix
+
+
+def load_popularity_artifacts(mmap: bool = False) -> Optional[PopularityRanking]:
+    """Load the popularity rankings precomputed by the batch pipeline.
+
+    Args:
+        mmap (bool, optional): If True, the rankings are memory-mapped. Defaults to False.
+
+    Raises:
+        WrongArtifactVersion: if the artifacts were written by a newer format version
+
+    Returns:
+        Optional[PopularityRanking]: the rankings, or None if they were not generated
+    """
+    manifest_path = f"{ARTIFACTS_SAVE_PATH}popularity_manifest.json"
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest["format_version"] > POPULARITY_FORMAT_VERSION:
+        raise WrongArtifactVersion(
+            f"Popularity format version {manifest['format_version']} is not supported. Must be <= {POPULARITY_FORMAT_VERSION}"
+        )
+    mmap_mode = "r" if mmap else None
 
+    def load(name: Optional[str]) -> Optional[np.ndarray]:
+        return (
+            np.load(ARTIFACTS_SAVE_PATH + name, mmap_mode=mmap_mode) if name else None
+        )
 
-def load_bm25_artifacts():
-    pass
+    return PopularityRanking(
+        scores=load(manifest["scores"]),
+        ranking=load(manifest["ranking"]),
+        classes=manifest["classes"],
+        class_rows=load(manifest.get("class_rows")),
+        class_offsets=load(manifest.get("class_offsets")),
+    )
@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class PopularityRanking:
+    """Precomputed popularity rankings, served by the fallbacks.
+
+    Rankings are computed by the batch pipeline (see save_popularity_artifacts) and held in
+    memory, so a fallback response is a slice of a precomputed array.
+    """
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        ranking: np.ndarray,
+        classes: Optional[List[str]] = None,
+        class_rows: Optional[np.ndarray] = None,
+        class_offsets: Optional[np.ndarray] = None,
+    ):
+        """Initializes the rankings.
+
+        Args:
+            scores (np.ndarray): popularity score of every product
+            ranking (np.ndarray): every product, by decreasing popularity
+            classes (Optional[List[str]], optional): sorted product class names. Defaults to None.
+            class_rows (Optional[np.ndarray], optional): products grouped by class, each group
+            by decreasing popularity. Defaults to None.
+            class_offsets (Optional[np.ndarray], optional): boundaries of the class groups in
+            class_rows. Defaults to None.
+        """
+        self.scores = scores
+        self.ranking = ranking
+        self.class_rankings: Dict[str, np.ndarray] = {}
+        if classes is not None:
+            self.class_rankings = {
+                name: class_rows[class_offsets[i] : class_offsets[i + 1]]
+                for i, name in enumerate(classes)
+            }
+
+    def top(
+        self,
+        top_n: int,
+        product_class: Optional[str] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[List[int], List[float]]:
+        """Most popular products.
+
+        Args:
+            top_n (int): number of products to return
+            product_class (Optional[str], optional): only rank the products of this class, using
+            the class ranking when it was precomputed. Defaults to None.
+            allowed (Optional[np.ndarray], optional): boolean mask of the products that can be
+            returned, e.g. from the request filters. Defaults to None.
+
+        Returns:
+            Tuple[List[int], List[float]]: product ids and popularity scores, most popular first
+        """
+        if product_class is not None and self.class_rankings:
+            ranking = self.class_rankings.get(product_class, self.ranking[:0])
+        else:
+            ranking = self.ranking
+        if allowed is None:
+            ids = ranking[:top_n]
+        else:
+            ids = ranking[allowed[ranking]][:top_n]
+        return ids.tolist(), self.scores[ids].tolist()
@@ -0,0 +1,187 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# id -> row offset arrays are used while they are at most this many times the catalog size
+MAX_OFFSET_TABLE_RATIO = 4
+
+
+class ProductStore(ABC):
+    """Read-only product catalog keyed by product_id."""
+
+    columns: List[str]
+
+    @abstractmethod
+    def get_columns(
+        self, product_ids: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Fetches the rows of the given products, in the given order.
+
+        Args:
+            product_ids (np.ndarray): ids of the products to fetch
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: mask of the ids found in the store, and one
+            array per column with the rows of the found ids
+        """
+        pass
+
+    def get(self, product_ids: Iterable[int]) -> pd.DataFrame:
+        """Fetches the rows of the given products as a DataFrame, in the given order. Unknown ids
+        are skipped.
+
+        Args:
+            product_ids (Iterable[int]): ids of the products to fetch
+
+        Returns:
+            pd.DataFrame: one row per product found
+        """
+        _, columns = self.get_columns(np.asarray(list(product_ids), dtype=np.int64))
+        return pd.DataFrame(columns, columns=self.columns)
+
+
+class InMemoryProductStore(ProductStore):
+    """Columnar in-memory product store.
+
+    Each column is a NumPy array and rows are located through an id -> row offset array (or a
+    binary search over the sorted ids for sparse id ranges), so fetching top_n products is a
+    positional gather of O(top_n) rows instead of a join over the catalog.
+    """
+
+    def __init__(self, products_df: pd.DataFrame, id_column: str = "product_id"):
+        """Builds the store.
+
+        Args:
+            products_df (pd.DataFrame): product catalog
+            id_column (str, optional): unique integer id column. Defaults to "product_id".
+        """
+        self.columns = list(products_df.columns)
+        self._arrays = {
+            column: products_df[column].to_numpy() for column in self.columns
+        }
+        ids = products_df[id_column].to_numpy(dtype=np.int64)
+        self._row_of_id: Optional[np.ndarray] = None
+        if (
+            ids.size
+            and ids.min() >= 0
+            and ids.max() < MAX_OFFSET_TABLE_RATIO * ids.size
+        ):
+            self._row_of_id = np.full(ids.max() + 1, -1, dtype=np.int64)
+            self._row_of_id[ids] = np.arange(ids.size)
+        else:
+            self._sorter = np.argsort(ids, kind="stable")
+            self._sorted_ids = ids[self._sorter]
+
+    def __len__(self) -> int:
+        return len(next(iter(self._arrays.values()), ()))
+
+    def _rows(self, product_ids: np.ndarray) -> np.ndarray:
+        """Row offset of each id, -1 for unknown ids."""
+        if self._row_of_id is not None:
+            in_range = (product_ids >= 0) & (product_ids < self._row_of_id.size)
+            rows = np.full(product_ids.shape, -1, dtype=np.int64)
+            rows[in_range] = self._row_of_id[product_ids[in_range]]
+            return rows
+        if self._sorted_ids.size == 0:
+            return np.full(product_ids.shape, -1, dtype=np.int64)
+        positions = np.searchsorted(self._sorted_ids, product_ids)
+        positions[positions == self._sorted_ids.size] = 0
+        found = self._sorted_ids[positions] == product_ids
+        return np.where(found, self._sorter[positions], -1)
+
+    def get_columns(
+        self, product_ids: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        rows = self._rows(np.asarray(product_ids, dtype=np.int64))
+        found = rows >= 0
+        rows = rows[found]
+        return found, {column: array[rows] for column, array in self._arrays.items()}
+
+
+class SQLiteProductStore(ProductStore):
+    """Product store backed by a local SQLite file, for catalogs that do not fit in memory.
+
+    Rows are looked up through the product_id primary key, so fetching top_n products reads
+    O(top_n) rows.
+    """
+
+    TABLE = "products"
+
+    def __init__(self, db_path: str, id_column: str = "product_id"):
+        """Opens an existing store. See SQLiteProductStore.build to create it.
+
+        Args:
+            db_path (str): path of the SQLite file
+            id_column (str, optional): unique integer id column. Defaults to "product_id".
+        """
+        self.id_column = id_column
+        self._connection = sqlite3.connect(
+            f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.columns = [
+            row[1]
+            for row in self._connection.execute(f'PRAGMA table_info("{self.TABLE}")')
+        ]
+
+    @classmethod
+    def build(
+        cls,
+        csv_path: str,
+        db_path: str,
+        id_column: str = "product_id",
+        chunksize: int = 100_000,
+        sep: str = "\t",
+    ) -> "SQLiteProductStore":
+        """Loads a product csv into a SQLite store chunk by chunk, unless the file exists.
+
+        Args:
+            csv_path (str): path of the product csv
+            db_path (str): path of the SQLite file
+            id_column (str, optional): unique integer id column. Defaults to "product_id".
+            chunksize (int, optional): rows read and inserted at a time. Defaults to 100_000.
+            sep (str, optional): csv separator. Defaults to "\\t".
+
+        Returns:
+            SQLiteProductStore: the opened store
+        """
+        if not os.path.exists(db_path):
+            tmp_path = f"{db_path}.{os.getpid()}.tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with sqlite3.connect(tmp_path) as connection:
+                for chunk in pd.read_csv(csv_path, sep=sep, chunksize=chunksize):
+                    chunk.to_sql(cls.TABLE, connection, if_exists="append", index=False)
+                connection.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "{cls.TABLE}_{id_column}" '
+                    f'ON "{cls.TABLE}" ("{id_column}")'
+                )
+            # atomic, so concurrent workers never open a partial store
+            os.replace(tmp_path, db_path)
+        return cls(db_path, id_column)
+
+    def get_columns(
+        self, product_ids: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        placeholders = ",".join("?" * product_ids.size)
+        quoted_columns = ",".join(f'"{column}"' for column in self.columns)
+        rows = self._connection.execute(
+            f'SELECT {quoted_columns} FROM "{self.TABLE}" '
+            f'WHERE "{self.id_column}" IN ({placeholders})',
+            product_ids.tolist(),
+        ).fetchall()
+        id_position = self.columns.index(self.id_column)
+        rows_by_id = {row[id_position]: row for row in rows}
+        found = np.array([int(i) in rows_by_id for i in product_ids], dtype=bool)
+        ordered = [rows_by_id[int(i)] for i in product_ids[found]]
+        return found, {
+            column: np.array(
+                [row[position] for row in ordered],
+                dtype=object,
+            )
+            for position, column in enumerate(self.columns)
+        }
@@ -1,3 +1,3 @@
-from .exceptions import EmptyDataFrameError, MissingColumnsError
+from .exceptions import EmptyDataFrameError, MissingColumnsError, WrongIndexType
 
-__all__ = ["MissingColumnsError", "EmptyDataFrameError"]
+__all__ = ["MissingColumnsError", "EmptyDataFrameError", "WrongIndexType"]
@@ -8,3 +8,9 @@ class EmptyDataFrameError(Exception):
     """Exception to be raised when the input DataFrame is empty"""
 
     pass
+
+
+class WrongIndexType(Exception):
+    """Exception to be raised when the selected FAISS index type is not available"""
+
+    pass
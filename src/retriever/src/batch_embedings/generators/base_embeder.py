@@ -1,11 +1,19 @@
+import json
+import math
 from abc import abstractmethod
-from typing import List
+from typing import List, Optional
 
 import faiss
 import numpy as np
 import pandas as pd
 from scipy.sparse._csr import spmatrix
 
+from ..exceptions import WrongIndexType
+
+INDEX_FILE_NAME = "products_index.faiss"
+INDEX_METADATA_FILE_NAME = "products_index.json"
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "opq_ivf_pq")
+
 
 class BaseLexicalEmbeder:
     """Base class for lexical embedders"""
@@ -36,18 +44,102 @@ class BaseDenseEmbeder:
     ) -> List[List[float]]:
         pass
 
-    def index_and_save(self, embeddings: List[List[float]], save_dir: str) -> None:
+    def index_and_save(
+        self,
+        embeddings: List[List[float]],
+        save_dir: str,
+        index_params: Optional[dict] = None,
+    ) -> None:
         """Normalizes the given embeddings, creates a FAISS index using inner product similarity,
-        adds the embeddings to the index, and saves the index to the specified directory.
+        trains it if needed, adds the embeddings to the index, and saves the index and its metadata
+        to the specified directory.
 
         Args:
             embeddings (List[List[float]]): A 2D list or array of embedding vectors to be indexed.
-            save_dir (str): The directory path where the FAISS index file ('products_index.faiss') will be saved.
+            save_dir (str): The directory path where the FAISS index file ('products_index.faiss') and
+            its metadata ('products_index.json') will be saved.
+            index_params (Optional[dict], optional): Index configuration. The "type" key selects one of
+            flat, ivf_flat, ivf_pq, hnsw or opq_ivf_pq, the rest are the structure, training and search
+            parameters of that type. Defaults to None, which builds an exact flat index.
 
         Returns:
             None
         """
+        index_params = {"type": "flat", **(index_params or {})}
         norm_embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-        index = faiss.IndexFlatIP(self.embedding_dim)
-        index.add(np.array(norm_embeddings).astype("float32"))
-        faiss.write_index(index, save_dir + "products_index.faiss")
+        norm_embeddings = np.ascontiguousarray(norm_embeddings, dtype="float32")
+        factory_string = self.index_factory_string(
+            index_params, norm_embeddings.shape[0]
+        )
+        index = faiss.index_factory(
+            self.embedding_dim, factory_string, faiss.METRIC_INNER_PRODUCT
+        )
+        if index_params["type"] == "hnsw":
+            faiss.downcast_index(index).hnsw.efConstruction = index_params.get(
+                "ef_construction", 200
+            )
+        if not index.is_trained:
+            index.train(self._training_sample(norm_embeddings, index_params))
+        index.add(norm_embeddings)
+        faiss.write_index(index, save_dir + INDEX_FILE_NAME)
+
+        metadata = {
+            "type": index_params["type"],
+            "factory_string": factory_string,
+            "metric": "inner_product",
+            "dim": self.embedding_dim,
+            "ntotal": int(index.ntotal),
+            "search_params": {
+                key: index_params[key]
+                for key in ("nprobe", "ef_search")
+                if index_params.get(key) is not None
+            },
+            "faiss_version": faiss.__version__,
+        }
+        with open(save_dir + INDEX_METADATA_FILE_NAME, "w") as f:
+            json.dump(metadata, f, indent=2)
+
+    @staticmethod
+    def index_factory_string(index_params: dict, n_vectors: int) -> str:
+        """Builds the FAISS index_factory description for the configured index type.
+
+        Args:
+            index_params (dict): Index configuration, see index_and_save.
+            n_vectors (int): Number of vectors to be indexed, used to pick a default number of
+            IVF lists when "nlist" is not set.
+
+        Raises:
+            WrongIndexType: if the configured type is not supported.
+
+        Returns:
+            str: The index_factory string.
+        """
+        index_type = index_params["type"]
+        nlist = index_params.get("nlist") or max(
+            1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39)
+        )
+        pq = f"PQ{index_params.get('pq_m', 64)}x{index_params.get('pq_nbits', 8)}"
+        if index_type == "flat":
+            return "Flat"
+        if index_type == "ivf_flat":
+            return f"IVF{nlist},Flat"
+        if index_type == "ivf_pq":
+            return f"IVF{nlist},{pq}"
+        if index_type == "hnsw":
+            return f"HNSW{index_params.get('hnsw_m', 32)},Flat"
+        if index_type == "opq_ivf_pq":
+            return f"OPQ{index_params.get('pq_m', 64)},IVF{nlist},{pq}"
+        raise WrongIndexType(
+            f"Index type {index_type} is not supported. Must be one of {INDEX_TYPES}"
+        )
+
+    @staticmethod
+    def _training_sample(embeddings: np.ndarray, index_params: dict) -> np.ndarray:
+        """Returns the vectors used to train the index, subsampled when "train_sample_size"
+        is set and smaller than the number of embeddings.
+        """
+        sample_size = index_params.get("train_sample_size")
+        if not sample_size or sample_size >= embeddings.shape[0]:
+            return embeddings
+        rng = np.random.default_rng(0)
+        return embeddings[rng.choice(embeddings.shape[0], sample_size, replace=False)]
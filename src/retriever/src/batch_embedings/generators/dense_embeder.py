@@ -1,21 +1,16 @@
-import asyncio
-import os
 from typing import List
 
-import cohere
 import pandas as pd
 from exceptions import MissingColumnsError
 
-from ...utils import load_config, logger
+from ...utils import get_cohere_client, load_config, logger, request_options
 from .base_embeder import BaseDenseEmbeder
 
 config = load_config()
 cohere_model = config["retrievers"]["dense"]["model"]
 max_tokens = config["retrievers"]["dense"]["max_tokens"]
 output_dim = config["retrievers"]["dense"]["output_dim"]
-
-COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-co = cohere.ClientV2(COHERE_API_KEY)
+BATCH_EMBED_TIMEOUT_S = config["provider"]["batch_embed_timeout_s"]
 
 
 class CohereEmbeder(BaseDenseEmbeder):
@@ -32,14 +27,14 @@ class CohereEmbeder(BaseDenseEmbeder):
         Args:
             texts (List[str]): texts to be embedded
         """
-        return await asyncio.to_thread(
-            co.embed,
+        return await get_cohere_client().embed(
             texts=texts,
             input_type="search_document",
             model=cohere_model,
             max_tokens=max_tokens,
             output_dimension=self.embedding_dim,
             embedding_types=["float"],
+            request_options=request_options(BATCH_EMBED_TIMEOUT_S),
         )
 
     async def embed(
@@ -1,22 +1,26 @@
 from typing import List
 
-import joblib
+import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix
 from scipy.sparse._csr import spmatrix
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 
 from ..exceptions import EmptyDataFrameError, MissingColumnsError
+from ..utils import save_lexical_artifacts
 from .base_embeder import BaseLexicalEmbeder
 
 
 class TDIDFLexicalEmbeder(BaseLexicalEmbeder):
     def __init__(self, save_dir: str):
         """Initializes the LexicalEmbeder with a TF-IDF vectorizer and sets the directory for saving embeddings.
+        The vectorizer produces float32 L2-normalized rows, so the retriever can score queries with a plain
+        dot product and the matrix takes half the memory of the float64 default.
 
         Args:
             save_dir (str): Path to the directory where embeddings or related files will be saved.
         """
-        self.vectorizer = TfidfVectorizer()
+        self.vectorizer = TfidfVectorizer(dtype=np.float32, norm="l2")
         self.save_dir = save_dir
 
     def fit_transform(
@@ -43,17 +47,101 @@ class TDIDFLexicalEmbeder(BaseLexicalEmbeder):
         return tfidf_matrix
 
     def save(self, vectors: spmatrix) -> None:
-        """Save the vectorizer and tfidf matrix to storage.
+        """Save the tfidf matrix, vocabulary and idf weights to storage in the versioned artifact
+        format, so the retriever loads them without unpickling sklearn objects.
 
         Args:
             vectors (spmatrix): tfidf matrix
         """
         # saves locally for this PoC, would save in a repository as an S3 for production level
-        joblib.dump(self.vectorizer, f"{self.save_dir}/tfidf_vectorizer.joblib")
-        joblib.dump(vectors, f"{self.save_dir}/tfidf_matrix.joblib")
+        save_lexical_artifacts(
+            self.vectorizer, vectors, self.save_dir, "tfidf", idf=self.vectorizer.idf_
+        )
 
 
-class BM25LexicalEmbeder:
-    """To be implemented"""
+class BM25LexicalEmbeder(BaseLexicalEmbeder):
+    def __init__(self, save_dir: str, k1: float = 1.2, b: float = 0.75):
+        """Initializes the BM25 embeder with a term count vectorizer and sets the directory for saving
+        the artifacts. The vectorizer uses the same tokenization as the TF-IDF one.
 
-    pass
+        Args:
+            save_dir (str): Path to the directory where the artifacts will be saved.
+            k1 (float, optional): Term frequency saturation. Defaults to 1.2.
+            b (float, optional): Document length normalization, between 0 and 1. Defaults to 0.75.
+        """
+        self.vectorizer = CountVectorizer(dtype=np.float32)
+        self.save_dir = save_dir
+        self.k1 = k1
+        self.b = b
+
+    def fit_transform(
+        self, products_df: pd.DataFrame, cols_to_embed: List[str]
+    ) -> spmatrix:
+        """Fits the term count vectorizer on the specified columns of the input DataFrame and turns the
+        counts into a sparse matrix of BM25 impacts, one row per product:
+
+            idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+
+        so scoring a query only sums the impacts of its terms.
+
+        Args:
+            products_df (pd.DataFrame): DataFrame containing product data with columns to be embedded.
+            cols_to_embed (List[str]): List of column names in the DataFrame whose text content will be combined
+            and embedded.
+
+        Returns:
+            spmatrix: float32 CSR matrix of BM25 impacts.
+        """
+        if products_df.empty:
+            raise EmptyDataFrameError("The input DataFrame is empty.")
+        missing = [col for col in cols_to_embed if col not in products_df.columns]
+        if missing:
+            raise MissingColumnsError(f"Missing columns in DataFrame: {missing}")
+        combined_text = products_df[cols_to_embed].fillna("").agg(" ".join, axis=1)
+        counts = csr_matrix(
+            self.vectorizer.fit_transform(combined_text.values.astype("U"))
+        )
+        counts.sort_indices()
+        return self.impacts(counts, self.k1, self.b)
+
+    @staticmethod
+    def impacts(counts: spmatrix, k1: float, b: float) -> csr_matrix:
+        """Computes the BM25 impact of every (document, term) pair of a term count matrix.
+
+        Args:
+            counts (spmatrix): (documents x terms) term counts.
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+
+        Returns:
+            csr_matrix: float32 matrix of BM25 impacts with the sparsity pattern of counts.
+        """
+        counts = csr_matrix(counts, dtype=np.float64)
+        n_docs = counts.shape[0]
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        doc_lengths = np.asarray(counts.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() or 1.0
+        length_norm = k1 * (1 - b + b * doc_lengths / avg_length)
+        tf = counts.data
+        row_norm = np.repeat(length_norm, np.diff(counts.indptr))
+        impacts = idf[counts.indices] * tf * (k1 + 1) / (tf + row_norm)
+        return csr_matrix(
+            (impacts.astype(np.float32), counts.indices, counts.indptr),
+            shape=counts.shape,
+        )
+
+    def save(self, vectors: spmatrix) -> None:
+        """Save the BM25 impact matrix and vocabulary to storage in the versioned artifact format.
+        Queries are term counts, so no idf weights are saved.
+
+        Args:
+            vectors (spmatrix): BM25 impact matrix
+        """
+        save_lexical_artifacts(
+            self.vectorizer,
+            vectors,
+            self.save_dir,
+            "bm25",
+            params={"k1": self.k1, "b": self.b},
+        )
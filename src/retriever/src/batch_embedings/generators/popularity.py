@@ -0,0 +1,124 @@
+import json
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+POPULARITY_FORMAT_VERSION = 1
+
+
+def popularity_scores(
+    average_rating: np.ndarray,
+    rating_count: np.ndarray,
+    review_count: np.ndarray,
+    prior_count: Optional[float] = None,
+    prior_rating: Optional[float] = None,
+) -> np.ndarray:
+    """Scores products by popularity.
+
+    The average rating is shrunk towards prior_rating with the weight of prior_count ratings
+    (Bayesian average), so a 5 star product rated once does not outrank a 4.8 star product
+    rated a thousand times, and is scaled by the log of the rating and review volume.
+    Missing values count as no ratings and no reviews.
+
+    Args:
+        average_rating (np.ndarray): average rating of each product
+        rating_count (np.ndarray): number of ratings of each product
+        review_count (np.ndarray): number of reviews of each product
+        prior_count (Optional[float], optional): weight of the prior, in ratings. If None, the
+        median number of ratings of the rated products. Defaults to None.
+        prior_rating (Optional[float], optional): rating of the prior. If None, the mean rating
+        over every rating. Defaults to None.
+
+    Returns:
+        np.ndarray: float32 popularity score of each product, higher is more popular
+    """
+    average_rating = np.asarray(average_rating, dtype=np.float64)
+    rating_count = np.nan_to_num(np.asarray(rating_count, dtype=np.float64))
+    review_count = np.nan_to_num(np.asarray(review_count, dtype=np.float64))
+    rated = (rating_count > 0) & ~np.isnan(average_rating)
+    rating_count = np.where(rated, rating_count, 0)
+    average_rating = np.where(rated, average_rating, 0)
+    if prior_count is None:
+        prior_count = float(np.median(rating_count[rated])) if rated.any() else 1.0
+    if prior_rating is None:
+        prior_rating = (
+            float(np.average(average_rating[rated], weights=rating_count[rated]))
+            if rated.any()
+            else 0.0
+        )
+    bayesian_rating = (prior_count * prior_rating + rating_count * average_rating) / (
+        prior_count + rating_count
+    )
+    return (bayesian_rating * np.log1p(rating_count + review_count)).astype(np.float32)
+
+
+def save_popularity_artifacts(
+    products_df: pd.DataFrame,
+    save_dir: str,
+    per_class: bool = True,
+    prior_count: Optional[float] = None,
+    prior_rating: Optional[float] = None,
+    class_column: str = "product_class",
+) -> dict:
+    """Precomputes the popularity rankings served by the fallbacks.
+
+    Writes popularity_manifest.json, the score of every product (popularity_scores.npy) and
+    the products sorted by decreasing popularity (popularity_ranking.npy). With per_class,
+    also writes the products grouped by product class, each group sorted by decreasing
+    popularity (popularity_class_rows.npy), with the group boundaries in
+    popularity_class_offsets.npy and the class names in the manifest. Products are identified
+    by their row, like in the other artifacts.
+
+    Args:
+        products_df (pd.DataFrame): product catalog, in index order
+        save_dir (str): directory where the artifacts are saved
+        per_class (bool, optional): also rank the products within each class. Defaults to True.
+        prior_count (Optional[float], optional): see popularity_scores. Defaults to None.
+        prior_rating (Optional[float], optional): see popularity_scores. Defaults to None.
+        class_column (str, optional): product class column. Defaults to "product_class".
+
+    Returns:
+        dict: the manifest
+    """
+    scores = popularity_scores(
+        products_df["average_rating"].to_numpy(),
+        products_df["rating_count"].to_numpy(),
+        products_df["review_count"].to_numpy(),
+        prior_count=prior_count,
+        prior_rating=prior_rating,
+    )
+    ranking = np.argsort(-scores, kind="stable").astype(np.int64)
+    np.save(os.path.join(save_dir, "popularity_scores.npy"), scores)
+    np.save(os.path.join(save_dir, "popularity_ranking.npy"), ranking)
+    manifest = {
+        "format_version": POPULARITY_FORMAT_VERSION,
+        "n_products": int(scores.shape[0]),
+        "scores": "popularity_scores.npy",
+        "ranking": "popularity_ranking.npy",
+        "classes": None,
+    }
+    if per_class:
+        codes, classes = pd.factorize(products_df[class_column], sort=True)
+        # products without class (code -1) are left out of the class rankings
+        ranked_codes = codes[ranking]
+        in_class = ranked_codes >= 0
+        class_rows = ranking[in_class][
+            np.argsort(ranked_codes[in_class], kind="stable")
+        ]
+        class_offsets = np.searchsorted(
+            np.sort(ranked_codes[in_class]), np.arange(len(classes) + 1)
+        ).astype(np.int64)
+        np.save(os.path.join(save_dir, "popularity_class_rows.npy"), class_rows)
+        np.save(os.path.join(save_dir, "popularity_class_offsets.npy"), class_offsets)
+        manifest.update(
+            {
+                "classes": [str(name) for name in classes],
+                "class_rows": "popularity_class_rows.npy",
+                "class_offsets": "popularity_class_offsets.npy",
+            }
+        )
+    with open(os.path.join(save_dir, "popularity_manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,51 @@
+import json
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+TEXT_STORE_FORMAT_VERSION = 1
+
+
+def save_product_text_store(
+    products_df: pd.DataFrame, save_dir: str, columns: List[str]
+) -> dict:
+    """Writes the product text store read by the reranker.
+
+    Each column is saved as the utf-8 encoded values of every product concatenated in a
+    uint8 array (product_text_<column>.npy) and the int64 boundaries of each value in that
+    array (product_text_<column>_offsets.npy), so the reranker can memory-map the store and
+    slice the text of a product without parsing anything. Missing values are saved as empty
+    texts. Products are identified by their row, like in the other artifacts.
+
+    Args:
+        products_df (pd.DataFrame): product catalog, in index order
+        save_dir (str): directory where the artifacts are saved
+        columns (List[str]): text columns to save
+
+    Returns:
+        dict: the manifest, saved as product_text_manifest.json
+    """
+    manifest = {
+        "format_version": TEXT_STORE_FORMAT_VERSION,
+        "n_products": int(products_df.shape[0]),
+        "columns": {},
+    }
+    for column in columns:
+        encoded = [
+            b"" if pd.isna(value) else str(value).encode("utf-8")
+            for value in products_df[column]
+        ]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        np.save(os.path.join(save_dir, f"product_text_{column}.npy"), blob)
+        np.save(os.path.join(save_dir, f"product_text_{column}_offsets.npy"), offsets)
+        manifest["columns"][column] = {
+            "blob": f"product_text_{column}.npy",
+            "offsets": f"product_text_{column}_offsets.npy",
+        }
+    with open(os.path.join(save_dir, "product_text_manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
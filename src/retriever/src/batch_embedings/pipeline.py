@@ -5,7 +5,9 @@ from tqdm import tqdm
 
 from ..utils import load_config, logger
 from .generators.dense_embeder import CohereEmbeder
-from .generators.lexical_embeder import TDIDFLexicalEmbeder
+from .generators.lexical_embeder import BM25LexicalEmbeder, TDIDFLexicalEmbeder
+from .generators.popularity import save_popularity_artifacts
+from .generators.text_store import save_product_text_store
 from .utils import load_data_from_csv
 
 ARTIFACTS_SAVE_PATH = os.getenv("ARTIFACTS_SAVE_PATH", "")
@@ -15,6 +17,11 @@ items = load_data_from_csv(DATA_PATH)
 config = load_config()
 cohere_max_batch = config["retrievers"]["dense"]["max_processing_batch"]
 COLUMNS_TO_EMBED = config["retrievers"]["columns_to_embed"]
+LEXICAL_METHOD = config["retrievers"]["lexical"]["method"]
+BM25_PARAMS = config["retrievers"]["lexical"]["bm25"]
+INDEX_PARAMS = config["retrievers"]["dense"]["index"]
+POPULARITY_PARAMS = config["fallback"]["popularity"]
+TEXT_STORE_COLUMNS = config["artifacts"]["text_store_columns"]
 
 INTERMEDIATE_SAVE_PATH = "dense_embeddings_partial.joblib"
 
@@ -24,15 +31,26 @@ async def embedd_products() -> None:
     saving intermediate and final artifacts.
 
     This function performs the following steps:
-    1. Computes and saves lexical embeddings for specified columns using a TF-IDF-based embeder.
+    0. Ranks the products by popularity for the fallbacks, globally and per product class, and
+    writes the product text store read by the reranker.
+    1. Computes and saves lexical embeddings for specified columns using the TF-IDF or BM25 embeder,
+    depending on the configured lexical method.
     2. Computes dense embeddings in batches using the Cohere API to respect quota limits, saving intermediate results
     to disk after each batch.
     3. Indexes and saves the dense embeddings if all batches complete successfully, and removes the intermediate save
     file.
     4. Logs progress and success messages throughout the process.
     """
+    logger.info("Ranking products by popularity...")
+    save_popularity_artifacts(items, ARTIFACTS_SAVE_PATH, **POPULARITY_PARAMS)
+    logger.info("Writing the product text store...")
+    save_product_text_store(items, ARTIFACTS_SAVE_PATH, TEXT_STORE_COLUMNS)
+
     logger.info("Running lexical embedding...")
-    lexical_embedder = TDIDFLexicalEmbeder(ARTIFACTS_SAVE_PATH)
+    if LEXICAL_METHOD == "bm25":
+        lexical_embedder = BM25LexicalEmbeder(ARTIFACTS_SAVE_PATH, **BM25_PARAMS)
+    else:
+        lexical_embedder = TDIDFLexicalEmbeder(ARTIFACTS_SAVE_PATH)
     vectors = lexical_embedder.fit_transform(items, COLUMNS_TO_EMBED)
     lexical_embedder.save(vectors)
 
@@ -51,7 +69,7 @@ async def embedd_products() -> None:
         dense_embeddings.extend(embeddings)
         # save in case the api fails
         joblib.dump(dense_embeddings, INTERMEDIATE_SAVE_PATH)
-    embedder.index_and_save(dense_embeddings, ARTIFACTS_SAVE_PATH)
+    embedder.index_and_save(dense_embeddings, ARTIFACTS_SAVE_PATH, INDEX_PARAMS)
     # remove saving if indexing was successful
     os.remove(INTERMEDIATE_SAVE_PATH)
     logger.info("Success...")
@@ -1,3 +1,9 @@
 from .load_data import load_data_from_csv, load_data_from_s3
+from .save_artifacts import save_csr_arrays, save_lexical_artifacts
 
-__all__ = ["load_data_from_csv", "load_data_from_s3"]
+__all__ = [
+    "load_data_from_csv",
+    "load_data_from_s3",
+    "save_csr_arrays",
+    "save_lexical_artifacts",
+]
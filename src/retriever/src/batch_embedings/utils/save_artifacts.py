@@ -0,0 +1,110 @@
+import json
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse._csr import spmatrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def save_csr_arrays(matrix: spmatrix, path_prefix: str) -> None:
+    """Saves a sparse matrix as raw CSR .npy arrays so it can be memory-mapped at load time.
+
+    Writes {path_prefix}_data.npy, {path_prefix}_indices.npy, {path_prefix}_indptr.npy and
+    {path_prefix}_shape.npy.
+
+    Args:
+        matrix (spmatrix): sparse matrix to be saved
+        path_prefix (str): path and file name prefix of the saved arrays
+    """
+    matrix = csr_matrix(matrix)
+    matrix.sort_indices()
+    np.save(f"{path_prefix}_data.npy", matrix.data)
+    np.save(f"{path_prefix}_indices.npy", matrix.indices)
+    np.save(f"{path_prefix}_indptr.npy", matrix.indptr)
+    np.save(f"{path_prefix}_shape.npy", np.array(matrix.shape, dtype=np.int64))
+
+
+def vectorizer_manifest(vectorizer: CountVectorizer) -> dict:
+    """Describes the query-side analysis of a fitted sklearn vectorizer.
+
+    Only the settings the retriever QueryVectorizer reproduces are supported: word unigrams
+    from the token pattern, optional lowercasing, no accent stripping, stop words or custom
+    callables.
+
+    Args:
+        vectorizer (CountVectorizer): fitted CountVectorizer or TfidfVectorizer
+
+    Raises:
+        ValueError: if the vectorizer uses settings the QueryVectorizer cannot reproduce
+
+    Returns:
+        dict: the vectorizer section of the artifact manifest
+    """
+    unsupported = {
+        "analyzer": vectorizer.analyzer != "word",
+        "ngram_range": tuple(vectorizer.ngram_range) != (1, 1),
+        "strip_accents": vectorizer.strip_accents is not None,
+        "stop_words": vectorizer.stop_words is not None,
+        "preprocessor": vectorizer.preprocessor is not None,
+        "tokenizer": vectorizer.tokenizer is not None,
+    }
+    if any(unsupported.values()):
+        raise ValueError(
+            f"Vectorizer settings not supported by the artifact format: {[k for k, v in unsupported.items() if v]}"
+        )
+    return {
+        "lowercase": vectorizer.lowercase,
+        "token_pattern": vectorizer.token_pattern,
+        "norm": getattr(vectorizer, "norm", None),
+        "sublinear_tf": getattr(vectorizer, "sublinear_tf", False),
+        "binary": vectorizer.binary,
+    }
+
+
+def save_lexical_artifacts(
+    vectorizer: CountVectorizer,
+    matrix: spmatrix,
+    save_dir: str,
+    method: str,
+    idf: Optional[np.ndarray] = None,
+    params: Optional[dict] = None,
+) -> None:
+    """Saves lexical artifacts in the versioned, pickle-free format.
+
+    Writes {method}_manifest.json, the document matrix as raw CSR arrays ({method}_matrix_*.npy),
+    the vocabulary as a sorted string table ({method}_vocabulary.npy, its positions are the
+    matrix columns) and, when given, the idf weights ({method}_idf.npy).
+
+    Args:
+        vectorizer (CountVectorizer): fitted CountVectorizer or TfidfVectorizer
+        matrix (spmatrix): (documents x terms) matrix
+        save_dir (str): directory where the artifacts are saved
+        method (str): lexical method, tfidf or bm25, used as file name prefix
+        idf (Optional[np.ndarray], optional): query-side idf weights. Defaults to None.
+        params (Optional[dict], optional): method parameters recorded in the manifest.
+        Defaults to None.
+    """
+    vocabulary = vectorizer.get_feature_names_out().astype(str)
+    if vocabulary.shape[0] > 1 and not np.all(vocabulary[:-1] < vocabulary[1:]):
+        raise ValueError("The vectorizer vocabulary is not sorted by column")
+    save_csr_arrays(matrix, f"{save_dir}/{method}_matrix")
+    np.save(f"{save_dir}/{method}_vocabulary.npy", vocabulary)
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "method": method,
+        "shape": list(matrix.shape),
+        "dtype": str(matrix.dtype),
+        "matrix": f"{method}_matrix",
+        "vocabulary": f"{method}_vocabulary.npy",
+        "idf": None,
+        "vectorizer": vectorizer_manifest(vectorizer),
+        "params": params or {},
+    }
+    if idf is not None:
+        np.save(f"{save_dir}/{method}_idf.npy", np.asarray(idf, dtype=np.float32))
+        manifest["idf"] = f"{method}_idf.npy"
+    with open(f"{save_dir}/{method}_manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
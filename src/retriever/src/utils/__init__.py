@@ -1,4 +1,5 @@
+from .cohere_client import get_cohere_client, request_options
 from .load_config import load_config
 from .logging_utils import logger
 
-__all__ = ["load_config", "logger"]
+__all__ = ["get_cohere_client", "load_config", "logger", "request_options"]
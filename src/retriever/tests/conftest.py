@@ -0,0 +1,127 @@
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# the service modules import their top-level packages (utils, batch_embedings) as when the
+# service runs from src/retriever/src
+SERVICE_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+if SERVICE_SRC not in sys.path:
+    sys.path.append(SERVICE_SRC)
+
+WORDS = (
+    "chair table sofa pillow turquoise blue red wooden metal lamp rug bed desk outdoor "
+    "velvet leather modern rustic round square"
+).split()
+CLASSES = ["chairs", "tables", "sofas", "lamps", None]
+N_PRODUCTS = 120
+COLUMNS_TO_EMBED = ["product_name", "product_description"]
+
+
+def make_catalog(n_products: int = N_PRODUCTS, seed: int = 0) -> pd.DataFrame:
+    """Synthetic catalog with the columns of the product csv, product_id being the row."""
+    rng = np.random.default_rng(seed)
+    classes = [CLASSES[i] for i in rng.integers(0, len(CLASSES), n_products)]
+    rated = rng.random(n_products) > 0.2
+    return pd.DataFrame(
+        {
+            "product_id": np.arange(n_products),
+            "product_name": [
+                " ".join(rng.choice(WORDS, 3, replace=False)) for _ in range(n_products)
+            ],
+            "product_class": classes,
+            "category hierarchy": [
+                None if c is None else f"Furniture / {c} / {rng.choice(['a', 'b'])}"
+                for c in classes
+            ],
+            "product_description": [
+                None if i % 17 == 0 else " ".join(rng.choice(WORDS, 12))
+                for i in range(n_products)
+            ],
+            "product_features": "color:blue|size:big",
+            "rating_count": np.where(rated, rng.integers(0, 200, n_products), np.nan),
+            "average_rating": np.where(
+                rated, rng.uniform(1, 5, n_products).round(1), np.nan
+            ),
+            "review_count": np.where(rated, rng.integers(0, 100, n_products), np.nan),
+        }
+    )
+
+
+class WordEmbedder:
+    """Deterministic stand-in for the embedding provider: the normalized sum of a fixed random
+    vector per known word."""
+
+    def __init__(self, dim: int, seed: int = 0):
+        self.word_vectors = dict(
+            zip(
+                WORDS,
+                np.random.default_rng(seed).standard_normal((len(WORDS), dim)),
+                strict=True,
+            )
+        )
+        self.dim = dim
+        self.calls = 0
+
+    def embed(self, texts) -> np.ndarray:
+        embeddings = np.full((len(texts), self.dim), 1e-3, dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                embeddings[row] += self.word_vectors.get(word, 0)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    async def embed_texts(self, texts) -> np.ndarray:
+        self.calls += 1
+        return self.embed(texts)
+
+
+@pytest.fixture(scope="session")
+def catalog() -> pd.DataFrame:
+    return make_catalog()
+
+
+@pytest.fixture(scope="session")
+def embedder() -> WordEmbedder:
+    from src.retriever.src.app.core.dense_retriever import output_dim
+
+    return WordEmbedder(output_dim)
+
+
+@pytest.fixture(scope="session")
+def retrieval(catalog, embedder, tmp_path_factory):
+    """The retrieval service module, loaded over the synthetic catalog.
+
+    The tfidf and flat FAISS artifacts are built with the batch pipeline generators, and the
+    query embeddings come from the embedder fixture instead of the provider, without query
+    cache nor micro-batching.
+    """
+    from src.retriever.src.app.utils import faiss_connection, load_artifacts
+    from src.retriever.src.batch_embedings.generators.base_embeder import (
+        BaseDenseEmbeder,
+    )
+    from src.retriever.src.batch_embedings.generators.lexical_embeder import (
+        TDIDFLexicalEmbeder,
+    )
+
+    save_dir = f"{tmp_path_factory.mktemp('artifacts')}/"
+    data_path = save_dir + "products.csv"
+    catalog.to_csv(data_path, sep="\t", index=False)
+    lexical_embeder = TDIDFLexicalEmbeder(save_dir)
+    lexical_embeder.save(lexical_embeder.fit_transform(catalog, COLUMNS_TO_EMBED))
+    texts = catalog[COLUMNS_TO_EMBED].fillna("").agg(" ".join, axis=1).tolist()
+    BaseDenseEmbeder(embedder.dim).index_and_save(
+        embedder.embed(texts), save_dir, {"type": "flat"}
+    )
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATA_PATH", data_path)
+        mp.setattr(load_artifacts, "ARTIFACTS_SAVE_PATH", save_dir)
+        mp.setattr(faiss_connection, "ARTIFACTS_SAVE_PATH", save_dir)
+        module = importlib.import_module("src.retriever.src.app.services.retrieval")
+    module.dense_retriever.query_cache = None
+    module.dense_retriever.query_batcher = None
+    module.dense_retriever.embed_texts = embedder.embed_texts
+    return module
@@ -0,0 +1,70 @@
+import json
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from src.retriever.src.batch_embedings.exceptions import WrongIndexType
+from src.retriever.src.batch_embedings.generators.base_embeder import (
+    BaseDenseEmbeder,
+)
+
+EMBEDDING_DIM = 32
+
+
+class TestBaseDenseEmbederIndexAndSave:
+    """Test suite for the configurable FAISS index built by BaseDenseEmbeder."""
+
+    @pytest.fixture
+    def embeddings(self):
+        """Create random embeddings to be indexed."""
+        return np.random.default_rng(0).standard_normal((2000, EMBEDDING_DIM))
+
+    @pytest.mark.parametrize(
+        "index_params, expected_factory",
+        [
+            ({"type": "flat"}, "Flat"),
+            ({"type": "ivf_flat", "nlist": 16, "nprobe": 4}, "IVF16,Flat"),
+            ({"type": "ivf_pq", "nlist": 16, "pq_m": 8, "pq_nbits": 4}, "IVF16,PQ8x4"),
+            ({"type": "hnsw", "hnsw_m": 16, "ef_search": 64}, "HNSW16,Flat"),
+            (
+                {"type": "opq_ivf_pq", "nlist": 16, "pq_m": 8, "pq_nbits": 4},
+                "OPQ8,IVF16,PQ8x4",
+            ),
+        ],
+    )
+    def test_index_types(self, embeddings, tmp_path, index_params, expected_factory):
+        """Test that every index type is trained, saved and described in the metadata."""
+        save_dir = f"{tmp_path}/"
+        BaseDenseEmbeder(EMBEDDING_DIM).index_and_save(
+            embeddings, save_dir, index_params
+        )
+
+        index = faiss.read_index(save_dir + "products_index.faiss")
+        assert index.ntotal == embeddings.shape[0]
+        assert index.metric_type == faiss.METRIC_INNER_PRODUCT
+
+        with open(save_dir + "products_index.json") as f:
+            metadata = json.load(f)
+        assert metadata["type"] == index_params["type"]
+        assert metadata["factory_string"] == expected_factory
+        assert metadata["ntotal"] == embeddings.shape[0]
+
+    def test_default_is_exact_flat_index(self, embeddings, tmp_path):
+        """Test that the default index returns the exact nearest neighbour."""
+        save_dir = f"{tmp_path}/"
+        BaseDenseEmbeder(EMBEDDING_DIM).index_and_save(embeddings, save_dir)
+
+        index = faiss.read_index(save_dir + "products_index.faiss")
+        query = embeddings[7] / np.linalg.norm(embeddings[7])
+        _, idxs = index.search(query[None, :].astype("float32"), k=1)
+        assert idxs[0][0] == 7
+        assert os.path.exists(save_dir + "products_index.json")
+
+    def test_wrong_index_type(self, embeddings, tmp_path):
+        """Test that WrongIndexType is raised for unknown index types."""
+        with pytest.raises(WrongIndexType):
+            BaseDenseEmbeder(EMBEDDING_DIM).index_and_save(
+                embeddings, f"{tmp_path}/", {"type": "lsh"}
+            )
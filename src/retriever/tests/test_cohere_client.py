@@ -0,0 +1,70 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.retriever.src.utils.cohere_client import build_async_client
+
+
+class StubCohereHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Cohere v2 embed endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        self.requests.append((self.path, body))
+        payload = json.dumps(
+            {
+                "id": "stub",
+                "embeddings": {"float": [[float(len(t))] * 2 for t in body["texts"]]},
+                "texts": body["texts"],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server():
+    """Run the stub Cohere server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCohereHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_embed_against_stub_server(stub_server):
+    """Test that the async client embeds through the pooled httpx client."""
+    client = build_async_client(api_key="test", base_url=stub_server, http2=False)
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                client.embed(
+                    texts=[text],
+                    model="embed-v4.0",
+                    input_type="search_document",
+                    embedding_types=["float"],
+                    request_options={"timeout_in_seconds": 1, "max_retries": 0},
+                )
+                for text in ["a", "bb", "ccc"]
+            ]
+        )
+
+    responses = asyncio.run(run())
+
+    assert [r.embeddings.float_[0][0] for r in responses] == [1.0, 2.0, 3.0]
+    path, body = StubCohereHandler.requests[-1]
+    assert path == "/v2/embed"
+    assert body["model"] == "embed-v4.0"
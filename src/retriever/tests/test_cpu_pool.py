@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.retriever.src.app.core.cpu_pool import CPUWorkerPool, run_stage
+from src.retriever.src.app.exceptions import StageTimeoutError
+
+
+class TestCPUWorkerPool:
+    """Test suite for the CPU stage thread pool."""
+
+    def test_run_executes_off_the_event_loop_thread(self):
+        """Test that functions run in the pool threads with their arguments."""
+        pool = CPUWorkerPool(max_workers=2)
+
+        async def main():
+            return await pool.run(
+                lambda x, y=0: (threading.current_thread().name, x + y), 1, y=2
+            )
+
+        thread_name, result = asyncio.run(main())
+        pool.shutdown()
+        assert thread_name.startswith("retrieval-cpu")
+        assert result == 3
+
+    def test_blocking_stage_overlaps_with_awaited_io(self):
+        """Test that a blocking stage does not delay a concurrent coroutine."""
+        pool = CPUWorkerPool(max_workers=1)
+
+        async def main():
+            start = time.perf_counter()
+            await asyncio.gather(pool.run(time.sleep, 0.2), asyncio.sleep(0.2))
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(main())
+        pool.shutdown()
+        assert elapsed < 0.35
+
+
+class TestRunStage:
+    """Test suite for the per-stage time budget."""
+
+    def test_returns_result_within_budget(self):
+        """Test that stages finishing in time return their result."""
+
+        async def stage():
+            return "done"
+
+        assert asyncio.run(run_stage(stage(), 1, "lexical")) == "done"
+
+    def test_raises_stage_timeout(self):
+        """Test that slow stages raise a StageTimeoutError naming the stage."""
+        with pytest.raises(StageTimeoutError, match="dense"):
+            asyncio.run(run_stage(asyncio.sleep(1), 0.01, "dense"))
@@ -0,0 +1,160 @@
+import faiss
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core import dense_retriever as dense_module
+from src.retriever.src.app.utils import faiss_connection
+from src.retriever.src.batch_embedings.generators.base_embeder import (
+    BaseDenseEmbeder,
+)
+
+EMBEDDING_DIM = 16
+N_PRODUCTS = 2000
+INDEX_PARAMS = {
+    "flat": {"type": "flat"},
+    "ivf_flat": {"type": "ivf_flat", "nlist": 16, "nprobe": 16},
+    "hnsw": {"type": "hnsw", "hnsw_m": 16, "ef_search": 64},
+}
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    embeddings = np.random.default_rng(0).standard_normal((N_PRODUCTS, EMBEDDING_DIM))
+    return (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+
+
+@pytest.fixture
+def build_retriever(embeddings, tmp_path, monkeypatch):
+    """Builds a DenseRetriever over the embeddings, indexed with the given parameters and
+    memory-mapped like in the service. The search parameters of the config default to none."""
+
+    def build(index_params, nprobe=None, ef_search=None):
+        save_dir = f"{tmp_path}/"
+        BaseDenseEmbeder(EMBEDDING_DIM).index_and_save(
+            embeddings, save_dir, index_params
+        )
+        monkeypatch.setattr(faiss_connection, "ARTIFACTS_SAVE_PATH", save_dir)
+        monkeypatch.setattr(dense_module, "ARTIFACTS_MMAP", True)
+        monkeypatch.setattr(
+            dense_module,
+            "index_config",
+            {**dense_module.index_config, "nprobe": nprobe, "ef_search": ef_search},
+        )
+        return dense_module.DenseRetriever()
+
+    return build
+
+
+def allowed_mask(n_allowed, seed=1):
+    allowed = np.zeros(N_PRODUCTS, dtype=bool)
+    allowed[
+        np.random.default_rng(seed).choice(N_PRODUCTS, n_allowed, replace=False)
+    ] = True
+    return allowed
+
+
+class TestSearchParameters:
+    """Test suite for the id selectors restricting the search to the allowed products."""
+
+    def test_no_restriction(self, build_retriever):
+        """Test that without bitmap the index parameters are used as is."""
+        retriever = build_retriever(INDEX_PARAMS["flat"])
+        assert retriever._search_parameters(None) == (None, None)
+
+    @pytest.mark.parametrize(
+        "n_allowed, buffer_dtype",
+        [
+            (N_PRODUCTS // dense_module.ID_SELECTOR_BATCH_RATIO, np.int64),
+            (N_PRODUCTS // dense_module.ID_SELECTOR_BATCH_RATIO + 1, np.uint8),
+        ],
+    )
+    def test_selector_switch(self, build_retriever, n_allowed, buffer_dtype):
+        """Test that up to 1 / ID_SELECTOR_BATCH_RATIO of the products an id set is used,
+        and a packed bitmap above."""
+        retriever = build_retriever(INDEX_PARAMS["flat"])
+        allowed = allowed_mask(n_allowed)
+
+        _, buffer = retriever._search_parameters(allowed)
+
+        assert buffer.dtype == buffer_dtype
+        if buffer_dtype == np.int64:
+            assert buffer.tolist() == np.flatnonzero(allowed).tolist()
+        else:
+            assert buffer.shape[0] == -(-N_PRODUCTS // 8)
+
+    @pytest.mark.parametrize("index_type", list(INDEX_PARAMS))
+    @pytest.mark.parametrize("n_allowed", [10, 300])
+    def test_search_returns_allowed_products(
+        self, build_retriever, embeddings, monkeypatch, index_type, n_allowed
+    ):
+        """Test that search and search_batch only return allowed products, the same ones
+        with both selectors. A graph search may find fewer than k of very few allowed
+        products, the empty slots of search_batch being -1."""
+        retriever = build_retriever(INDEX_PARAMS[index_type])
+        allowed = allowed_mask(n_allowed)
+        queries = embeddings[:4] + 0.1 * embeddings[4:8]
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        results = {}
+        # a ratio of 0 always selects with an id set, a huge one always with a bitmap
+        for ratio in (0, N_PRODUCTS + 1):
+            monkeypatch.setattr(dense_module, "ID_SELECTOR_BATCH_RATIO", ratio)
+            _, batch_ids = retriever.search_batch(queries, 5, allowed)
+            single_ids = [retriever.search(query, 5, allowed)[1] for query in queries]
+            assert [ids[ids >= 0].tolist() for ids in batch_ids] == [
+                ids.tolist() for ids in single_ids
+            ]
+            results[ratio] = batch_ids
+
+        ids = results[0]
+        assert ids.tolist() == results[N_PRODUCTS + 1].tolist()
+        assert allowed[ids[ids >= 0]].all()
+        if index_type != "hnsw":
+            # the IVF index probes every list, so both searches are exact
+            exact = np.where(allowed, queries @ embeddings.T, -np.inf)
+            assert ids.tolist() == np.argsort(-exact, axis=1)[:, :5].tolist()
+
+    def test_approximate_parameters_are_carried_over(self, build_retriever):
+        """Test that the per-call parameters keep the nprobe and efSearch of the index."""
+        ivf = build_retriever(INDEX_PARAMS["ivf_flat"], nprobe=3)
+        params, _ = ivf._search_parameters(allowed_mask(300))
+        assert params.nprobe == 3
+
+        hnsw = build_retriever(INDEX_PARAMS["hnsw"], ef_search=40)
+        params, _ = hnsw._search_parameters(allowed_mask(300))
+        assert params.efSearch == 40
+
+
+class TestSetSearchParams:
+    """Test suite for the approximate search parameters applied at load time."""
+
+    @pytest.mark.parametrize(
+        "config_nprobe, expected", [(None, 16), (4, 4)], ids=["metadata", "config"]
+    )
+    def test_ivf_nprobe(self, build_retriever, config_nprobe, expected):
+        """Test that the configured nprobe takes precedence over the index metadata."""
+        retriever = build_retriever(INDEX_PARAMS["ivf_flat"], nprobe=config_nprobe)
+        assert faiss.extract_index_ivf(retriever.index).nprobe == expected
+
+    @pytest.mark.parametrize(
+        "config_ef_search, expected", [(None, 64), (24, 24)], ids=["metadata", "config"]
+    )
+    def test_hnsw_ef_search(self, build_retriever, config_ef_search, expected):
+        """Test that the configured efSearch takes precedence over the index metadata."""
+        retriever = build_retriever(INDEX_PARAMS["hnsw"], ef_search=config_ef_search)
+        assert faiss.downcast_index(retriever.index).hnsw.efSearch == expected
+
+    @pytest.mark.parametrize("index_type", list(INDEX_PARAMS))
+    def test_score_candidates_after_load(self, build_retriever, embeddings, index_type):
+        """Test that candidate vectors are reconstructed from the loaded index, which for IVF
+        needs the direct map."""
+        retriever = build_retriever(INDEX_PARAMS[index_type])
+        candidate_ids = np.array([5, 1999, 0, 731])
+
+        scores = retriever.score_candidates(embeddings[3], candidate_ids)
+
+        np.testing.assert_allclose(
+            scores, embeddings[candidate_ids] @ embeddings[3], rtol=1e-5, atol=1e-6
+        )
@@ -0,0 +1,80 @@
+import numpy as np
+import orjson
+import pandas as pd
+
+from src.retriever.src.app.schemas import RetrievalDoc, SearchResponse
+from src.retriever.src.app.utils.doc_payload import DOC_FIELDS, docs_payload
+
+DOCS = pd.DataFrame(
+    {
+        "product_id": [7, 3],
+        "product_name": ["sofa", "lamp"],
+        "product_class": ["sofas", np.nan],
+        "category hierarchy": ["Furniture / sofas", "Lighting"],
+        "product_description": ["blue velvet sofa", None],
+        "product_features": ["color:blue", ""],
+        "rating_count": [10.0, np.nan],
+        "average_rating": [4.5, np.nan],
+        "review_count": [3.0, np.nan],
+        "scores": np.array([0.9, 0.4], dtype=np.float32),
+    }
+)
+
+
+class TestDocsPayload:
+    """Test suite for the column-wise retrieve_docs payload."""
+
+    def test_full_payload_matches_response_fields(self):
+        """Test that every field is renamed, ordered and null-safe."""
+        payload = docs_payload(DOCS)
+
+        assert [list(doc) for doc in payload["docs"]] == [list(DOC_FIELDS)] * 2
+        first, second = payload["docs"]
+        assert first["product_id"] == 7
+        assert first["category_hierarchy"] == "Furniture / sofas"
+        assert first["score"] == float(np.float32(0.9))
+        assert second["product_class"] is None
+        assert second["product_description"] is None
+        assert second["rating_count"] is None
+
+    def test_payload_is_json_encodable(self):
+        """Test that the payload encodes with orjson without numpy types."""
+        decoded = orjson.loads(orjson.dumps(docs_payload(DOCS)))
+        assert decoded["docs"][1]["average_rating"] is None
+        assert isinstance(decoded["docs"][0]["product_id"], int)
+
+    def test_field_projection(self):
+        """Test that only the requested fields are returned, in request order."""
+        payload = docs_payload(DOCS, ["score", "product_name"])
+        assert payload == {
+            "docs": [
+                {"score": float(np.float32(0.9)), "product_name": "sofa"},
+                {"score": float(np.float32(0.4)), "product_name": "lamp"},
+            ]
+        }
+
+    def test_fallback_column_names(self):
+        """Test that frames already using the response names are supported."""
+        docs = DOCS.rename(columns={"category hierarchy": "category_hierarchy"})
+        docs = docs.rename(columns={"scores": "score"})
+        assert docs_payload(docs, ["category_hierarchy", "score"])["docs"][0] == {
+            "category_hierarchy": "Furniture / sofas",
+            "score": float(np.float32(0.9)),
+        }
+
+    def test_empty_docs(self):
+        """Test that no documents give an empty list."""
+        assert docs_payload(DOCS.iloc[:0]) == {"docs": []}
+
+    def test_projected_payload_matches_response_schema(self):
+        """Test that projected and null-name payloads validate against the response model."""
+        docs = DOCS.assign(product_name=["sofa", np.nan])
+        for fields in (None, ["product_id"], ["score", "product_description"]):
+            payload = {
+                **docs_payload(docs, fields),
+                "degraded": False,
+                "reranked": True,
+            }
+            response = SearchResponse.model_validate(payload)
+            assert response.model_dump(exclude_unset=True) == payload
+        assert "required" not in RetrievalDoc.model_json_schema()
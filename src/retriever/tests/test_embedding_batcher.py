@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core.embedding_batcher import EmbeddingMicroBatcher
+
+
+class FakeEmbedder:
+    """Records the batches it receives and embeds each text as its length."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("provider down")
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingMicroBatcher:
+    """Test suite for EmbeddingMicroBatcher."""
+
+    def test_concurrent_texts_share_one_call(self):
+        """Test that concurrent texts are sent in one call and get their own row."""
+        embedder = FakeEmbedder()
+        batcher = EmbeddingMicroBatcher(embedder, max_batch_size=10, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(*[batcher.embed("a" * i) for i in range(1, 6)])
+
+        results = asyncio.run(run())
+
+        assert len(embedder.calls) == 1
+        assert [result[0] for result in results] == [1, 2, 3, 4, 5]
+        assert batcher.stats()["mean_batch_size"] == 5
+
+    def test_max_batch_size_splits_calls(self):
+        """Test that batches never exceed max_batch_size."""
+        embedder = FakeEmbedder()
+        batcher = EmbeddingMicroBatcher(embedder, max_batch_size=2, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(*[batcher.embed(str(i)) for i in range(5)])
+
+        asyncio.run(run())
+
+        assert [len(call) for call in embedder.calls] == [2, 2, 1]
+
+    def test_duplicated_texts_are_embedded_once(self):
+        """Test that repeated texts in a batch are deduplicated."""
+        embedder = FakeEmbedder()
+        batcher = EmbeddingMicroBatcher(embedder, max_batch_size=10, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(*[batcher.embed("pillow") for _ in range(3)])
+
+        results = asyncio.run(run())
+
+        assert embedder.calls == [["pillow"]]
+        assert all(result[0] == 6 for result in results)
+
+    def test_errors_are_propagated_to_every_caller(self):
+        """Test that a failed call raises in every waiting caller."""
+        batcher = EmbeddingMicroBatcher(FakeEmbedder(fail=True), max_wait_ms=1)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.embed("c"))
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core.embedding_cache import (
+    QueryEmbeddingCache,
+    normalize_query,
+)
+
+
+class TestQueryEmbeddingCache:
+    """Test suite for QueryEmbeddingCache."""
+
+    @pytest.fixture
+    def cache(self):
+        """Create a small in-process cache."""
+        return QueryEmbeddingCache(
+            model="embed", output_dim=4, max_tokens=10, max_size=2, ttl_seconds=60
+        )
+
+    def test_normalize_query(self):
+        """Test that case and whitespace differences are normalized away."""
+        assert normalize_query("  Turquoise\tPILLOW ") == "turquoise pillow"
+
+    def test_hit_and_miss_counters(self, cache):
+        """Test that lookups update the hit and miss counters."""
+        assert cache.get("turquoise pillow") is None
+        cache.put("turquoise pillow", np.ones(4))
+
+        np.testing.assert_array_equal(cache.get("Turquoise Pillow"), np.ones(4))
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self, cache):
+        """Test that the least recently used entry is evicted first."""
+        cache.put("a", np.zeros(4))
+        cache.put("b", np.zeros(4))
+        cache.get("a")
+        cache.put("c", np.zeros(4))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["size"] == 2
+
+    def test_ttl_expiration(self, cache):
+        """Test that entries expire after the TTL."""
+        with patch("time.time", return_value=1000.0):
+            cache.put("a", np.zeros(4))
+        with patch("time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+    def test_key_depends_on_model_parameters(self, cache):
+        """Test that a different model configuration does not share entries."""
+        other = QueryEmbeddingCache(model="embed", output_dim=8, max_tokens=10)
+        assert cache.key("a") != other.key("a")
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache instance is warmed from the shared disk tier."""
+        disk_path = str(tmp_path / "query_cache.sqlite")
+        first = QueryEmbeddingCache("embed", 4, 10, disk_path=disk_path)
+        first.put("a", np.arange(4))
+        first.flush()
+
+        second = QueryEmbeddingCache("embed", 4, 10, disk_path=disk_path)
+        np.testing.assert_array_equal(second.get("a"), np.arange(4))
+        assert second.stats()["disk_hits"] == 1
+
+    def test_disk_hit_keeps_the_stored_expiry(self, tmp_path):
+        """Test that an entry warmed from disk expires when it was stored to."""
+        disk_path = str(tmp_path / "query_cache.sqlite")
+        first = QueryEmbeddingCache("embed", 4, 10, ttl_seconds=60, disk_path=disk_path)
+        with patch("time.time", return_value=1000.0):
+            first.put("a", np.zeros(4))
+            first.flush()
+
+        second = QueryEmbeddingCache(
+            "embed", 4, 10, ttl_seconds=60, disk_path=disk_path
+        )
+        with patch("time.time", return_value=1050.0):
+            assert second.get("a") is not None
+        with patch("time.time", return_value=1061.0):
+            assert second.get("a") is None
+
+    def test_disk_read_does_not_block_the_memory_tier(self, tmp_path):
+        """Test that memory hits and puts go through while a disk read is in flight."""
+        disk_path = str(tmp_path / "query_cache.sqlite")
+        cache = QueryEmbeddingCache("embed", 4, 10, disk_path=disk_path)
+        cache.put("a", np.ones(4))
+        cache.flush()
+
+        # holding the connection lock keeps the disk read of the lookup below in flight
+        with cache._disk_lock:
+            lookup = threading.Thread(target=cache.get, args=("b",))
+            lookup.start()
+            lookup.join(timeout=0.1)
+            assert lookup.is_alive()
+            np.testing.assert_array_equal(cache.get("a"), np.ones(4))
+            cache.put("c", np.zeros(4))
+        lookup.join(timeout=1)
+
+        assert not lookup.is_alive()
+        assert cache.stats()["misses"] == 1
+
+    def test_unreadable_disk_tier_is_a_miss(self, tmp_path):
+        """Test that a failed disk read counts as a miss instead of raising, and that reads
+        wait at most disk_read_timeout_s on a locked file."""
+        disk_path = str(tmp_path / "query_cache.sqlite")
+        cache = QueryEmbeddingCache(
+            "embed", 4, 10, disk_path=disk_path, disk_read_timeout_s=0.02
+        )
+        assert cache._disk.execute("PRAGMA busy_timeout").fetchone() == (20,)
+        with sqlite3.connect(disk_path) as connection:
+            connection.execute("DROP TABLE query_embeddings")
+
+        assert cache.get("a") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_expired_disk_rows_are_purged(self, tmp_path):
+        """Test that the writer deletes the expired rows of the disk tier."""
+        disk_path = str(tmp_path / "query_cache.sqlite")
+        cache = QueryEmbeddingCache(
+            "embed", 4, 10, ttl_seconds=60, disk_path=disk_path, purge_interval_s=60
+        )
+        with patch("time.time", return_value=1000.0):
+            cache.put("a", np.zeros(4))
+            cache.flush()
+        with patch("time.time", return_value=1061.0):
+            cache.put("b", np.zeros(4))
+            cache.flush()
+
+        with sqlite3.connect(disk_path) as connection:
+            rows = connection.execute(
+                "SELECT COUNT(*) FROM query_embeddings"
+            ).fetchone()
+        assert rows == (1,)
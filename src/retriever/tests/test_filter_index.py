@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.retriever.src.app.utils.filter_index import (
+    CatalogFilterIndex,
+    normalize_category_path,
+)
+
+
+@pytest.fixture
+def filter_index():
+    """Index a small catalog with missing attributes."""
+    return CatalogFilterIndex(
+        pd.DataFrame(
+            {
+                "product_class": ["Sofas", "Chairs", None, "Sofas", "Desks"],
+                "category hierarchy": [
+                    "Furniture / Living Room / Sofas",
+                    "Furniture / Living Room / Chairs",
+                    None,
+                    "Furniture / Living Room Sets",
+                    "Furniture / Office / Desks",
+                ],
+                "average_rating": [4.5, 3.0, 5.0, np.nan, 4.0],
+            }
+        )
+    )
+
+
+def test_normalize_category_path():
+    """Test that paths are compared case and whitespace insensitively."""
+    assert (
+        normalize_category_path(" Furniture/living  Room ") == "furniture / living room"
+    )
+
+
+def test_no_filter_returns_none(filter_index):
+    """Test that unfiltered requests skip the masking."""
+    assert filter_index.mask() is None
+
+
+def test_product_class(filter_index):
+    """Test that product classes are matched exactly."""
+    assert np.flatnonzero(filter_index.mask(product_class="Sofas")).tolist() == [0, 3]
+    assert not filter_index.mask(product_class="Beds").any()
+
+
+def test_category_prefix_matches_whole_segments(filter_index):
+    """Test that a prefix does not match a longer segment name."""
+    mask = filter_index.mask(category_prefix="furniture / Living Room")
+    assert np.flatnonzero(mask).tolist() == [0, 1]
+    assert filter_index.mask(category_prefix="Furniture").sum() == 4
+
+
+def test_min_average_rating_excludes_unrated(filter_index):
+    """Test that the rating bound is inclusive and unrated products never match."""
+    mask = filter_index.mask(min_average_rating=4.0)
+    assert np.flatnonzero(mask).tolist() == [0, 2, 4]
+
+
+def test_filters_are_combined(filter_index):
+    """Test that every given filter must hold."""
+    mask = filter_index.mask(
+        product_class="Sofas", category_prefix="Furniture", min_average_rating=4
+    )
+    assert np.flatnonzero(mask).tolist() == [0]
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core.fusion import (
+    fuse,
+    minmax_normalize,
+    reciprocal_ranks,
+    zscore_normalize,
+)
+from src.retriever.src.app.exceptions import WrongFusionStrategy
+
+LEXICAL = np.array([[0.0, 4.0, 2.0, 1.0], [3.0, 3.0, 1.0, 0.0]], dtype=np.float32)
+DENSE = np.array([[0.9, 0.1, 0.5, 0.2], [0.2, 0.8, 0.4, 0.6]], dtype=np.float32)
+
+
+class TestNormalization:
+    """Test suite for the per-query score normalizations."""
+
+    def test_minmax_rows_span_unit_interval(self):
+        """Test that each row is rescaled to [0, 1] independently."""
+        normalized = minmax_normalize(LEXICAL)
+        np.testing.assert_allclose(normalized.min(axis=1), 0)
+        np.testing.assert_allclose(normalized.max(axis=1), 1)
+        np.testing.assert_allclose(normalized[0], [0, 1, 0.5, 0.25])
+
+    def test_zscore_rows_are_standardized(self):
+        """Test that each row gets zero mean and unit variance."""
+        normalized = zscore_normalize(DENSE)
+        np.testing.assert_allclose(normalized.mean(axis=1), 0, atol=1e-6)
+        np.testing.assert_allclose(normalized.std(axis=1), 1, rtol=1e-5)
+
+    @pytest.mark.parametrize("normalize", [minmax_normalize, zscore_normalize])
+    def test_constant_and_masked_rows(self, normalize):
+        """Test that constant rows become 0 and masked entries are ignored."""
+        scores = np.array([[2.0, 2.0, 2.0], [1.0, 3.0, 100.0]])
+        mask = np.array([[True, True, True], [True, True, False]])
+        normalized = normalize(scores, mask)
+
+        np.testing.assert_allclose(normalized[0], 0)
+        assert normalized[1, 2] == 0
+        assert normalized[1, 1] > normalized[1, 0]
+
+
+class TestReciprocalRanks:
+    """Test suite for the rank transform used by RRF."""
+
+    def test_ranks_per_row(self):
+        """Test that the best candidate of each row gets 1 / (k + 1)."""
+        ranks = reciprocal_ranks(DENSE, rrf_k=60)
+        np.testing.assert_allclose(ranks[0], [1 / 61, 1 / 64, 1 / 62, 1 / 63])
+        np.testing.assert_allclose(ranks[1], [1 / 64, 1 / 61, 1 / 63, 1 / 62])
+
+    def test_masked_candidates_get_zero(self):
+        """Test that padded candidates do not take a rank."""
+        mask = np.array([False, True, True, True])
+        ranks = reciprocal_ranks(DENSE[0], rrf_k=0, mask=mask)
+        np.testing.assert_allclose(ranks, [0, 1 / 3, 1, 1 / 2])
+
+
+class TestFuse:
+    """Test suite for the fusion strategies."""
+
+    def test_convex_uses_raw_scores(self):
+        """Test that the convex combination weighs the raw scores with alpha."""
+        fused = fuse(LEXICAL, DENSE, strategy="convex", alpha=0.25)
+        np.testing.assert_allclose(fused, 0.25 * LEXICAL + 0.75 * DENSE, rtol=1e-6)
+
+    def test_weighted_sum_removes_scale_differences(self):
+        """Test that normalization keeps a large-scale signal from dominating."""
+        fused = fuse(
+            LEXICAL * 100,
+            DENSE,
+            strategy="weighted_sum",
+            alpha=0.5,
+            normalization="minmax",
+        )
+        expected = 0.5 * minmax_normalize(LEXICAL) + 0.5 * minmax_normalize(DENSE)
+        np.testing.assert_allclose(fused, expected, rtol=1e-6)
+
+    def test_rrf_alpha_weights_the_rankings(self):
+        """Test that alpha moves RRF between the lexical and dense rankings."""
+        lexical_first = fuse(LEXICAL, DENSE, strategy="rrf", alpha=1.0, rrf_k=60)
+        dense_first = fuse(LEXICAL, DENSE, strategy="rrf", alpha=0.0, rrf_k=60)
+        assert lexical_first[0].argmax() == LEXICAL[0].argmax()
+        assert dense_first[0].argmax() == DENSE[0].argmax()
+
+    @pytest.mark.parametrize("strategy", ["convex", "weighted_sum", "rrf"])
+    def test_batched_rows_match_single_rows(self, strategy):
+        """Test that (queries x candidates) inputs are fused row by row."""
+        fused = fuse(LEXICAL, DENSE, strategy=strategy)
+        for row in range(LEXICAL.shape[0]):
+            np.testing.assert_allclose(
+                fused[row], fuse(LEXICAL[row], DENSE[row], strategy=strategy), rtol=1e-6
+            )
+
+    def test_masked_candidates_are_never_selected(self):
+        """Test that invalid candidates get -inf."""
+        mask = np.array([[True, False, True, True], [True, True, True, True]])
+        fused = fuse(LEXICAL, DENSE, strategy="weighted_sum", mask=mask)
+        assert fused[0, 1] == -np.inf
+        assert np.isfinite(fused[1]).all()
+
+    def test_unknown_strategy(self):
+        """Test that unknown strategies are rejected."""
+        with pytest.raises(WrongFusionStrategy):
+            fuse(LEXICAL, DENSE, strategy="max")
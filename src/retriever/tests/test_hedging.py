@@ -0,0 +1,77 @@
+import asyncio
+
+from src.retriever.src.app.core.hedging import RequestHedger
+
+
+def warmed_hedger(latency_s: float = 0.01) -> RequestHedger:
+    """Hedger whose hedging delay is latency_s."""
+    hedger = RequestHedger(min_samples=5)
+    for _ in range(5):
+        hedger.record(latency_s)
+    return hedger
+
+
+class TestRequestHedger:
+    """Test suite for the hedged requests."""
+
+    def test_no_hedging_before_min_samples(self):
+        """Test that requests are sent once while the latency quantile is unknown."""
+        hedger = RequestHedger(min_samples=5)
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        assert asyncio.run(hedger.call(request)) == "ok"
+        assert hedger.hedge_delay() is None
+        assert len(calls) == 1
+
+    def test_fast_request_is_not_hedged(self):
+        """Test that requests faster than the quantile are not duplicated."""
+        hedger = warmed_hedger(0.05)
+
+        async def request():
+            return "ok"
+
+        assert asyncio.run(hedger.call(request)) == "ok"
+        assert hedger.stats()["hedged"] == 0
+
+    def test_slow_request_is_hedged_and_loser_cancelled(self):
+        """Test that the hedge answers first and the slow request is cancelled."""
+        hedger = warmed_hedger(0.01)
+        delays = iter([1.0, 0.0])
+        cancelled = []
+
+        async def request():
+            try:
+                await asyncio.sleep(next(delays))
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "hedge"
+
+        async def main():
+            result = await hedger.call(request)
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(main()) == "hedge"
+        assert cancelled == [1]
+        assert hedger.stats()["hedged"] == 1 and hedger.stats()["hedge_wins"] == 1
+
+    def test_failed_hedge_falls_back_to_first_request(self):
+        """Test that a failing hedge does not fail the call."""
+        hedger = warmed_hedger(0.01)
+        calls = []
+
+        async def request():
+            calls.append(1)
+            if len(calls) == 2:
+                raise ConnectionError("hedge failed")
+            await asyncio.sleep(0.05)
+            return "first"
+
+        assert asyncio.run(hedger.call(request)) == "first"
+        assert hedger.stats()["hedge_wins"] == 0
@@ -1,18 +1,25 @@
+import json
 import os
 import tempfile
 from unittest.mock import patch
 
 import joblib
+import numpy as np
 import pandas as pd
 import pytest
 from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from src.retriever.src.app.core.query_vectorizer import QueryVectorizer
+from src.retriever.src.app.exceptions import WrongArtifactVersion
+from src.retriever.src.app.utils import load_artifacts
+from src.retriever.src.app.utils.load_artifacts import load_csr_arrays
 from src.retriever.src.batch_embedings.exceptions import (
     EmptyDataFrameError,
     MissingColumnsError,
 )
 from src.retriever.src.batch_embedings.generators.lexical_embeder import (
+    BM25LexicalEmbeder,
     TDIDFLexicalEmbeder,
 )
 
@@ -65,6 +72,15 @@ class TestTDIDFLexicalEmbeder:
         assert hasattr(embeder.vectorizer, "vocabulary_")
         assert len(embeder.vectorizer.vocabulary_) > 0
 
+    def test_fit_transform_float32_normalized_rows(self, embeder, sample_dataframe):
+        """Test that the matrix is float32 with L2-normalized rows."""
+        result = embeder.fit_transform(sample_dataframe, ["title", "description"])
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(
+            np.sqrt(result.multiply(result).sum(axis=1)).A1, 1, rtol=1e-5
+        )
+
     def test_fit_transform_single_column(self, embeder, sample_dataframe):
         """Test fit_transform with a single column."""
         cols_to_embed = ["title"]
@@ -159,11 +175,19 @@ class TestTDIDFLexicalEmbeder:
         embeder.save(vectors)
 
         # Check that files were created
-        vectorizer_path = os.path.join(temp_dir, "tfidf_vectorizer.joblib")
-        matrix_path = os.path.join(temp_dir, "tfidf_matrix.joblib")
-
-        assert os.path.exists(vectorizer_path)
-        assert os.path.exists(matrix_path)
+        for file_name in [
+            "tfidf_manifest.json",
+            "tfidf_vocabulary.npy",
+            "tfidf_idf.npy",
+            "tfidf_matrix_data.npy",
+        ]:
+            assert os.path.exists(os.path.join(temp_dir, file_name))
+
+        with open(os.path.join(temp_dir, "tfidf_manifest.json")) as f:
+            manifest = json.load(f)
+        assert manifest["format_version"] == 1
+        assert manifest["shape"] == list(vectors.shape)
+        assert manifest["vectorizer"]["norm"] == "l2"
 
     def test_save_and_load_consistency(self, embeder, sample_dataframe, temp_dir):
         """Test that saved objects can be loaded and are consistent."""
@@ -173,38 +197,79 @@ class TestTDIDFLexicalEmbeder:
         embeder.save(original_vectors)
 
         # Load saved objects
-        vectorizer_path = os.path.join(temp_dir, "tfidf_vectorizer.joblib")
-        matrix_path = os.path.join(temp_dir, "tfidf_matrix.joblib")
-
-        loaded_vectorizer = joblib.load(vectorizer_path)
-        loaded_vectors = joblib.load(matrix_path)
+        with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{temp_dir}/"):
+            loaded_vectorizer, loaded_vectors = load_artifacts.load_tfidf_artifacts()
 
         # Check consistency
-        assert type(loaded_vectorizer) is type(embeder.vectorizer)
-        assert loaded_vectorizer.vocabulary_ == embeder.vectorizer.vocabulary_
+        assert isinstance(loaded_vectorizer, QueryVectorizer)
+        queries = ["great product", "amazing wonderful tool", "unknown"]
+        np.testing.assert_allclose(
+            loaded_vectorizer.transform(queries).toarray(),
+            embeder.vectorizer.transform(queries).toarray(),
+            rtol=1e-6,
+        )
         assert (loaded_vectors != original_vectors).nnz == 0  # Compare sparse matrices
 
-    @patch("joblib.dump")
-    def test_save_calls_joblib_dump(self, mock_dump, embeder, sample_dataframe):
-        """Test that save method calls joblib.dump with correct parameters."""
+    def test_legacy_joblib_artifacts_are_loaded(
+        self, embeder, sample_dataframe, temp_dir
+    ):
+        """Test that artifacts saved before the versioned format still load."""
+        vectors = embeder.fit_transform(sample_dataframe, ["title", "description"])
+        joblib.dump(
+            embeder.vectorizer, os.path.join(temp_dir, "tfidf_vectorizer.joblib")
+        )
+        joblib.dump(vectors, os.path.join(temp_dir, "tfidf_matrix.joblib"))
+
+        with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{temp_dir}/"):
+            loaded_vectorizer, loaded_vectors = load_artifacts.load_tfidf_artifacts()
+
+        assert isinstance(loaded_vectorizer, TfidfVectorizer)
+        assert (loaded_vectors != vectors).nnz == 0
+
+    def test_newer_format_version_is_rejected(
+        self, embeder, sample_dataframe, temp_dir
+    ):
+        """Test that artifacts from a newer format version are not misread."""
+        embeder.save(embeder.fit_transform(sample_dataframe, ["title"]))
+        manifest_path = os.path.join(temp_dir, "tfidf_manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["format_version"] += 1
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{temp_dir}/"):
+            with pytest.raises(WrongArtifactVersion):
+                load_artifacts.load_tfidf_artifacts()
+
+    def test_save_raw_csr_arrays_can_be_memory_mapped(
+        self, embeder, sample_dataframe, temp_dir
+    ):
+        """Test that the raw CSR arrays are saved and load back as a memory-mapped matrix."""
         cols_to_embed = ["title", "description"]
-        vectors = embeder.fit_transform(sample_dataframe, cols_to_embed)
+        original_vectors = embeder.fit_transform(sample_dataframe, cols_to_embed)
 
-        embeder.save(vectors)
+        embeder.save(original_vectors)
 
-        # Check that joblib.dump was called twice
-        assert mock_dump.call_count == 2
+        for suffix in ["data", "indices", "indptr", "shape"]:
+            assert os.path.exists(os.path.join(temp_dir, f"tfidf_matrix_{suffix}.npy"))
 
-        # Check call arguments
-        calls = mock_dump.call_args_list
+        loaded_vectors = load_csr_arrays(
+            os.path.join(temp_dir, "tfidf_matrix"), mmap=True
+        )
+        assert loaded_vectors.shape == original_vectors.shape
+        assert (loaded_vectors != original_vectors).nnz == 0
+        assert not loaded_vectors.data.flags.writeable
+
+    @patch("joblib.dump")
+    def test_save_does_not_pickle(self, mock_dump, embeder, sample_dataframe):
+        """Test that save method does not pickle the vectorizer or the matrix."""
+        cols_to_embed = ["title", "description"]
+        vectors = embeder.fit_transform(sample_dataframe, cols_to_embed)
 
-        # First call should save vectorizer
-        assert calls[0][0][0] == embeder.vectorizer
-        assert calls[0][0][1].endswith("tfidf_vectorizer.joblib")
+        embeder.save(vectors)
 
-        # Second call should save vectors
-        assert calls[1][0][0] is vectors
-        assert calls[1][0][1].endswith("tfidf_matrix.joblib")
+        mock_dump.assert_not_called()
 
     def test_text_combination_correctness(self, embeder):
         """Test that text from multiple columns is combined correctly."""
@@ -277,8 +342,8 @@ class TestTDIDFLexicalEmbederIntegration:
         assert len(embeder.vectorizer.vocabulary_) > 0
 
         # Verify files exist
-        assert (tmp_path / "tfidf_vectorizer.joblib").exists()
-        assert (tmp_path / "tfidf_matrix.joblib").exists()
+        assert (tmp_path / "tfidf_manifest.json").exists()
+        assert (tmp_path / "tfidf_vocabulary.npy").exists()
 
 
 # Parametrized tests for edge cases
@@ -320,3 +385,65 @@ class TestTDIDFLexicalEmbederEdgeCases:
         result = embeder.fit_transform(df, ["text"])
 
         assert result.shape[0] == len(text_data)
+
+
+class TestBM25LexicalEmbeder:
+    """Test suite for the BM25 impact matrix generation."""
+
+    @pytest.fixture
+    def sample_dataframe(self):
+        """Create a sample DataFrame with documents of different lengths."""
+        return pd.DataFrame(
+            {
+                "title": ["red sofa", "red red chair", "blue lamp"],
+                "description": ["comfy", "wooden chair with red cushion", None],
+            }
+        )
+
+    def test_impacts_match_bm25_formula(self, tmp_path, sample_dataframe):
+        """Test that every impact follows the BM25 term weight formula."""
+        k1, b = 1.5, 0.6
+        embeder = BM25LexicalEmbeder(save_dir=str(tmp_path), k1=k1, b=b)
+        impacts = embeder.fit_transform(sample_dataframe, ["title", "description"])
+
+        counts = embeder.vectorizer.transform(
+            [
+                "red sofa comfy",
+                "red red chair wooden chair with red cushion",
+                "blue lamp ",
+            ]
+        ).toarray()
+        doc_freq = (counts > 0).sum(axis=0)
+        idf = np.log(1 + (3 - doc_freq + 0.5) / (doc_freq + 0.5))
+        lengths = counts.sum(axis=1, keepdims=True)
+        expected = (
+            idf
+            * counts
+            * (k1 + 1)
+            / (counts + k1 * (1 - b + b * lengths / lengths.mean()))
+        )
+        assert impacts.dtype == np.float32
+        np.testing.assert_allclose(impacts.toarray(), expected, rtol=1e-5)
+
+    def test_empty_dataframe_error(self, tmp_path):
+        """Test that empty DataFrames are rejected."""
+        embeder = BM25LexicalEmbeder(save_dir=str(tmp_path))
+        with pytest.raises(EmptyDataFrameError):
+            embeder.fit_transform(pd.DataFrame(columns=["title"]), ["title"])
+
+    def test_save_and_load(self, tmp_path, sample_dataframe):
+        """Test that the saved artifacts are loaded back, memory-mapped."""
+        embeder = BM25LexicalEmbeder(save_dir=str(tmp_path))
+        impacts = embeder.fit_transform(sample_dataframe, ["title", "description"])
+        embeder.save(impacts)
+
+        with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{tmp_path}/"):
+            vectorizer, loaded = load_artifacts.load_bm25_artifacts(mmap=True)
+
+        assert not loaded.data.flags.writeable
+        np.testing.assert_array_equal(loaded.toarray(), impacts.toarray())
+        queries = ["red red sofa", "wooden lamp"]
+        np.testing.assert_array_equal(
+            vectorizer.transform(queries).toarray(),
+            embeder.vectorizer.transform(queries).toarray(),
+        )
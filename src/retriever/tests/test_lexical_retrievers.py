@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.retriever.src.app.core.lexical_retrievers import (
+    BM25Retriever,
+    InvertedIndexRetriever,
+    TFIDFRetriever,
+)
+from src.retriever.src.app.exceptions import WrongSimilarityMethod
+from src.retriever.src.app.utils.load_artifacts import prenormalize_rows
+from src.retriever.src.batch_embedings.generators.lexical_embeder import (
+    BM25LexicalEmbeder,
+)
+
+CORPUS = [
+    "turquoise pillow cover",
+    "blue velvet sofa",
+    "wooden desk with drawers",
+    "turquoise velvet armchair",
+    "outdoor wooden bench",
+    "pillow insert",
+]
+
+
+@pytest.fixture
+def tfidf_artifacts():
+    """Fit a float32 TF-IDF vectorizer on a small corpus."""
+    vectorizer = TfidfVectorizer(dtype=np.float32)
+    return vectorizer, vectorizer.fit_transform(CORPUS)
+
+
+class TestTFIDFRetriever:
+    """Test suite for the prenormalized TF-IDF scoring path."""
+
+    @pytest.mark.parametrize("query", ["turquoise pillow", "wooden", "unknown words"])
+    def test_score_matches_sklearn_cosine(self, tfidf_artifacts, query):
+        """Test that the dot product path matches sklearn cosine_similarity."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        scores = TFIDFRetriever().score(query, vectorizer, tfidf_matrix)
+
+        expected = cosine_similarity(vectorizer.transform([query]), tfidf_matrix)[0]
+        np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-6)
+        assert scores.dtype == np.float32
+
+    def test_retrieve_returns_best_first(self, tfidf_artifacts):
+        """Test that retrieve returns the top_n documents by descending score."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        retriever = TFIDFRetriever()
+        ids = retriever.retrieve("turquoise pillow", vectorizer, tfidf_matrix, 2)
+
+        scores = retriever.score("turquoise pillow", vectorizer, tfidf_matrix)
+        assert ids.tolist() == scores.argsort()[-2:][::-1].tolist()
+        assert ids[0] == 0
+
+    def test_score_candidates_and_batch_match_score(self, tfidf_artifacts):
+        """Test that the candidate and batch paths agree with the single query path."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        retriever = TFIDFRetriever()
+        queries = ["turquoise pillow", "wooden desk"]
+        candidate_ids = np.array([0, 2, 3])
+
+        for row, query in zip(
+            retriever.score_batch(queries, vectorizer, tfidf_matrix).toarray(),
+            queries,
+            strict=True,
+        ):
+            full_scores = retriever.score(query, vectorizer, tfidf_matrix)
+            np.testing.assert_allclose(row, full_scores, rtol=1e-5)
+            np.testing.assert_allclose(
+                retriever.score_candidates(
+                    query, vectorizer, tfidf_matrix, candidate_ids
+                ),
+                full_scores[candidate_ids],
+                rtol=1e-5,
+            )
+
+    def test_retrieve_only_returns_allowed_documents(self, tfidf_artifacts):
+        """Test that the row mask is applied before the top-k, so the page is filled."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        allowed = np.array([False, True, True, True, True, True])
+        ids = TFIDFRetriever().retrieve(
+            "turquoise pillow", vectorizer, tfidf_matrix, 2, allowed=allowed
+        )
+
+        assert ids.tolist() == [5, 3]
+
+    def test_wrong_similarity_method(self):
+        """Test that unsupported similarity methods are rejected."""
+        with pytest.raises(WrongSimilarityMethod):
+            TFIDFRetriever(similarity_method="euclidean")
+
+
+class TestInvertedIndexRetriever:
+    """Test suite for the postings based lexical retriever."""
+
+    @pytest.mark.parametrize("query", ["turquoise pillow", "velvet", "unknown words"])
+    def test_score_matches_scan(self, tfidf_artifacts, query):
+        """Test that postings accumulation matches the full scan scores."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        scores = InvertedIndexRetriever(tfidf_matrix).score(query, vectorizer)
+
+        expected = TFIDFRetriever().score(query, vectorizer, tfidf_matrix)
+        np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-6)
+
+    def test_top_k_is_exact_on_random_corpus(self):
+        """Test that MaxScore pruning returns the same top k as the full scan."""
+        rng = np.random.default_rng(0)
+        vocabulary = np.array([f"term{i}" for i in range(300)])
+        weights = 1 / np.arange(1, 301)
+        corpus = [
+            " ".join(rng.choice(vocabulary, 12, p=weights / weights.sum()))
+            for _ in range(500)
+        ]
+        vectorizer = TfidfVectorizer(dtype=np.float32)
+        tfidf_matrix = vectorizer.fit_transform(corpus)
+        retriever = InvertedIndexRetriever(tfidf_matrix)
+
+        for _ in range(30):
+            query = " ".join(rng.choice(vocabulary, 3, p=weights / weights.sum()))
+            ids, scores = retriever.top_k(query, vectorizer, 10)
+            expected = TFIDFRetriever().score(query, vectorizer, tfidf_matrix)
+            np.testing.assert_allclose(
+                scores, np.sort(expected)[::-1][:10], rtol=1e-5, atol=1e-6
+            )
+            np.testing.assert_allclose(expected[ids], scores, rtol=1e-5, atol=1e-6)
+
+    def test_retrieve_skips_unmatched_documents(self, tfidf_artifacts):
+        """Test that only documents sharing a query term are returned."""
+        vectorizer, tfidf_matrix = tfidf_artifacts
+        retriever = InvertedIndexRetriever(tfidf_matrix)
+
+        assert retriever.retrieve("turquoise pillow", vectorizer, top_n=10)[0] == 0
+        assert set(retriever.retrieve("pillow", vectorizer, top_n=10)) == {0, 5}
+        assert retriever.retrieve("unknown words", vectorizer, top_n=10).size == 0
+
+    def test_top_k_with_mask_matches_masked_scan(self):
+        """Test that skipping disallowed postings keeps the top k exact."""
+        rng = np.random.default_rng(1)
+        vocabulary = np.array([f"term{i}" for i in range(100)])
+        corpus = [" ".join(rng.choice(vocabulary, 8)) for _ in range(300)]
+        vectorizer = TfidfVectorizer(dtype=np.float32)
+        tfidf_matrix = vectorizer.fit_transform(corpus)
+        retriever = InvertedIndexRetriever(tfidf_matrix)
+        allowed = rng.random(300) < 0.2
+
+        for _ in range(20):
+            query = " ".join(rng.choice(vocabulary, 3))
+            ids, scores = retriever.top_k(query, vectorizer, 10, allowed)
+            expected = TFIDFRetriever().score(query, vectorizer, tfidf_matrix)
+            expected = np.where(allowed & (expected > 0), expected, 0)
+            assert allowed[ids].all()
+            np.testing.assert_allclose(
+                scores, np.sort(expected)[::-1][: ids.size], rtol=1e-5, atol=1e-6
+            )
+            assert ids.size == min(10, np.count_nonzero(expected))
+
+
+class TestBM25Retriever:
+    """Test suite for the BM25 impact matrix scoring path."""
+
+    @pytest.fixture
+    def bm25_artifacts(self, tmp_path):
+        """Compute the BM25 impacts of the small corpus."""
+        embeder = BM25LexicalEmbeder(save_dir=str(tmp_path))
+        bm25_matrix = embeder.fit_transform(pd.DataFrame({"text": CORPUS}), ["text"])
+        return embeder.vectorizer, bm25_matrix
+
+    def test_score_is_normalized_sum_of_impacts(self, bm25_artifacts):
+        """Test that scores are the summed query term impacts over the query upper bound."""
+        vectorizer, bm25_matrix = bm25_artifacts
+        scores = BM25Retriever(bm25_matrix).score(
+            "turquoise pillow", vectorizer, bm25_matrix
+        )
+
+        columns = [vectorizer.vocabulary_[term] for term in ("turquoise", "pillow")]
+        impacts = bm25_matrix[:, columns].toarray()
+        expected = impacts.sum(axis=1) / impacts.max(axis=0).sum()
+        np.testing.assert_allclose(scores, expected, rtol=1e-5)
+        assert scores.max() <= 1
+        assert scores.argmax() == 0
+
+    def test_unknown_query_scores_zero(self, bm25_artifacts):
+        """Test that queries without known terms score zero everywhere."""
+        vectorizer, bm25_matrix = bm25_artifacts
+        scores = BM25Retriever(bm25_matrix).score("unknown", vectorizer, bm25_matrix)
+        assert not scores.any()
+
+    def test_batch_candidates_and_retrieve_match_score(self, bm25_artifacts):
+        """Test that every scoring path agrees with the single query scores."""
+        vectorizer, bm25_matrix = bm25_artifacts
+        retriever = BM25Retriever(bm25_matrix)
+        queries = ["velvet sofa", "wooden desk"]
+        candidate_ids = np.array([1, 2, 4])
+
+        batch_scores = retriever.score_batch(queries, vectorizer, bm25_matrix)
+        for row, query in zip(batch_scores.toarray(), queries, strict=True):
+            full_scores = retriever.score(query, vectorizer, bm25_matrix)
+            np.testing.assert_allclose(row, full_scores, rtol=1e-5)
+            np.testing.assert_allclose(
+                retriever.score_candidates(
+                    query, vectorizer, bm25_matrix, candidate_ids
+                ),
+                full_scores[candidate_ids],
+                rtol=1e-5,
+            )
+            assert (
+                retriever.retrieve(query, vectorizer, bm25_matrix, 2).tolist()
+                == full_scores.argsort()[-2:][::-1].tolist()
+            )
+
+
+class TestPrenormalizeRows:
+    """Test suite for the load time matrix preparation."""
+
+    def test_legacy_float64_matrix_is_converted(self):
+        """Test that float64 unnormalized matrices become float32 unit rows."""
+        matrix = csr_matrix(np.array([[3.0, 4.0], [0.0, 0.0], [1.0, 0.0]]))
+        prepared = prenormalize_rows(matrix)
+
+        assert prepared.dtype == np.float32
+        np.testing.assert_allclose(prepared.toarray(), [[0.6, 0.8], [0, 0], [1, 0]])
+
+    def test_prepared_matrix_is_not_copied(self, tfidf_artifacts):
+        """Test that an already prepared matrix is returned without a copy."""
+        _, tfidf_matrix = tfidf_artifacts
+        assert np.shares_memory(prenormalize_rows(tfidf_matrix).data, tfidf_matrix.data)
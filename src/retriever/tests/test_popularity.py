@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.retriever.src.app.utils import load_artifacts
+from src.retriever.src.batch_embedings.generators.popularity import (
+    popularity_scores,
+    save_popularity_artifacts,
+)
+
+
+@pytest.fixture
+def catalog():
+    """Small catalog with unrated and unclassified products."""
+    return pd.DataFrame(
+        {
+            "product_class": ["Sofas", "Chairs", "Sofas", None, "Chairs", "Sofas"],
+            "average_rating": [5.0, 4.8, 4.0, 4.5, np.nan, 3.0],
+            "rating_count": [1, 1000, 50, 200, np.nan, 10],
+            "review_count": [0, 400, 20, 50, np.nan, 2],
+        }
+    )
+
+
+class TestPopularityScores:
+    """Test suite for the popularity scoring."""
+
+    def test_many_ratings_outrank_a_single_perfect_one(self, catalog):
+        """Test that ratings are shrunk towards the prior and weighted by volume."""
+        scores = popularity_scores(
+            catalog["average_rating"], catalog["rating_count"], catalog["review_count"]
+        )
+        assert scores.dtype == np.float32
+        assert scores[1] > scores[0]
+        assert scores.argmax() == 1
+
+    def test_unrated_products_score_zero(self, catalog):
+        """Test that missing values count as no ratings and no reviews."""
+        scores = popularity_scores(
+            catalog["average_rating"], catalog["rating_count"], catalog["review_count"]
+        )
+        assert scores[4] == 0
+
+    def test_explicit_prior(self):
+        """Test the Bayesian average with a given prior."""
+        scores = popularity_scores(
+            np.array([5.0]),
+            np.array([2.0]),
+            np.array([0.0]),
+            prior_count=2,
+            prior_rating=3,
+        )
+        np.testing.assert_allclose(scores, [4 * np.log1p(2)], rtol=1e-6)
+
+
+def test_save_and_load_rankings(tmp_path, catalog):
+    """Test that the global and per class rankings are served from the artifacts."""
+    save_popularity_artifacts(catalog, str(tmp_path))
+    with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{tmp_path}/"):
+        ranking = load_artifacts.load_popularity_artifacts(mmap=True)
+
+    ids, scores = ranking.top(3)
+    assert ids == [1, 3, 2]
+    assert scores == sorted(scores, reverse=True)
+    assert ranking.top(10, product_class="Sofas")[0] == [2, 5, 0]
+    assert ranking.top(10, product_class="Beds")[0] == []
+
+    allowed = np.array([True, False, False, True, True, True])
+    assert ranking.top(2, allowed=allowed)[0] == [3, 5]
+    assert ranking.top(10, product_class="Sofas", allowed=allowed)[0] == [5, 0]
+
+
+def test_missing_artifacts(tmp_path):
+    """Test that the loader reports rankings that were not generated."""
+    with patch.object(load_artifacts, "ARTIFACTS_SAVE_PATH", f"{tmp_path}/"):
+        assert load_artifacts.load_popularity_artifacts() is None
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.retriever.src.app.utils.product_store import (
+    InMemoryProductStore,
+    SQLiteProductStore,
+)
+
+PRODUCTS = pd.DataFrame(
+    {
+        "product_id": [0, 1, 2, 3, 4],
+        "product_name": ["armchair", "sofa", "desk", "lamp", "rug"],
+        "category hierarchy": ["chairs", "sofas", None, "lamps", "rugs"],
+        "average_rating": [4.5, np.nan, 3.0, 5.0, 2.5],
+    }
+)
+
+
+@pytest.fixture(params=["dense_ids", "sparse_ids"])
+def memory_store(request):
+    """Build in-memory stores over compact and sparse id ranges."""
+    products = PRODUCTS.copy()
+    if request.param == "sparse_ids":
+        products["product_id"] = [10**9, 7, 42, 10**6, 3]
+    return products, InMemoryProductStore(products)
+
+
+class TestInMemoryProductStore:
+    """Test suite for the columnar product store."""
+
+    def test_rows_follow_requested_order(self, memory_store):
+        """Test that rows are gathered in the requested (score) order."""
+        products, store = memory_store
+        ids = products["product_id"].to_numpy()[[3, 0, 4]]
+        docs = store.get(ids)
+
+        assert docs["product_id"].tolist() == ids.tolist()
+        assert docs["product_name"].tolist() == ["lamp", "armchair", "rug"]
+        assert list(docs.columns) == list(products.columns)
+
+    def test_unknown_ids_are_skipped(self, memory_store):
+        """Test that unknown ids are reported in the mask and skipped."""
+        products, store = memory_store
+        ids = np.array([-1, products["product_id"].iloc[1], 123456789])
+        found, columns = store.get_columns(ids)
+
+        assert found.tolist() == [False, True, False]
+        assert columns["product_name"].tolist() == ["sofa"]
+        assert np.isnan(columns["average_rating"][0])
+
+    def test_matches_merge(self, memory_store):
+        """Test that the gather returns the rows the previous merge returned."""
+        products, store = memory_store
+        ids = products["product_id"].to_numpy()[[2, 1]]
+        merged = products.merge(pd.DataFrame({"product_id": ids}), on="product_id")
+
+        pd.testing.assert_frame_equal(
+            store.get(ids).sort_values("product_id").reset_index(drop=True),
+            merged.sort_values("product_id").reset_index(drop=True),
+        )
+
+
+class TestSQLiteProductStore:
+    """Test suite for the SQLite backed product store."""
+
+    @pytest.fixture
+    def sqlite_store(self, tmp_path):
+        """Build a SQLite store from a product csv."""
+        csv_path = tmp_path / "products.csv"
+        PRODUCTS.to_csv(csv_path, sep="\t", index=False)
+        return SQLiteProductStore.build(
+            str(csv_path), str(tmp_path / "products.sqlite"), chunksize=2
+        )
+
+    def test_rows_follow_requested_order(self, sqlite_store):
+        """Test that rows are fetched by id in the requested order."""
+        found, columns = sqlite_store.get_columns(np.array([4, 99, 0]))
+
+        assert found.tolist() == [True, False, True]
+        assert columns["product_name"].tolist() == ["rug", "armchair"]
+        assert columns["category hierarchy"].tolist() == ["rugs", "chairs"]
+        assert sqlite_store.columns == list(PRODUCTS.columns)
+
+    def test_existing_store_is_reused(self, sqlite_store, tmp_path):
+        """Test that building again opens the existing file."""
+        store = SQLiteProductStore.build(
+            str(tmp_path / "missing.csv"), str(tmp_path / "products.sqlite")
+        )
+        assert store.get([1])["product_name"].tolist() == ["sofa"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from src.retriever.src.app.core.query_vectorizer import QueryVectorizer
+
+CORPUS = [
+    "Turquoise pillow cover, 50x50cm",
+    "Blue VELVET sofa with wooden legs",
+    "café table naïve design über straße",
+    "outdoor_bench foo-bar 2-seater",
+]
+QUERIES = [
+    "turquoise PILLOW pillow",
+    "Café straße",
+    "foo bar outdoor_bench",
+    "nothing known here",
+    "",
+]
+
+
+class TestQueryVectorizer:
+    """Test suite for the sklearn-free query vectorizer."""
+
+    @pytest.mark.parametrize("sublinear_tf", [False, True])
+    def test_matches_sklearn_tfidf(self, sublinear_tf):
+        """Test that tf-idf vectors match the fitted sklearn vectorizer."""
+        vectorizer = TfidfVectorizer(dtype=np.float32, sublinear_tf=sublinear_tf)
+        vectorizer.fit(CORPUS)
+        query_vectorizer = QueryVectorizer(
+            vectorizer.get_feature_names_out().astype(str),
+            vectorizer.idf_,
+            sublinear_tf=sublinear_tf,
+        )
+
+        result = query_vectorizer.transform(QUERIES)
+        assert result.dtype == np.float32
+        assert result.shape == (len(QUERIES), len(vectorizer.vocabulary_))
+        np.testing.assert_allclose(
+            result.toarray(), vectorizer.transform(QUERIES).toarray(), atol=1e-6
+        )
+
+    @pytest.mark.parametrize("binary", [False, True])
+    def test_matches_sklearn_counts(self, binary):
+        """Test that term counts match the fitted sklearn CountVectorizer."""
+        vectorizer = CountVectorizer(dtype=np.float32, binary=binary).fit(CORPUS)
+        query_vectorizer = QueryVectorizer(
+            vectorizer.get_feature_names_out().astype(str), norm=None, binary=binary
+        )
+
+        np.testing.assert_array_equal(
+            query_vectorizer.transform(QUERIES).toarray(),
+            vectorizer.transform(QUERIES).toarray(),
+        )
+
+    def test_tokens_longer_than_the_vocabulary_terms(self):
+        """Test that a token is not truncated into a shorter vocabulary term."""
+        corpus = ["armchair sofa", "armchair table"]
+        vectorizer = TfidfVectorizer(dtype=np.float32).fit(corpus)
+        vocabulary = vectorizer.get_feature_names_out().astype(str)
+        assert vocabulary.dtype == np.dtype("<U8")
+        query_vectorizer = QueryVectorizer(vocabulary, vectorizer.idf_)
+
+        queries = ["armchairs", "armchairs sofa"]
+        np.testing.assert_allclose(
+            query_vectorizer.transform(queries).toarray(),
+            vectorizer.transform(queries).toarray(),
+            atol=1e-6,
+        )
+        assert query_vectorizer.transform(["armchairs"]).nnz == 0
+
+    def test_empty_vocabulary(self):
+        """Test that an empty vocabulary returns empty rows."""
+        query_vectorizer = QueryVectorizer(np.array([], dtype=str))
+        assert query_vectorizer.transform(["any query"]).shape == (1, 0)
@@ -0,0 +1,286 @@
+import asyncio
+import filecmp
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.reranker.src.app.core.document_preparation import (
+    DocumentPreparer as ServiceDocumentPreparer,
+)
+from src.retriever.src.app.core.rerankers import (
+    CandidateReranker,
+    LocalReranker,
+    RemoteReranker,
+    rerank_candidates,
+)
+from src.retriever.src.app.core.resilience import request_status_scope
+from src.retriever.src.utils import load_config
+
+RETRIEVER_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+RERANKER_SRC = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "reranker", "src"
+)
+
+
+class StubReranker(CandidateReranker):
+    """Candidate reranker returning fixed results, or failing."""
+
+    def __init__(self, results=None, error=None, delay_s=0.0):
+        self.results = results or []
+        self.error = error
+        self.delay_s = delay_s
+        self.calls = []
+
+    async def rerank(self, query, docs, top_n):
+        self.calls.append((query, docs["product_id"].tolist(), top_n))
+        await asyncio.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+@pytest.fixture
+def docs():
+    """Retrieved candidates, by decreasing retrieval score."""
+    return pd.DataFrame(
+        {
+            "product_id": [10, 11, 12],
+            "product_name": ["blue sofa", "red <b>sofa</b>", "sofa"],
+            "product_description": ["deep seat", np.nan, "a long   velvet sofa"],
+            "scores": [0.9, 0.8, 0.7],
+        }
+    )
+
+
+def run_in_scope(coroutine):
+    """Runs a search step inside a request status scope."""
+
+    async def main():
+        with request_status_scope() as status:
+            result = await coroutine
+        return result, status
+
+    return asyncio.run(main())
+
+
+class TestRerankCandidates:
+    """Test suite for the rerank step of the search pipeline."""
+
+    def test_rerank_reorders_the_candidates(self, docs):
+        """Test that rows come in rerank order with the relevance scores."""
+        reranker = StubReranker(results=[(2, 0.95), (0, 0.5)])
+
+        (reranked, is_reranked), status = run_in_scope(
+            rerank_candidates(reranker, "sofa", docs, top_n=2)
+        )
+
+        assert is_reranked and not status.degraded
+        assert reranked["product_id"].tolist() == [12, 10]
+        assert reranked["scores"].tolist() == [0.95, 0.5]
+        assert reranker.calls == [("sofa", [10, 11, 12], 2)]
+
+    def test_no_reranker_keeps_the_retrieval_top_n(self, docs):
+        """Test that without reranker the retrieval order and scores are returned."""
+        (result, is_reranked), status = run_in_scope(
+            rerank_candidates(None, "sofa", docs, top_n=2)
+        )
+
+        assert not is_reranked and not status.degraded
+        assert result["product_id"].tolist() == [10, 11]
+        assert result["scores"].tolist() == [0.9, 0.8]
+
+    def test_empty_candidates_are_not_reranked(self, docs):
+        """Test that the reranker is not called without candidates."""
+        reranker = StubReranker()
+
+        (result, is_reranked), _ = run_in_scope(
+            rerank_candidates(reranker, "sofa", docs.head(0), top_n=2)
+        )
+
+        assert result.empty and not is_reranked
+        assert reranker.calls == []
+
+    def test_failure_degrades_to_the_retrieval_order(self, docs):
+        """Test that a failed rerank returns the retrieval top_n flagged as degraded."""
+        reranker = StubReranker(error=httpx.ConnectError("reranker down"))
+
+        (result, is_reranked), status = run_in_scope(
+            rerank_candidates(reranker, "sofa", docs, top_n=2)
+        )
+
+        assert not is_reranked
+        assert result["product_id"].tolist() == [10, 11]
+        assert status.degraded and status.reasons == ["rerank"]
+
+    def test_timeout_degrades_to_the_retrieval_order(self, docs):
+        """Test that a rerank slower than its budget is abandoned."""
+        reranker = StubReranker(results=[(2, 0.95)], delay_s=1)
+
+        (result, is_reranked), status = run_in_scope(
+            rerank_candidates(reranker, "sofa", docs, top_n=1, timeout_s=0.01)
+        )
+
+        assert not is_reranked and status.degraded
+        assert result["product_id"].tolist() == [10]
+
+
+class TestLocalReranker:
+    """Test suite for the in-process reranker."""
+
+    @pytest.mark.parametrize("max_chars", [None, 8, 12, 40, 1000])
+    def test_texts_match_the_reranker_service(self, max_chars):
+        """Test that local texts are prepared like the texts of the reranker service, so
+        local and remote reranking score the same documents."""
+        columns = ["product_name", "product_description"]
+        docs = pd.DataFrame(
+            {
+                "product_id": [10, 11, 12, 13, 14],
+                "product_name": [
+                    "blue sofa",
+                    "red <b>sofa</b> &amp; chair",
+                    "sofa",
+                    np.nan,
+                    "  wide\n\tbench ",
+                ],
+                "product_description": [
+                    "deep seat",
+                    np.nan,
+                    "a long   velvet sofa " * 200,
+                    "<p>only a description</p>",
+                    "",
+                ],
+            }
+        )
+        reranker = LocalReranker(None, columns, max_chars=max_chars)
+        service_preparer = ServiceDocumentPreparer(columns, max_chars=max_chars)
+
+        texts = reranker.texts(docs)
+
+        assert texts == service_preparer.prepare(
+            [
+                {
+                    column: None if pd.isna(value) else value
+                    for column, value in record.items()
+                }
+                for record in docs.to_dict("records")
+            ]
+        )
+        assert texts[1].startswith("red sofa & chair")
+        if max_chars is not None:
+            assert len(texts[2]) <= max(max_chars, len("sofa"))
+
+    def test_shared_modules_match_the_reranker_service(self):
+        """Test that the text preparation and chunking modules are the ones of the reranker
+        service, and that the local settings are in line with its config."""
+        retriever_core = os.path.join(RETRIEVER_SRC, "app", "core")
+        reranker_core = os.path.join(RERANKER_SRC, "app", "core")
+        for module in ("chunked_rerank.py", "document_preparation.py"):
+            assert filecmp.cmp(
+                os.path.join(retriever_core, module),
+                os.path.join(reranker_core, module),
+                shallow=False,
+            ), f"{module} differs from the reranker service one"
+
+        local_config = load_config()["search"]["local"]
+        with open(os.path.join(RERANKER_SRC, "config.yml")) as f:
+            reranker_config = yaml.safe_load(f)
+        assert local_config["model"] == reranker_config["model"]
+        assert local_config["columns_to_rerank"] == reranker_config["columns_to_rerank"]
+        for key in ("max_chars", "cache_size"):
+            assert local_config[key] == reranker_config["document_preparation"][key]
+        for key in ("chunk_size", "max_concurrency"):
+            assert local_config[key] == reranker_config["chunking"][key]
+
+    def test_rerank_sends_chunks_and_merges_them(self, docs):
+        """Test that candidates are sent in chunks and ranked across chunks."""
+        requests = []
+
+        async def rerank_scores(query, documents, top_n):
+            requests.append(list(documents))
+            scores = {"blue sofa deep seat": 0.2, "red sofa": 0.9, "sofa": 0.1}
+            ranked = sorted(
+                enumerate(scores.get(text, 0.5) for text in documents),
+                key=lambda result: -result[1],
+            )
+            return ranked[:top_n]
+
+        reranker = LocalReranker(
+            rerank_scores, ["product_name", "product_description"], chunk_size=2
+        )
+
+        results = asyncio.run(reranker.rerank("sofa", docs, top_n=2))
+
+        assert [len(chunk) for chunk in requests] == [2, 1]
+        assert results == [(1, 0.9), (2, 0.5)]
+
+
+class StubRerankerServiceHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the rerank_by_ids endpoint of the reranker service."""
+
+    protocol_version = "HTTP/1.1"
+    status = 200
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        self.requests.append((self.path, body))
+        ids = body["product_ids"][::-1][: body["top_n"]]
+        payload = json.dumps(
+            {"ids_and_scores": [[i, 1.0 / (rank + 1)] for rank, i in enumerate(ids)]}
+            if self.status == 200
+            else {"detail": "The products could not be reranked"}
+        ).encode()
+        self.send_response(self.status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def reranker_service():
+    """Run the stub reranker service on a free local port."""
+    StubRerankerServiceHandler.status = 200
+    StubRerankerServiceHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRerankerServiceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+class TestRemoteReranker:
+    """Test suite for the reranker service client."""
+
+    def test_product_ids_are_mapped_back_to_rows(self, reranker_service, docs):
+        """Test that the product ids of the response are mapped to rows of the candidates."""
+        reranker = RemoteReranker(reranker_service)
+
+        results = asyncio.run(reranker.rerank("sofa", docs, top_n=2))
+
+        assert results == [(2, 1.0), (1, 0.5)]
+        path, body = StubRerankerServiceHandler.requests[-1]
+        assert path == "/rerank/rerank_by_ids"
+        assert body == {"query": "sofa", "product_ids": [10, 11, 12], "top_n": 2}
+
+    def test_failed_rerank_is_raised(self, reranker_service, docs):
+        """Test that an error status of the reranker service is raised, so search degrades."""
+        StubRerankerServiceHandler.status = 503
+        reranker = RemoteReranker(reranker_service)
+
+        (result, is_reranked), status = run_in_scope(
+            rerank_candidates(reranker, "sofa", docs, top_n=2)
+        )
+
+        assert not is_reranked and status.degraded
+        assert result["product_id"].tolist() == [10, 11]
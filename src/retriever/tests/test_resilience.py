@@ -0,0 +1,239 @@
+import asyncio
+
+import pytest
+
+from src.retriever.src.app.core.cpu_pool import run_stage
+from src.retriever.src.app.core.resilience import (
+    CircuitBreaker,
+    FallbackMetrics,
+    backoff_delay,
+    deadline_scope,
+    in_deadline_scope,
+    mark_degraded,
+    remaining_budget,
+    request_status_scope,
+)
+from src.retriever.src.app.exceptions import CircuitOpenError, StageTimeoutError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def fail():
+    raise ConnectionError("provider down")
+
+
+async def succeed():
+    return "ok"
+
+
+class TestDeadline:
+    """Test suite for the request deadline context."""
+
+    def test_nested_scope_keeps_outer_deadline(self):
+        """Test that a nested call does not extend the budget of the outer one."""
+        assert not in_deadline_scope()
+        with deadline_scope(0.5):
+            outer = remaining_budget()
+            with deadline_scope(100):
+                assert remaining_budget() <= outer
+        assert remaining_budget() is None
+        assert not in_deadline_scope()
+
+    def test_unbounded_scope(self):
+        """Test that a scope without budget is still detected by nested calls."""
+        with deadline_scope(None):
+            assert in_deadline_scope()
+            assert remaining_budget() is None
+
+    def test_deadline_is_inherited_by_tasks(self):
+        """Test that tasks spawned inside the scope see the same deadline."""
+
+        async def main():
+            with deadline_scope(1):
+                return await asyncio.create_task(asyncio.sleep(0, in_deadline_scope()))
+
+        assert asyncio.run(main())
+
+
+class TestBackoffDelay:
+    """Test suite for the jittered exponential backoff."""
+
+    def test_bound_doubles_up_to_max(self):
+        """Test that the upper bound doubles per attempt and is capped."""
+        bounds = [
+            backoff_delay(attempt, 0.1, 1, rng=lambda: 1) for attempt in (1, 2, 5)
+        ]
+        assert bounds == pytest.approx([0.1, 0.2, 1])
+
+    def test_full_jitter(self):
+        """Test that delays are spread over the whole interval."""
+        delays = [backoff_delay(3, 0.1) for _ in range(200)]
+        assert min(delays) >= 0 and max(delays) < 0.4
+        assert len(set(delays)) > 100
+
+
+class TestCircuitBreaker:
+    """Test suite for the per dependency circuit breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens at the threshold and then rejects without calling."""
+        breaker = CircuitBreaker("dep", failure_threshold=2, clock=FakeClock())
+        calls = []
+
+        async def tracked():
+            calls.append(1)
+            return await fail()
+
+        async def main():
+            for _ in range(2):
+                with pytest.raises(ConnectionError):
+                    await breaker.call(tracked)
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(tracked)
+
+        asyncio.run(main())
+        assert len(calls) == 2
+        assert breaker.stats()["state"] == "open"
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self):
+        """Test that only consecutive failures count."""
+        breaker = CircuitBreaker("dep", failure_threshold=2, clock=FakeClock())
+
+        async def main():
+            for func in (fail, succeed, fail):
+                try:
+                    await breaker.call(func)
+                except ConnectionError:
+                    pass
+
+        asyncio.run(main())
+        assert breaker.state == "closed"
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Test that after the recovery timeout one probe decides the state."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "dep", failure_threshold=1, recovery_timeout_s=10, clock=clock
+        )
+
+        async def main():
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+            clock.now = 10
+            assert breaker.state == "half_open"
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+            assert breaker.state == "open"
+            clock.now = 20
+            assert await breaker.call(succeed) == "ok"
+            assert breaker.state == "closed"
+
+        asyncio.run(main())
+        assert breaker.stats()["opened"] == 2
+
+    def test_half_open_admits_limited_probes(self):
+        """Test that concurrent calls beyond the probe budget are rejected."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "dep", failure_threshold=1, recovery_timeout_s=1, clock=clock
+        )
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def main():
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+            clock.now = 1
+            return await asyncio.gather(
+                breaker.call(slow), breaker.call(slow), return_exceptions=True
+            )
+
+        probe, rejected = asyncio.run(main())
+        assert probe == "ok"
+        assert isinstance(rejected, CircuitOpenError)
+        assert breaker.state == "closed"
+
+    def test_cancelled_probe_frees_its_slot(self):
+        """Test that a probe cancelled by its caller does not block the circuit."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "dep", failure_threshold=1, recovery_timeout_s=1, clock=clock
+        )
+
+        async def main():
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+            clock.now = 1
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(breaker.call(asyncio.sleep, 1), 0.01)
+            return await breaker.call(succeed)
+
+        assert asyncio.run(main()) == "ok"
+
+    def test_stage_timeouts_open_the_circuit(self):
+        """Test that calls abandoned by their stage timeout count as failures."""
+        breaker = CircuitBreaker("dep", failure_threshold=3)
+
+        async def main():
+            for _ in range(3):
+                with pytest.raises(StageTimeoutError):
+                    await run_stage(breaker.call(asyncio.sleep, 1), 0.01, "dense")
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(succeed)
+
+        asyncio.run(main())
+        assert breaker.stats()["failures"] == 3
+        assert breaker.state == "open"
+
+    def test_cancellation_within_budget_is_not_a_failure(self):
+        """Test that a call cancelled before its stage timeout, e.g. a losing hedged request,
+        is not counted."""
+        breaker = CircuitBreaker("dep", failure_threshold=1)
+
+        async def hedged_call():
+            task = asyncio.ensure_future(breaker.call(asyncio.sleep, 1))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run_stage(hedged_call(), 1, "dense"))
+        assert breaker.stats()["failures"] == 0
+        assert breaker.state == "closed"
+
+
+def test_fallback_metrics():
+    """Test that events are counted per function with every counter reported."""
+    metrics = FallbackMetrics()
+    metrics.record("retrieve_ids", "calls")
+    metrics.record("retrieve_ids", "fallbacks")
+
+    stats = metrics.stats()["retrieve_ids"]
+    assert stats["calls"] == 1 and stats["fallbacks"] == 1
+    assert stats["retries"] == 0
+
+
+def test_request_status_is_shared_with_tasks():
+    """Test that degradations flagged in spawned tasks reach the request status."""
+
+    async def dense_stage():
+        mark_degraded("dense")
+
+    async def main():
+        with request_status_scope() as status:
+            await asyncio.wait_for(dense_stage(), 1)
+        return status
+
+    status = asyncio.run(main())
+    assert status.degraded and status.reasons == ["dense"]
+    # no-op outside of a request
+    mark_degraded("fallback")
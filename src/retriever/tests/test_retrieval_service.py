@@ -0,0 +1,159 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core.resilience import request_status_scope
+
+QUERIES = [
+    "blue velvet sofa",
+    "round wooden table",
+    "modern lamp",
+    "outdoor leather chair",
+    "rug",
+]
+FILTERS = [None, {"product_class": "sofas"}, {"min_average_rating": 3.0}]
+
+
+def run_in_scope(coroutine):
+    """Runs a service call inside a request status scope."""
+
+    async def main():
+        with request_status_scope() as status:
+            result = await coroutine
+        return result, status
+
+    return asyncio.run(main())
+
+
+async def hanging_embed_texts(texts):
+    await asyncio.sleep(10)
+
+
+@pytest.fixture
+def service(retrieval):
+    return retrieval.RetrievalService()
+
+
+class TestRetrieveIdsBatch:
+    """Test suite for the batched retrieval against the per-query one."""
+
+    @pytest.mark.parametrize("fusion_mode", ["candidates", "full"])
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_batch_matches_single_queries(
+        self, retrieval, service, monkeypatch, fusion_mode, filters
+    ):
+        """Test that a batch returns the ids of each query retrieved on its own."""
+        monkeypatch.setattr(retrieval, "FUSION_MODE", fusion_mode)
+        # a pool smaller than the catalog, so the candidate unions are partial
+        monkeypatch.setattr(retrieval, "CANDIDATE_POOL_SIZE", 20)
+
+        batch_ids, status = run_in_scope(
+            service.retrieve_ids_batch(QUERIES, 10, filters=filters)
+        )
+
+        assert not status.degraded
+        assert batch_ids == [
+            asyncio.run(service.retrieve_ids(query, 10, filters=filters))
+            for query in QUERIES
+        ]
+        assert all(len(ids) == 10 for ids in batch_ids)
+
+    @pytest.mark.parametrize("fusion_mode", ["candidates", "full"])
+    def test_lexical_only_batch_matches_single_queries(
+        self, retrieval, service, monkeypatch, fusion_mode
+    ):
+        """Test that a batch served without dense neighbours, as (queries x 0) arrays, returns
+        the lexical-only ids of each query."""
+        monkeypatch.setattr(retrieval, "FUSION_MODE", fusion_mode)
+        monkeypatch.setattr(retrieval, "CANDIDATE_POOL_SIZE", 20)
+        monkeypatch.setattr(
+            retrieval.dense_retriever, "embed_texts", hanging_embed_texts
+        )
+
+        batch_ids, status = run_in_scope(
+            service.retrieve_ids_batch(QUERIES, 10, dense_timeout_s=0.01)
+        )
+        single_ids = [
+            run_in_scope(service.retrieve_ids(query, 10, dense_timeout_s=0.01))
+            for query in QUERIES
+        ]
+
+        assert status.reasons == ["dense"]
+        assert all(
+            single_status.reasons == ["dense"] for _, single_status in single_ids
+        )
+        assert batch_ids == [ids for ids, _ in single_ids]
+
+
+class TestRetrieveIds:
+    """Test suite for the per-query retrieval and its lexical-only degrade."""
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_candidates_fusion_matches_full_fusion(
+        self, retrieval, service, monkeypatch, filters
+    ):
+        """Test that with a candidate pool covering the catalog, fusing the candidates gives
+        the ids and scores of the catalog-wide fusion."""
+        assert retrieval.CANDIDATE_POOL_SIZE >= retrieval.dense_retriever.index.ntotal
+        results = {}
+        for fusion_mode in ("candidates", "full"):
+            monkeypatch.setattr(retrieval, "FUSION_MODE", fusion_mode)
+            results[fusion_mode] = [
+                asyncio.run(
+                    service.retrieve_ids(query, 10, return_score=True, filters=filters)
+                )
+                for query in QUERIES
+            ]
+
+        for (ids, scores), (full_ids, full_scores) in zip(
+            results["candidates"], results["full"], strict=True
+        ):
+            assert len(ids) == 10
+            assert list(ids) == list(full_ids)
+            np.testing.assert_allclose(scores, full_scores, rtol=1e-5)
+
+    @pytest.mark.parametrize("fusion_mode", ["candidates", "full"])
+    def test_dense_timeout_serves_lexical_only_results(
+        self, retrieval, service, monkeypatch, fusion_mode
+    ):
+        """Test that past the dense budget the lexical scores are fused on their own, with
+        LEXICAL_ONLY_ALPHA, and the response is flagged as degraded."""
+        monkeypatch.setattr(retrieval, "FUSION_MODE", fusion_mode)
+        # with the dense signal weighted out, the fusion ranks by lexical score
+        lexical_ranking = [
+            asyncio.run(
+                service.retrieve_ids(
+                    query, 10, return_score=True, alpha=retrieval.LEXICAL_ONLY_ALPHA
+                )
+            )
+            for query in QUERIES
+        ]
+        monkeypatch.setattr(
+            retrieval.dense_retriever, "embed_texts", hanging_embed_texts
+        )
+
+        for query, (expected_ids, expected_scores) in zip(
+            QUERIES, lexical_ranking, strict=True
+        ):
+            (ids, scores), status = run_in_scope(
+                service.retrieve_ids(
+                    query, 10, return_score=True, alpha=0.2, dense_timeout_s=0.01
+                )
+            )
+            assert status.degraded and status.reasons == ["dense"]
+            assert list(ids) == list(expected_ids)
+            np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+    def test_lexical_only_responses_are_counted(self, retrieval, service, monkeypatch):
+        """Test that every response served without the dense signal is counted in the stats."""
+        asyncio.run(service.retrieve_ids(QUERIES[0], 10))
+        assert service.stats()["lexical_only_responses"] == 0
+        monkeypatch.setattr(
+            retrieval.dense_retriever, "embed_texts", hanging_embed_texts
+        )
+
+        asyncio.run(service.retrieve_ids(QUERIES[0], 10, dense_timeout_s=0.01))
+        asyncio.run(service.retrieve_ids_batch(QUERIES, 10, dense_timeout_s=0.01))
+
+        assert service.stats()["lexical_only_responses"] == 2
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.reranker.src.app.core.text_store import load_product_text_store
+from src.retriever.src.batch_embedings.generators.text_store import (
+    save_product_text_store,
+)
+
+COLUMNS = ["product_name", "product_description"]
+
+
+def test_text_store_round_trip(tmp_path):
+    """Test that the reranker reads back the texts written by the batch pipeline."""
+    catalog = pd.DataFrame(
+        {
+            "product_name": ["sofa", "chaise café", "bed"],
+            "product_description": ["grey velvet", np.nan, "oak frame, queen size"],
+        }
+    )
+    manifest = save_product_text_store(catalog, str(tmp_path), COLUMNS)
+    assert manifest["n_products"] == 3
+
+    store = load_product_text_store(str(tmp_path))
+
+    assert len(store) == 3
+    assert store.docs([2, 1]) == [
+        {
+            "product_id": 2,
+            "product_name": "bed",
+            "product_description": "oak frame, queen size",
+        },
+        {"product_id": 1, "product_name": "chaise café", "product_description": ""},
+    ]
+    assert store.unknown_ids([0, 3, -1]) == [3, -1]
+
+
+def test_missing_text_store(tmp_path):
+    """Test that the loader reports a store that was not generated."""
+    assert load_product_text_store(str(tmp_path)) is None
+    assert load_product_text_store(None) is None
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.retriever.src.app.core.topk import top_k_indices
+
+
+class TestTopKIndices:
+    """Test suite for the argpartition based top-k selection."""
+
+    def test_matches_full_argsort(self):
+        """Test that the result matches a full descending argsort."""
+        scores = np.random.default_rng(0).random(1000)
+        expected = scores.argsort()[-10:][::-1]
+        np.testing.assert_array_equal(top_k_indices(scores, 10), expected)
+
+    @pytest.mark.parametrize("k", [5, 10])
+    def test_k_larger_than_scores(self, k):
+        """Test that k is capped to the number of scores."""
+        scores = np.array([0.1, 0.5, 0.3, 0.2, 0.4])
+        np.testing.assert_array_equal(top_k_indices(scores, k), [1, 4, 2, 3, 0])
+
+    def test_row_wise_on_2d_scores(self):
+        """Test that 2D inputs are processed row by row."""
+        scores = np.random.default_rng(1).random((4, 50))
+        expected = np.stack([row.argsort()[-3:][::-1] for row in scores])
+        np.testing.assert_array_equal(top_k_indices(scores, 3), expected)
+
+    def test_non_positive_k(self):
+        """Test that a non positive k returns an empty array."""
+        assert top_k_indices(np.array([0.1, 0.2]), 0).shape == (0,)